@@ -16,9 +16,15 @@
 
 __all__ = ['__version__']
 
-import pbr.version
+import time  # noqa
 
-from manilaclient import api_versions
+# NOTE: taken before anything else is imported so that 'manila --profile'
+# can report the time spent importing the client and its dependencies.
+IMPORT_START_TIME = time.monotonic()
+
+import pbr.version  # noqa
+
+from manilaclient import api_versions  # noqa
 
 version_info = pbr.version.VersionInfo('python-manilaclient')
 # We have a circular import problem when we first run python setup.py sdist
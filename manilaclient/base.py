@@ -19,14 +19,25 @@
 Base utilities to build API operation managers and objects on top of.
 """
 
-import contextlib
+import collections
 import hashlib
-import os
+import json
+import time
 
-from manilaclient.common import cliutils
+from manilaclient.common import constants
+from manilaclient.common import lookup
 from manilaclient import exceptions
 from manilaclient import utils
 
+# A change of a resource yielded by Manager._watch(), the action is
+# 'created', 'updated' or 'deleted'.
+Change = collections.namedtuple('Change', ('action', 'resource'))
+
+# Resources listed per request by the listings of all the resources of
+# Manager._watch(). The API caps the listings without a limit at
+# osapi_max_limit resources.
+WATCH_PAGE_SIZE = 1000
+
 
 # Python 2.4 compat
 try:
@@ -53,6 +64,8 @@ class Manager(utils.HookableMixin):
         return self.api.api_version
 
     def _list(self, url, response_key, obj_class=None, body=None):
+        # NOTE: only unfiltered listings have all the resources of a type.
+        listed_all = not body and '?' not in url
         resp = None
         if body:
             resp, body = self.api.client.post(url, body=body)
@@ -71,75 +84,199 @@ class Manager(utils.HookableMixin):
             except KeyError:
                 pass
 
-        with self.completion_cache('human_id', obj_class, mode="w"):
-            with self.completion_cache('uuid', obj_class, mode="w"):
-                resource = [obj_class(self, res, loaded=True)
-                            for res in data if res]
-                if 'count' in body:
-                    return resource, body['count']
-                else:
-                    return resource
-
-    @contextlib.contextmanager
-    def completion_cache(self, cache_type, obj_class, mode):
-        """Bash autocompletion items storage.
-
-        The completion cache store items that can be used for bash
-        autocompletion, like UUIDs or human-friendly IDs.
+        resource = [obj_class(self, res, loaded=True) for res in data if res]
+        self.update_lookup_cache(resource, obj_class=obj_class,
+                                 replace=listed_all)
+        if 'count' in body:
+            return resource, body['count']
+        else:
+            return resource
 
-        A resource listing will clear and repopulate the cache.
+    def _get_lookup_key(self, obj_class=None):
+        obj_class = obj_class or self.resource_class
+        if obj_class is None:
+            return None
+        endpoint = getattr(getattr(self, 'client', None), 'endpoint_url', None)
+        return endpoint, obj_class.__name__.lower()
 
-        A resource create will append to the cache.
+    def lookup_cached_ids(self, name_or_id):
+        """Return the IDs recorded in the lookup cache for a name or ID.
 
-        Delete is not handled because listings are assumed to be performed
-        often enough to keep the cache reasonably up-to-date.
+        The lookup cache holds the names and IDs of the resources listed or
+        created before, by this or earlier processes, and may be stale.
+        """
+        key = self._get_lookup_key()
+        if key is None:
+            return []
+        return lookup.get_store().find(key[0], key[1], name_or_id)
+
+    def update_lookup_cache(self, resources, obj_class=None, replace=False):
+        """Record the names and IDs of resources in the lookup cache."""
+        key = self._get_lookup_key(obj_class)
+        if key is not None:
+            lookup.get_store().update(key[0], key[1], resources,
+                                      replace=replace)
+
+    def remove_from_lookup_cache(self, resource_id):
+        key = self._get_lookup_key()
+        if key is not None:
+            lookup.get_store().remove(key[0], key[1], resource_id)
+
+    def prefetch(self, resources, **kwargs):
+        """Refresh many resources with a single listing.
+
+        The details of the given resources are replaced by those listed by
+        ``self.list(**kwargs)``, and they are marked as loaded so that their
+        missing attributes are not fetched one resource at a time. Pass
+        ``search_opts`` to narrow the listing down to the resources.
+
+        :param resources: resources of this manager.
+        :returns: list of the resources that were not listed.
+        """
+        pending = collections.OrderedDict(
+            (resource.id, resource) for resource in resources)
+        if not pending:
+            return []
+        listed = self.list(**kwargs)
+        if isinstance(listed, tuple):
+            listed = listed[0]
+        for new in listed:
+            resource = pending.pop(getattr(new, 'id', None), None)
+            if resource is not None:
+                resource._add_details(new._info)
+                resource.set_loaded(True)
+        return list(pending.values())
+
+    @staticmethod
+    def _get_digest(resource):
+        info = json.dumps(resource._info, sort_keys=True, default=str)
+        return hashlib.md5(info.encode('utf-8')).hexdigest()
+
+    def _watch(self, interval, page_size, search_opts=None, since=None,
+               resync_every=10, max_polls=None):
+        """Yield the changes of the resources listed by ``self.list()``.
+
+        The resources are listed once, in pages of WATCH_PAGE_SIZE. Every
+        poll lists the resources sorted by ``updated_at``, newest first, in
+        pages of ``page_size`` and stops at the resources not updated since
+        the previous poll. A digest of every resource seen tells the
+        resources that really changed from those updated at the same time
+        as the previous poll. The resources being deleted are fetched until
+        they are gone, and a summary listing of the IDs every
+        ``resync_every`` polls finds the other deleted resources, and the
+        resources created without an ``updated_at``, which sort last.
+
+        :param interval: seconds between the polls.
+        :param page_size: number of resources listed per request by a poll.
+        :param search_opts: filters of the listings.
+        :param since: ISO 8601 time to yield the changes since, the
+            resources of the first listing changed since are yielded. By
+            default, the first listing is not yielded, only the changes
+            since.
+        :param resync_every: number of polls between the listings of IDs,
+            0 disables them.
+        :param max_polls: number of polls to stop after, by default the
+            generator never stops.
+        :rtype: generator of :class:`Change`
         """
-        base_dir = cliutils.env('manilaclient_UUID_CACHE_DIR',
-                                'MANILACLIENT_UUID_CACHE_DIR',
-                                default="~/.manilaclient")
-
-        # NOTE(sirp): Keep separate UUID caches for each username + endpoint
-        # pair
-        username = cliutils.env('OS_USERNAME', 'MANILA_USERNAME')
-        url = cliutils.env('OS_URL', 'MANILA_URL')
-        uniqifier = hashlib.md5(username.encode('utf-8') +
-                                url.encode('utf-8')).hexdigest()
-
-        cache_dir = os.path.expanduser(os.path.join(base_dir, uniqifier))
-
-        try:
-            os.makedirs(cache_dir, 0o755)
-        except OSError:
-            # NOTE(kiall): This is typically either permission denied while
-            #              attempting to create the directory, or the directory
-            #              already exists. Either way, don't fail.
-            pass
-
-        resource = obj_class.__name__.lower()
-        filename = "%s-%s-cache" % (resource, cache_type.replace('_', '-'))
-        path = os.path.join(cache_dir, filename)
-
-        cache_attr = "_%s_cache" % cache_type
-
-        try:
-            setattr(self, cache_attr, open(path, mode))
-        except IOError:
-            # NOTE(kiall): This is typically a permission denied while
-            #              attempting to write the cache file.
-            pass
-
-        try:
-            yield
-        finally:
-            cache = getattr(self, cache_attr, None)
-            if cache:
-                cache.close()
-                delattr(self, cache_attr)
-
-    def write_to_completion_cache(self, cache_type, val):
-        cache = getattr(self, "_%s_cache" % cache_type, None)
-        if cache:
-            cache.write("%s\n" % val)
+        digests = {}
+        deleting = {}
+        resources = {}
+
+        def record(resource):
+            resources[resource.id] = resource
+            digests[resource.id] = self._get_digest(resource)
+            if resource._info.get('status') == constants.STATUS_DELETING:
+                deleting[resource.id] = resource
+            else:
+                deleting.pop(resource.id, None)
+
+        def forget(resource_id):
+            digests.pop(resource_id, None)
+            deleting.pop(resource_id, None)
+            return Change('deleted', resources.pop(resource_id))
+
+        def changed_at(resource):
+            info = resource._info
+            return info.get('updated_at') or info.get('created_at') or ''
+
+        def list_all(detailed=True):
+            offset = 0
+            while True:
+                opts = dict(search_opts or {}, limit=WATCH_PAGE_SIZE,
+                            offset=offset)
+                page = self.list(detailed=detailed, search_opts=opts)
+                if isinstance(page, tuple):
+                    page = page[0]
+                for resource in page:
+                    yield resource
+                if len(page) < WATCH_PAGE_SIZE:
+                    return
+                offset += len(page)
+
+        mark = ''
+        for resource in list_all():
+            record(resource)
+            mark = max(mark, changed_at(resource))
+        if since is not None:
+            changed = [r for r in resources.values()
+                       if changed_at(r) >= since]
+            for resource in sorted(changed, key=changed_at, reverse=True):
+                created_at = resource._info.get('created_at') or ''
+                yield Change('created' if created_at >= since else 'updated',
+                             resource)
+
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            if polls:
+                time.sleep(interval)
+            polls += 1
+            previous_mark = mark
+            offset = 0
+            while True:
+                opts = dict(search_opts or {}, limit=page_size, offset=offset)
+                page = self.list(search_opts=opts, sort_key='updated_at',
+                                 sort_dir='desc')
+                for resource in page:
+                    if changed_at(resource) < previous_mark:
+                        break
+                    mark = max(mark, changed_at(resource))
+                    if digests.get(resource.id) == self._get_digest(resource):
+                        continue
+                    created_at = resource._info.get('created_at') or ''
+                    if resource.id in digests or created_at < previous_mark:
+                        action = 'updated'
+                    else:
+                        action = 'created'
+                    record(resource)
+                    yield Change(action, resource)
+                else:
+                    if len(page) == page_size:
+                        offset += page_size
+                        continue
+                break
+
+            for resource_id in list(deleting):
+                try:
+                    resource = self.get(resource_id)
+                except exceptions.NotFound:
+                    yield forget(resource_id)
+                    continue
+                if digests[resource_id] != self._get_digest(resource):
+                    record(resource)
+                    yield Change('updated', resource)
+
+            if resync_every and polls % resync_every == 0:
+                current = set(r.id for r in list_all(detailed=False))
+                for resource_id in set(resources) - current:
+                    yield forget(resource_id)
+                for resource_id in sorted(current - set(resources)):
+                    try:
+                        resource = self.get(resource_id)
+                    except exceptions.NotFound:
+                        continue
+                    record(resource)
+                    yield Change('created', resource)
 
     def _get(self, url, response_key=None):
         resp, body = self.api.client.get(url)
@@ -162,12 +299,16 @@ class Manager(utils.HookableMixin):
         if return_raw:
             return body[response_key]
 
-        with self.completion_cache('human_id', self.resource_class, mode="a"):
-            with self.completion_cache('uuid', self.resource_class, mode="a"):
-                return self.resource_class(self, body[response_key])
+        resource = self.resource_class(self, body[response_key])
+        self.update_lookup_cache([resource])
+        return resource
 
-    def _delete(self, url):
+    def _delete(self, url, resource_id=None):
         resp, body = self.api.client.delete(url)
+        # NOTE: only the deletes of the resources themselves, not of their
+        # metadata or specs, pass the ID to drop from the lookup cache.
+        if resource_id is not None:
+            self.remove_from_lookup_cache(resource_id)
 
     def _update(self, url, body, response_key=None, **kwargs):
         self.run_hooks('modify_body_for_update', body, **kwargs)
@@ -25,14 +25,19 @@ Base utilities to build API operation managers and objects on top of.
 
 import abc
 import copy
+import logging
 
-from oslo_utils import strutils
 import six
 
 from manilaclient.common._i18n import _
 from manilaclient.common.apiclient import exceptions
+from manilaclient.common import constants
 from manilaclient import utils
 
+strutils = utils.LazyModule('oslo_utils.strutils')
+
+LOG = logging.getLogger(__name__)
+
 
 def getid(obj):
     """Return id if argument is a Resource.
@@ -473,13 +478,37 @@ class Resource(object):
         if k not in self.__dict__:
             # NOTE(bcwaldon): disallow lazy-loading if already loaded once
             if not self.is_loaded():
-                self.get()
+                self._lazy_load(k)
                 return self.__getattr__(k)
 
             raise AttributeError(k)
         else:
             return self.__dict__[k]
 
+    def _lazy_load(self, attr):
+        """Fetch the resource for a missing attribute, per client policy.
+
+        The lazy load policy and the metrics registry are those of the
+        client of the manager, see :data:`constants.LAZY_LOAD_POLICIES`.
+        """
+        api = getattr(self.manager, 'api', None)
+        policy = getattr(api, 'lazy_load', constants.LAZY_LOAD_ALLOW)
+        name = self.__class__.__name__
+        resource_id = self.__dict__.get('id')
+        if policy == constants.LAZY_LOAD_FORBID:
+            raise AttributeError(
+                _("%(attr)s is not loaded on %(name)s %(id)s and lazy "
+                  "loading is forbidden") % {
+                    'attr': attr, 'name': name, 'id': resource_id})
+        log = (LOG.warning if policy == constants.LAZY_LOAD_WARN
+               else LOG.debug)
+        log("Fetching %(name)s %(id)s to get its missing %(attr)s "
+            "attribute", {'name': name, 'id': resource_id, 'attr': attr})
+        metrics = getattr(api, 'metrics', None)
+        if metrics is not None:
+            metrics.increment('implicit_fetches')
+        self.get()
+
     def get(self):
         """Support for lazy loading details.
 
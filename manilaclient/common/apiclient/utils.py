@@ -19,6 +19,34 @@ from manilaclient.common._i18n import _
 from manilaclient.common.apiclient import exceptions
 
 
+def _find_cached_resource(manager, name_or_id):
+    """Look for a resource in the lookup cache of a manager.
+
+    A single resource recorded with this name is fetched, which verifies
+    that it still exists and still has the name, so that finding a resource
+    by name costs one request instead of a listing of the collection.
+    """
+    lookup_cached_ids = getattr(manager, 'lookup_cached_ids', None)
+    if lookup_cached_ids is None:
+        return None
+    ids = lookup_cached_ids(name_or_id)
+    if not isinstance(ids, list) or len(ids) != 1:
+        return None
+    try:
+        resource = manager.get(ids[0])
+    except exceptions.NotFound:
+        manager.remove_from_lookup_cache(ids[0])
+        return None
+    name_attr = getattr(resource, 'NAME_ATTR', 'name')
+    info = getattr(resource, '_info', {})
+    if name_or_id in (info.get('id'), info.get(name_attr),
+                      getattr(resource, 'human_id', None)):
+        return resource
+    # NOTE: the resource was renamed, record its new name.
+    manager.update_lookup_cache([resource])
+    return None
+
+
 def find_resource(manager, name_or_id, **find_args):
     """Look for resource in a given manager.
 
@@ -56,6 +84,11 @@ def find_resource(manager, name_or_id, **find_args):
         except exceptions.NotFound:
             pass
 
+    if not find_args:
+        resource = _find_cached_resource(manager, name_or_id)
+        if resource is not None:
+            return resource
+
     try:
         try:
             return manager.find(human_id=name_or_id, **find_args)
@@ -18,19 +18,32 @@
 
 from __future__ import print_function
 
+import contextlib
+import csv
 import getpass
 import inspect
+import json
 import os
 import sys
 import textwrap
 
 from oslo_utils import encodeutils
-from oslo_utils import strutils
-import prettytable
 import six
 from six import moves
 
 from manilaclient.common._i18n import _
+from manilaclient.common import profiling
+from manilaclient import utils
+
+prettytable = utils.LazyModule('prettytable')
+strutils = utils.LazyModule('oslo_utils.strutils')
+
+# Output formats of print_list() and print_dict(), the machine readable ones
+# are written row by row as the objects are iterated.
+TABLE_FORMAT = 'table'
+OUTPUT_FORMATS = (TABLE_FORMAT, 'json', 'jsonl', 'csv', 'value')
+
+_output_format = TABLE_FORMAT
 
 
 class MissingArgs(Exception):
@@ -138,10 +151,90 @@ def isunauthenticated(func):
     return getattr(func, 'unauthenticated', False)
 
 
+def set_output_format(output_format):
+    """Set the output format of print_list() and print_dict()."""
+    global _output_format
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(_("Unknown output format %s") % output_format)
+    _output_format = output_format
+
+
+def get_output_format():
+    return _output_format
+
+
+@contextlib.contextmanager
+def diagnostic_output():
+    """Write the output of the block to stderr with the non-table formats.
+
+    Keeps the summaries and measurements printed besides the result of a
+    command out of its machine readable output.
+    """
+    if _output_format == TABLE_FORMAT:
+        yield
+        return
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+
+def _get_accessor(field, formatters, mixed_case_fields):
+    if field in formatters:
+        return formatters[field]
+    if field in mixed_case_fields:
+        field_name = field.replace(' ', '_')
+    else:
+        field_name = field.lower().replace(' ', '_')
+    return lambda o: getattr(o, field_name, '')
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=six.text_type)
+    return six.text_type(value)
+
+
+def _write_rows(labels, rows, output_format):
+    """Write rows of values to stdout as soon as they are iterated."""
+    out = sys.stdout
+    if output_format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(labels)
+        for row in rows:
+            writer.writerow([_to_text(v) for v in row])
+    elif output_format == 'value':
+        for row in rows:
+            out.write(' '.join(_to_text(v) for v in row) + '\n')
+    elif output_format == 'jsonl':
+        for row in rows:
+            out.write(json.dumps(dict(zip(labels, row)),
+                                 default=six.text_type) + '\n')
+    else:
+        separator = '\n'
+        out.write('[')
+        for row in rows:
+            out.write(separator + '  ' + json.dumps(
+                dict(zip(labels, row)), sort_keys=True,
+                default=six.text_type))
+            separator = ',\n'
+        out.write('\n]\n' if separator != '\n' else ']\n')
+
+
+@profiling.timed(profiling.TABLE_RENDERING)
 def print_list(objs, fields, formatters=None, sortby_index=0,
                mixed_case_fields=None, field_labels=None):
     """Print a list or objects as a table, one row per object.
 
+    The objects are printed in the format set with :func:`set_output_format`.
+    The formats other than the table write each row as soon as its object is
+    iterated, in the order of the objects, so that generators listing the
+    objects page by page are streamed.
+
     :param objs: iterable of :class:`Resource`
     :param fields: attributes that correspond to columns, in order
     :param formatters: `dict` of callables for field formatting
@@ -159,6 +252,13 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
                            "of elements than fields list %(fields)s"),
                          {'labels': field_labels, 'fields': fields})
 
+    accessors = [_get_accessor(field, formatters, mixed_case_fields)
+                 for field in fields]
+    rows = ([accessor(o) for accessor in accessors] for o in objs)
+    if _output_format != TABLE_FORMAT:
+        _write_rows(field_labels, rows, _output_format)
+        return
+
     if sortby_index is None:
         kwargs = {}
     else:
@@ -166,18 +266,7 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
     pt = prettytable.PrettyTable(field_labels)
     pt.align = 'l'
 
-    for o in objs:
-        row = []
-        for field in fields:
-            if field in formatters:
-                row.append(formatters[field](o))
-            else:
-                if field in mixed_case_fields:
-                    field_name = field.replace(' ', '_')
-                else:
-                    field_name = field.lower().replace(' ', '_')
-                data = getattr(o, field_name, '')
-                row.append(data)
+    for row in rows:
         pt.add_row(row)
 
     if six.PY3:
@@ -186,6 +275,7 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
         print(encodeutils.safe_encode(pt.get_string(**kwargs)))
 
 
+@profiling.timed(profiling.TABLE_RENDERING)
 def print_dict(dct, dict_property="Property", wrap=0):
     """Print a `dict` as a table of two columns.
 
@@ -193,6 +283,15 @@ def print_dict(dct, dict_property="Property", wrap=0):
     :param dict_property: name of the first column
     :param wrap: wrapping for the second column
     """
+    if _output_format in ('json', 'jsonl'):
+        indent = 2 if _output_format == 'json' else None
+        print(json.dumps(dct, indent=indent, sort_keys=True,
+                         default=six.text_type))
+        return
+    if _output_format != TABLE_FORMAT:
+        _write_rows([dict_property, 'Value'], dct.items(), _output_format)
+        return
+
     pt = prettytable.PrettyTable([dict_property, 'Value'])
     pt.align = 'l'
     for k, v in dct.items():
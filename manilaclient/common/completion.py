@@ -0,0 +1,245 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Static bash and zsh completion scripts for the manila shell.
+
+A completion script holds the commands and options of one client version
+and API version, so that completing a command line does not run
+``manila``. Scripts are cached in the ``completion`` directory of the
+client cache directory, and a script regenerates itself, by running
+``manila completion``, once the installed client is newer than it.
+
+Share, snapshot and share network names and IDs are completed from the
+lookup cache the client writes when it lists or creates them, see
+:mod:`manilaclient.common.lookup`.
+"""
+
+import argparse
+import os
+
+import manilaclient
+from manilaclient.common import cliutils
+
+SHELLS = ('bash', 'zsh')
+
+# Resources completed for the arguments with these destinations, by their
+# type in the lookup cache.
+DEST_RESOURCES = {
+    'new_share_network': 'sharenetwork',
+    'share': 'share',
+    'share_id': 'share',
+    'share_network': 'sharenetwork',
+    'snapshot': 'sharesnapshot',
+    'snapshot_id': 'sharesnapshot',
+}
+
+# Marks an option that takes a value which is not completed.
+NO_RESOURCE = '-'
+
+# Commands that are not completed.
+HIDDEN_COMMANDS = ('bash-completion', 'bash_completion')
+
+# NOTE: the loader is the same in every script and in
+# tools/manila.bash_completion, it (re)loads the script of the current API
+# version, running 'manila completion' first when the script is missing or
+# older than the installed client.
+_LOADERS = {
+    'bash': r'''_manila()
+{
+    local dir=${MANILACLIENT_UUID_CACHE_DIR:-$manilaclient_UUID_CACHE_DIR}
+    dir=${dir:-~/.manilaclient}
+    local script=${dir/#\~/$HOME}/completion/manila-
+    script+=${OS_SHARE_API_VERSION:-default}.bash
+    if [[ $script != "$_manila_script" || $_manila_stamp -nt $script ]]; then
+        [[ -r $script && ! $_manila_stamp -nt $script ]] ||
+            manila completion bash > /dev/null 2>&1
+        . "$script" 2> /dev/null || return
+    fi
+    local -a _manila_words=("${COMP_WORDS[@]:1:COMP_CWORD}")
+    local _manila_reply
+    _manila_candidates
+    COMPREPLY=($(compgen -W "$_manila_reply" -- "${COMP_WORDS[COMP_CWORD]}"))
+}
+complete -F _manila manila
+''',
+    'zsh': r'''_manila()
+{
+    local dir=${MANILACLIENT_UUID_CACHE_DIR:-$manilaclient_UUID_CACHE_DIR}
+    dir=${dir:-~/.manilaclient}
+    local script=${dir/#\~/$HOME}/completion/manila-
+    script+=${OS_SHARE_API_VERSION:-default}.zsh
+    if [[ $script != "$_manila_script" || $_manila_stamp -nt $script ]]; then
+        [[ -r $script && ! $_manila_stamp -nt $script ]] ||
+            manila completion zsh > /dev/null 2>&1
+        . "$script" 2> /dev/null || return
+    fi
+    local -a _manila_words
+    _manila_words=("${(@)words[2,CURRENT]}")
+    local _manila_reply
+    _manila_candidates
+    compadd -- ${=_manila_reply}
+}
+compdef _manila manila
+''',
+}
+
+# Sets _manila_reply to the words that may complete the last word of
+# _manila_words, the command line without 'manila'. It runs in both bash
+# and zsh.
+_CANDIDATES = r'''_manila_candidates()
+{
+    local word prev= cur= cmd= value=
+    local -i count=${#_manila_words[@]} i=0
+    for word in "${_manila_words[@]}"; do
+        i+=1
+        if (( i == count )); then
+            cur=$word
+            break
+        elif [[ -n $value ]]; then
+            value=
+        elif [[ $word == -* ]]; then
+            [[ -n ${_manila_args[${cmd}:${word}]+x} ]] && value=1
+        elif [[ -z $cmd && -n ${_manila_opts[$word]+x} ]]; then
+            cmd=$word
+        fi
+        prev=$word
+    done
+
+    if [[ -n $value ]]; then
+        _manila_reply=$(_manila_names "${_manila_args[${cmd}:${prev}]}")
+    elif [[ -z $cmd ]]; then
+        _manila_reply="$_manila_global $_manila_commands"
+    elif [[ $cur == -* ]]; then
+        _manila_reply=${_manila_opts[$cmd]}
+    else
+        _manila_reply=$(_manila_names "${_manila_positional[$cmd]}")
+    fi
+}
+
+_manila_names()
+{
+    [[ -z $1 || $1 == - ]] && return
+    [[ -n $ZSH_VERSION ]] && setopt local_options null_glob
+    local -a files
+    files=("$_manila_cache_dir"/*/"$1".tsv)
+    # The names, IDs and human IDs of every endpoint, each once. The lines
+    # with only an ID are of removed resources.
+    awk -F '\t' 'NF == 3 { for (i = 1; i <= NF; i++)
+        if ($i != "" && !seen[$i]++) print $i }' \
+        "${files[@]}" < /dev/null 2> /dev/null
+}
+'''
+
+
+def get_cache_dir():
+    """Return the directory of the client caches."""
+    base_dir = cliutils.env('manilaclient_UUID_CACHE_DIR',
+                            'MANILACLIENT_UUID_CACHE_DIR',
+                            default="~/.manilaclient")
+    return os.path.expanduser(base_dir)
+
+
+def get_script_path(shell, api_version=None):
+    """Return the file a completion script is cached in.
+
+    :param shell: 'bash' or 'zsh'.
+    :param api_version: text of the API version requested by the user, if
+        any, which is how the loader finds the script of OS_SHARE_API_VERSION.
+    """
+    return os.path.join(get_cache_dir(), 'completion', 'manila-%s.%s' % (
+        api_version or 'default', shell))
+
+
+def _is_hidden(action):
+    return action.help == argparse.SUPPRESS
+
+
+def get_spec(parser, subcommands):
+    """Collect the commands and options to complete.
+
+    :param parser: main parser of the shell.
+    :param subcommands: dict of the subcommand parsers by command.
+    :returns: dict with the global 'options', the 'values' options take,
+        which map ``<command>:<option>`` to the resource completed for
+        them, the 'positional' resource of each command and the
+        'commands' with their options.
+    """
+    spec = {'options': [], 'values': {}, 'positional': {}, 'commands': {}}
+
+    def add_options(command, command_parser, options):
+        for action in command_parser._actions:
+            resource = DEST_RESOURCES.get(action.dest, NO_RESOURCE)
+            if not action.option_strings:
+                if command and command not in spec['positional']:
+                    spec['positional'][command] = resource
+                continue
+            if action.nargs != 0:
+                for option in action.option_strings:
+                    spec['values']['%s:%s' % (command, option)] = resource
+            if not _is_hidden(action):
+                options.extend(action.option_strings)
+
+    add_options('', parser, spec['options'])
+    for command, command_parser in subcommands.items():
+        if command not in HIDDEN_COMMANDS:
+            add_options(command, command_parser,
+                        spec['commands'].setdefault(command, []))
+    return spec
+
+
+def generate_script(shell, spec, api_version=None):
+    """Return the completion script of a shell.
+
+    :param shell: 'bash' or 'zsh'.
+    :param spec: commands and options, see :func:`get_spec`.
+    :param api_version: text of the API version requested by the user.
+    """
+    def words(items):
+        return "'%s'" % ' '.join(sorted(set(items)))
+
+    lines = [
+        '# manila %s completion, python-manilaclient %s, API version %s.' % (
+            shell, manilaclient.__version__, api_version or 'default'),
+        "# Generated by 'manila completion %s', do not edit." % shell,
+        '',
+        "_manila_script='%s'" % get_script_path(shell, api_version),
+        "_manila_stamp='%s'" % os.path.abspath(manilaclient.__file__),
+        "_manila_cache_dir='%s'" % get_cache_dir(),
+        '_manila_global=%s' % words(spec['options']),
+        '_manila_commands=%s' % words(spec['commands']),
+        'unset _manila_opts _manila_args _manila_positional',
+        'typeset -gA _manila_opts _manila_args _manila_positional',
+    ]
+    for command, options in sorted(spec['commands'].items()):
+        lines.append('_manila_opts[%s]=%s' % (command, words(options)))
+    for key, resource in sorted(spec['values'].items()):
+        lines.append('_manila_args[%s]=%s' % (key, resource))
+    for command, resource in sorted(spec['positional'].items()):
+        if resource != NO_RESOURCE:
+            lines.append('_manila_positional[%s]=%s' % (command, resource))
+    lines.append('')
+    return '\n'.join(lines) + '\n' + _CANDIDATES + '\n' + _LOADERS[shell]
+
+
+def write_script(shell, script, api_version=None):
+    """Cache a completion script, replacing the previous one atomically."""
+    path = get_script_path(shell, api_version)
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), 0o755)
+    except OSError:
+        # NOTE: the directory usually exists already.
+        pass
+    with open(tmp_path, 'w') as f:
+        f.write(script)
+    os.rename(tmp_path, path)
+    return path
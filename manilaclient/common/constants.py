@@ -39,6 +39,8 @@ SNAPSHOT_SORT_KEY_VALUES = (
     'progress',
     'name',
     'display_name',
+    'created_at',
+    'updated_at',
 )
 
 SHARE_GROUP_SORT_KEY_VALUES = (
@@ -90,6 +92,14 @@ MESSAGE_SORT_KEY_VALUES = (
     'request_id', 'created_at'
 )
 
+# Policies of the clients for the attributes missing on the resources that
+# are not loaded, e.g. returned by a create request: fetch the resource,
+# fetch it and log a warning, or raise AttributeError.
+LAZY_LOAD_ALLOW = 'allow'
+LAZY_LOAD_WARN = 'warn'
+LAZY_LOAD_FORBID = 'forbid'
+LAZY_LOAD_POLICIES = (LAZY_LOAD_ALLOW, LAZY_LOAD_WARN, LAZY_LOAD_FORBID)
+
 STATUS_AVAILABLE = 'available'
 STATUS_ERROR = 'error'
 STATUS_ACTIVE = 'active'
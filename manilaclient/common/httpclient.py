@@ -18,21 +18,78 @@
 
 import copy
 import logging
+import time
 
-from oslo_serialization import jsonutils
-from oslo_utils import strutils
+from oslo_utils import uuidutils
 import re
-import requests
 import six
 from six.moves.urllib import parse
 
+from manilaclient.common import jsoncodec
+from manilaclient.common import profiling
+from manilaclient.common import recording
 from manilaclient import exceptions
+from manilaclient import utils
 
 try:
     from eventlet import sleep
 except ImportError:
     from time import sleep  # noqa
 
+requests = utils.LazyModule('requests')
+strutils = utils.LazyModule('oslo_utils.strutils')
+
+# Request lifecycle events that hooks can be registered for.
+PRE_REQUEST = 'pre_request'
+POST_RESPONSE = 'post_response'
+RETRY = 'retry'
+ERROR = 'error'
+HOOK_TYPES = (PRE_REQUEST, POST_RESPONSE, RETRY, ERROR)
+
+REQUEST_ID_HEADERS = ('x-openstack-request-id', 'x-compute-request-id')
+
+
+class RequestInfo(object):
+    """Describes a single HTTP request attempt made by :class:`HTTPClient`.
+
+    Instances are passed to hooks registered with
+    :meth:`HTTPClient.add_hook`. Fields that are not known yet when a hook
+    is called are set to None.
+
+    :param method: HTTP method.
+    :param url: full URL of the request, including the query string.
+    :param url_template: path of the request relative to the endpoint, with
+        resource IDs replaced by ``{id}`` and without the query string,
+        e.g. ``/shares/{id}/action``.
+    :param api_version: microversion sent with the request.
+    :param attempt: number of the attempt, starting with 1.
+    """
+
+    def __init__(self, method, url, url_template, api_version, attempt=1):
+        self.method = method
+        self.url = url
+        self.url_template = url_template
+        self.api_version = api_version
+        self.attempt = attempt
+        # Wall clock time the request was sent at.
+        self.started_at = None
+        # Seconds spent waiting for the server and decoding its response.
+        self.elapsed = None
+        self.decode_elapsed = None
+        self.request_bytes = 0
+        self.response_bytes = None
+        self.status_code = None
+        self.request_id = None
+        self.exception = None
+        # Seconds to wait before the next attempt, set for 'retry' events.
+        self.retry_delay = None
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        return "<RequestInfo: %s %s>" % (self.method, self.url_template)
+
 
 class HTTPClient(object):
     """HTTP Client class used by multiple clients.
@@ -44,14 +101,26 @@ class HTTPClient(object):
     client can be changed to another version during execution.
     """
     API_VERSION_HEADER = "X-Openstack-Manila-Api-Version"
+    URL_ID_PLACEHOLDER = '{id}'
 
     def __init__(self, endpoint_url, token, user_agent, api_version,
                  insecure=False, cacert=None, timeout=None, retries=None,
-                 http_log_debug=False):
+                 http_log_debug=False, json_codec=None, transport=None,
+                 capture=None):
         self.endpoint_url = endpoint_url
         self.base_url = self._get_base_url(self.endpoint_url)
         self.retries = int(retries or 0)
         self.http_log_debug = http_log_debug
+        if not isinstance(json_codec, jsoncodec.JSONCodec):
+            json_codec = jsoncodec.get_codec(json_codec)
+        self.json_codec = json_codec
+        # NOTE: a callable with the signature of requests.request(), used
+        # to send requests instead of requests.request() when provided.
+        self.transport = transport
+        if capture is not None and not isinstance(capture,
+                                                  recording.HTTPCapture):
+            capture = recording.HTTPCapture(capture)
+        self.capture = capture
 
         self.request_options = self._set_request_options(
             insecure, cacert, timeout)
@@ -63,8 +132,57 @@ class HTTPClient(object):
             'Accept': 'application/json',
         }
 
+        self._hooks = {}
         self._add_log_handlers(http_log_debug)
 
+    def add_hook(self, hook_type, hook_func):
+        """Register a callable to be run on a request lifecycle event.
+
+        :param hook_type: one of ``pre_request``, ``post_response``,
+            ``retry`` and ``error``.
+        :param hook_func: callable accepting a single :class:`RequestInfo`
+            argument.
+        """
+        if hook_type not in HOOK_TYPES:
+            raise ValueError("Hook type must be one of: %s." %
+                             ', '.join(HOOK_TYPES))
+        self._hooks.setdefault(hook_type, []).append(hook_func)
+
+    def remove_hook(self, hook_type, hook_func):
+        """Unregister a callable previously added with add_hook()."""
+        hook_funcs = self._hooks.get(hook_type) or []
+        if hook_func in hook_funcs:
+            hook_funcs.remove(hook_func)
+
+    def run_hooks(self, hook_type, info):
+        for hook_func in self._hooks.get(hook_type) or []:
+            try:
+                hook_func(info)
+            except Exception as e:
+                # NOTE: instrumentation must never break the API call.
+                self._logger.warning(
+                    "Hook %(hook)s failed on %(type)s event: %(err)s", {
+                        'hook': hook_func, 'type': hook_type,
+                        'err': six.text_type(e)})
+
+    def _get_url_template(self, url):
+        for prefix in (self.endpoint_url, self.base_url):
+            if url.startswith(prefix):
+                url = url[len(prefix):]
+                break
+        path = url.split('?', 1)[0]
+        segments = [
+            self.URL_ID_PLACEHOLDER
+            if segment.isdigit() or uuidutils.is_uuid_like(segment)
+            else segment
+            for segment in path.strip('/').split('/')]
+        return '/' + '/'.join(segments)
+
+    def _get_request_info(self, url, method, attempt=1):
+        return RequestInfo(method, url, self._get_url_template(url),
+                           self.default_headers[self.API_VERSION_HEADER],
+                           attempt=attempt)
+
     def _add_log_handlers(self, http_log_debug):
         self._logger = logging.getLogger(__name__)
 
@@ -103,6 +221,12 @@ class HTTPClient(object):
         return options
 
     def request(self, url, method, **kwargs):
+        return self._request(self._get_request_info(url, method), **kwargs)
+
+    @profiling.timed(profiling.API_CALLS)
+    def _request(self, info, **kwargs):
+        url = info.url
+        method = info.method
         headers = copy.deepcopy(self.default_headers)
         headers.update(kwargs.get('headers', {}))
 
@@ -110,22 +234,54 @@ class HTTPClient(object):
 
         if 'body' in kwargs:
             headers['Content-Type'] = 'application/json'
-            options['data'] = jsonutils.dumps(kwargs['body'])
-
-        self.log_request(method, url, headers, options.get('data', None))
-        resp = requests.request(method, url, headers=headers, **options)
+            options['data'] = self.json_codec.dumps(kwargs['body'])
+
+        data = options.get('data', None)
+        info.api_version = headers.get(self.API_VERSION_HEADER)
+        info.request_bytes = len(data) if data else 0
+
+        self.log_request(method, url, headers, data)
+        self.run_hooks(PRE_REQUEST, info)
+        info.started_at = time.time()
+        transport = self.transport or requests.request
+        start = time.monotonic()
+        try:
+            resp = transport(method, url, headers=headers, **options)
+        except requests.exceptions.RequestException as e:
+            info.elapsed = time.monotonic() - start
+            info.exception = e
+            if self.capture is not None:
+                self.capture.record(info, self.endpoint_url, headers, data)
+            self.run_hooks(ERROR, info)
+            raise
+        info.elapsed = time.monotonic() - start
+        if self.capture is not None:
+            self.capture.record(info, self.endpoint_url, headers, data, resp)
         self.log_response(resp)
 
         body = None
 
-        if resp.text:
+        content = resp.content
+        if content:
+            decode_start = time.monotonic()
             try:
-                body = jsonutils.loads(resp.text)
+                body = self.json_codec.loads(content)
             except ValueError:
                 pass
+            info.decode_elapsed = time.monotonic() - decode_start
+
+        info.status_code = resp.status_code
+        info.response_bytes = len(content) if content else 0
+        for header in REQUEST_ID_HEADERS:
+            info.request_id = resp.headers.get(header)
+            if info.request_id:
+                break
+        self.run_hooks(POST_RESPONSE, info)
 
         if resp.status_code >= 400:
-            raise exceptions.from_response(resp, method, url)
+            info.exception = exceptions.from_response(resp, method, url)
+            self.run_hooks(ERROR, info)
+            raise info.exception
 
         return resp, body
 
@@ -146,8 +302,9 @@ class HTTPClient(object):
         timeout = 1
         while True:
             attempts += 1
+            info = self._get_request_info(url, method, attempt=attempts)
             try:
-                resp, body = self.request(url, method, **kwargs)
+                resp, body = self._request(info, **kwargs)
                 return resp, body
             except (exceptions.BadRequest,
                     requests.exceptions.RequestException,
@@ -156,6 +313,9 @@ class HTTPClient(object):
                     raise
 
                 self._logger.debug("Request error: %s", six.text_type(e))
+                info.exception = e
+                info.retry_delay = timeout
+                self.run_hooks(RETRY, info)
 
             self._logger.debug(
                 "Failed attempt(%(current)s of %(total)s), "
@@ -193,6 +353,8 @@ class HTTPClient(object):
             string_parts.append(header)
 
         if data:
+            if isinstance(data, six.binary_type):
+                data = data.decode('utf-8')
             if "password" in data:
                 data = strutils.mask_password(data)
             string_parts.append(" -d '%s'" % data)
@@ -0,0 +1,120 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""JSON codecs used to (de)serialize HTTP request and response bodies.
+
+Response bodies are decoded straight from the raw bytes received from the
+server, which avoids building an intermediate text copy of large listings.
+An accelerated JSON library is used when one is installed, otherwise the
+standard library is used.
+"""
+
+import json
+
+from manilaclient import utils
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+jsonutils = utils.LazyModule('oslo_serialization.jsonutils')
+
+
+class JSONCodec(object):
+    """Base class for JSON codecs."""
+
+    name = None
+
+    def dumps(self, obj):
+        """Serialize ``obj`` to be sent as a request body."""
+        raise NotImplementedError()
+
+    def loads(self, data):
+        """Deserialize a response body given as bytes or text."""
+        raise NotImplementedError()
+
+    def __repr__(self):
+        return "<JSONCodec: %s>" % self.name
+
+
+class StdlibJSONCodec(JSONCodec):
+    """Codec based on the standard library :mod:`json` module."""
+
+    name = 'stdlib'
+
+    def dumps(self, obj):
+        return jsonutils.dumps(obj)
+
+    def loads(self, data):
+        # NOTE: json.loads() detects the encoding of bytes input itself,
+        # so there is no need to decode the payload to text beforehand.
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec based on the accelerated ``orjson`` library."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed.")
+        self._dump_options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=jsonutils.to_primitive,
+                            option=self._dump_options)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+# Codecs in order of preference.
+CODECS = (
+    ('orjson', OrjsonCodec),
+    ('stdlib', StdlibJSONCodec),
+)
+
+_default_codec = None
+
+
+def available_codecs():
+    """Return names of the codecs that can be used in this environment."""
+    names = []
+    for name, codec_class in CODECS:
+        try:
+            codec_class()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(name=None):
+    """Return a JSON codec instance.
+
+    :param name: name of the codec, one of ``CODECS``. If not provided,
+        the fastest codec available in the environment is returned.
+    """
+    global _default_codec
+
+    if name is None:
+        if _default_codec is None:
+            _default_codec = get_codec(available_codecs()[0])
+        return _default_codec
+
+    codec_class = dict(CODECS).get(name)
+    if codec_class is None:
+        raise ValueError("Unknown JSON codec '%s', must be one of: %s." % (
+            name, ', '.join(n for n, _c in CODECS)))
+    return codec_class()
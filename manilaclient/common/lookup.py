@@ -0,0 +1,256 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Local store of the names and IDs of resources.
+
+Managers record the ID, name and human ID of the resources they list and
+create, per resource type and endpoint, so that names can be resolved to
+IDs without listing a whole collection. Shell completion reads the same
+files.
+
+Every resource type of an endpoint is one tab separated file,
+``<cache dir>/<endpoint hash>/<resource>.tsv``, with a line per resource.
+Resources listed or deleted are appended to the file, a later line of a
+resource replacing the earlier ones and a line with only its ID removing
+it, so that recording a page of a listing does not rewrite the file. Files
+are replaced atomically by unfiltered listings, and once most of their
+lines are outdated. They are parsed into an index of names and human IDs
+that is kept in memory for as long as the file does not change, or is only
+appended to by this process. Entries may be stale, callers are expected to
+verify what they find.
+"""
+
+import collections
+import hashlib
+import os
+import threading
+
+import six
+
+from manilaclient.common import cliutils
+
+FILE_SUFFIX = '.tsv'
+
+# A file is rewritten, instead of appended to, once it would have more than
+# COMPACT_RATIO lines per resource, plus COMPACT_MIN lines.
+COMPACT_RATIO = 2
+COMPACT_MIN = 100
+
+Entry = collections.namedtuple('Entry', ('id', 'name', 'human_id'))
+
+
+def _field(value):
+    """Return a value that fits in a field, or None."""
+    if not isinstance(value, six.string_types) or not value:
+        return None
+    if '\t' in value or '\n' in value or '\r' in value:
+        return None
+    return value
+
+
+def get_entry(resource):
+    """Return the :class:`Entry` of a resource, or None if it has no ID."""
+    # NOTE: _info is used, getattr() would lazy-load missing attributes.
+    info = getattr(resource, '_info', None) or {}
+    resource_id = _field(info.get('id'))
+    if resource_id is None:
+        return None
+    name = _field(info.get(getattr(resource, 'NAME_ATTR', 'name')))
+    human_id = _field(getattr(resource, 'human_id', None)) if name else None
+    return Entry(resource_id, name, human_id)
+
+
+class LookupIndex(object):
+    """Entries of one resource type, indexed by ID, name and human ID."""
+
+    def __init__(self, entries=()):
+        self.entries = collections.OrderedDict()
+        self._ids_by_key = collections.defaultdict(list)
+        # NOTE: the number of lines of the file, outdated ones included.
+        self.lines = 0
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        self.discard(entry.id)
+        self.entries[entry.id] = entry
+        for key in set((entry.name, entry.human_id)):
+            if key is not None:
+                self._ids_by_key[key].append(entry.id)
+
+    def discard(self, entry_id):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in set((entry.name, entry.human_id)):
+            if key is not None:
+                ids = self._ids_by_key[key]
+                ids.remove(entry_id)
+                if not ids:
+                    del self._ids_by_key[key]
+
+    def find(self, name_or_id):
+        """Return the IDs of the resources a name, human ID or ID is of."""
+        if name_or_id in self.entries:
+            return [name_or_id]
+        return list(self._ids_by_key.get(name_or_id, ()))
+
+
+class LookupStore(object):
+    """Names and IDs of resources, stored in a directory.
+
+    :param cache_dir: directory of the store, defaults to the client cache
+        directory, ``~/.manilaclient`` or env[MANILACLIENT_UUID_CACHE_DIR].
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._indexes = {}
+
+    def get_path(self, endpoint, resource_type):
+        cache_dir = self.cache_dir or cliutils.env(
+            'manilaclient_UUID_CACHE_DIR', 'MANILACLIENT_UUID_CACHE_DIR',
+            default="~/.manilaclient")
+        endpoint_hash = hashlib.md5(
+            (endpoint or '').encode('utf-8')).hexdigest()
+        return os.path.expanduser(os.path.join(
+            cache_dir, endpoint_hash, resource_type + FILE_SUFFIX))
+
+    def get_index(self, endpoint, resource_type):
+        """Return the :class:`LookupIndex` of a resource type."""
+        return self._load(self.get_path(endpoint, resource_type))[1]
+
+    def _load(self, path):
+        """Return the version of a file and its index."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, LookupIndex()
+        version = (stat.st_mtime, stat.st_size)
+        with self._lock:
+            cached = self._indexes.get(path)
+            if cached is not None and cached[0] == version:
+                return cached
+        index = LookupIndex()
+        try:
+            with open(path) as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    index.lines += 1
+                    if len(fields) == 3 and fields[0]:
+                        index.add(Entry(*[v or None for v in fields]))
+                    elif len(fields) == 1 and fields[0]:
+                        index.discard(fields[0])
+        except (IOError, OSError):
+            return None, LookupIndex()
+        with self._lock:
+            self._indexes[path] = (version, index)
+        return version, index
+
+    def find(self, endpoint, resource_type, name_or_id):
+        """Return the IDs recorded for a name, human ID or ID."""
+        return self.get_index(endpoint, resource_type).find(name_or_id)
+
+    @staticmethod
+    def _makedirs(path):
+        try:
+            os.makedirs(os.path.dirname(path), 0o755)
+        except OSError:
+            # NOTE: the directory usually exists already, failures to write
+            # the file are handled by the callers.
+            pass
+
+    def _write(self, path, entries):
+        tmp_path = '%s.%d.%d.tmp' % (path, os.getpid(),
+                                     threading.current_thread().ident)
+        try:
+            self._makedirs(path)
+            with open(tmp_path, 'w') as f:
+                for entry in entries:
+                    f.write('\t'.join(v or '' for v in entry) + '\n')
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            # NOTE: the store is only an optimization, e.g. a read-only home
+            # directory just disables it.
+            pass
+
+    def _append(self, path, entries=(), removed_ids=()):
+        """Record entries and forget IDs, unless they are recorded so."""
+        with self._write_lock:
+            version, index = self._load(path)
+            entries = [e for e in entries if index.entries.get(e.id) != e]
+            removed_ids = [i for i in removed_ids if i in index.entries]
+            lines = len(entries) + len(removed_ids)
+            if not lines:
+                return
+            max_lines = COMPACT_RATIO * len(index.entries) + COMPACT_MIN
+            if index.lines + lines > max_lines:
+                merged = LookupIndex(index.entries.values())
+                for entry in entries:
+                    merged.add(entry)
+                for entry_id in removed_ids:
+                    merged.discard(entry_id)
+                self._write(path, merged.entries.values())
+                return
+            data = ''.join('\t'.join(v or '' for v in e) + '\n'
+                           for e in entries)
+            data += ''.join(entry_id + '\n' for entry_id in removed_ids)
+            try:
+                self._makedirs(path)
+                with open(path, 'a') as f:
+                    f.write(data)
+                stat = os.stat(path)
+            except (IOError, OSError):
+                return
+            # NOTE: the index is kept up to date, instead of parsing the
+            # file again, unless another process changed the file too.
+            size = version[1] if version is not None else 0
+            if stat.st_size != size + len(data.encode('utf-8')):
+                return
+            for entry in entries:
+                index.add(entry)
+            for entry_id in removed_ids:
+                index.discard(entry_id)
+            index.lines += lines
+            with self._lock:
+                self._indexes[path] = ((stat.st_mtime, stat.st_size), index)
+
+    def update(self, endpoint, resource_type, resources, replace=False):
+        """Record resources.
+
+        :param resources: resources to record, those without an ID are
+            ignored.
+        :param replace: whether ``resources`` are all the resources of the
+            type, i.e. come from an unfiltered listing, and replace the
+            recorded ones.
+        """
+        entries = [e for e in (get_entry(r) for r in resources) if e]
+        path = self.get_path(endpoint, resource_type)
+        if replace:
+            self._write(path, entries)
+        else:
+            self._append(path, entries=entries)
+
+    def remove(self, endpoint, resource_type, resource_id):
+        """Forget a resource, e.g. once it was deleted."""
+        self._append(self.get_path(endpoint, resource_type),
+                     removed_ids=[resource_id])
+
+
+_store = LookupStore()
+
+
+def get_store():
+    """Return the store shared by the managers."""
+    return _store
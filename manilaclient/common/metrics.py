@@ -0,0 +1,217 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""In-process metrics collected from the requests made by a client.
+
+A :class:`MetricsRegistry` is attached to one or more HTTP clients through
+their request hooks and keeps latency histograms per endpoint template and
+per HTTP method, request/retry/error/byte counters and the time spent in
+other phases such as authentication and API version discovery.
+"""
+
+import collections
+import contextlib
+import copy
+import threading
+import time
+
+from manilaclient.common import httpclient
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, float('inf'))
+
+# NOTE: 'implicit_fetches' counts the resources fetched to lazy load one of
+# their attributes, see Resource._lazy_load().
+COUNTERS = ('requests', 'retries', 'errors', 'request_bytes',
+            'response_bytes', 'implicit_fetches')
+
+# Timers of the client phases that are not API calls.
+AUTH_TIMER = 'auth'
+VERSION_DISCOVERY_TIMER = 'version_discovery'
+
+
+class Histogram(object):
+    """Latency histogram with fixed buckets."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def percentile(self, percent):
+        """Return the upper bound of the bucket holding the percentile."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100.0
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'avg': self.sum / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'buckets': collections.OrderedDict(
+                zip(self.buckets, self.counts)),
+        }
+
+
+class MetricsRegistry(object):
+    """Collects metrics of the requests made by HTTP clients.
+
+    :param max_records: number of most recent per-request records to keep.
+    """
+
+    def __init__(self, max_records=1000):
+        self._lock = threading.Lock()
+        self.max_records = max_records
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = dict.fromkeys(COUNTERS, 0)
+            self.timers = collections.OrderedDict()
+            self.endpoints = collections.OrderedDict()
+            self.methods = collections.OrderedDict()
+            self.records = collections.deque(maxlen=self.max_records)
+
+    def attach(self, http_client):
+        """Start collecting metrics of the given HTTPClient."""
+        http_client.add_hook(httpclient.PRE_REQUEST, self._on_pre_request)
+        http_client.add_hook(httpclient.POST_RESPONSE, self._on_response)
+        http_client.add_hook(httpclient.RETRY, self._on_retry)
+        http_client.add_hook(httpclient.ERROR, self._on_error)
+
+    def detach(self, http_client):
+        """Stop collecting metrics of the given HTTPClient."""
+        http_client.remove_hook(httpclient.PRE_REQUEST, self._on_pre_request)
+        http_client.remove_hook(httpclient.POST_RESPONSE, self._on_response)
+        http_client.remove_hook(httpclient.RETRY, self._on_retry)
+        http_client.remove_hook(httpclient.ERROR, self._on_error)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """Context manager adding the time spent in its block to a timer."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.monotonic() - start)
+
+    def _observe(self, info):
+        endpoint = '%s %s' % (info.method, info.url_template)
+        with self._lock:
+            for histograms, key in ((self.endpoints, endpoint),
+                                    (self.methods, info.method)):
+                if key not in histograms:
+                    histograms[key] = Histogram()
+                histograms[key].observe(info.elapsed)
+            self.records.append({
+                'method': info.method,
+                'url_template': info.url_template,
+                'url': info.url,
+                'status_code': info.status_code,
+                'elapsed': info.elapsed,
+                'decode_elapsed': info.decode_elapsed,
+                'request_bytes': info.request_bytes,
+                'response_bytes': info.response_bytes,
+                'request_id': info.request_id,
+                'attempt': info.attempt,
+            })
+
+    def _on_pre_request(self, info):
+        self.increment('requests')
+        self.increment('request_bytes', info.request_bytes)
+
+    def _on_response(self, info):
+        self.increment('response_bytes', info.response_bytes or 0)
+        self._observe(info)
+
+    def _on_retry(self, info):
+        self.increment('retries')
+
+    def _on_error(self, info):
+        self.increment('errors')
+        if info.status_code is None and info.elapsed is not None:
+            # NOTE: connection failures never reach the 'post_response'
+            # event, but their latency still matters.
+            self._observe(info)
+
+    def snapshot(self):
+        """Return a copy of all metrics collected so far as a dict."""
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timers': dict(self.timers),
+                'endpoints': collections.OrderedDict(
+                    (k, v.to_dict()) for k, v in self.endpoints.items()),
+                'methods': collections.OrderedDict(
+                    (k, v.to_dict()) for k, v in self.methods.items()),
+                'records': copy.deepcopy(list(self.records)),
+            }
+
+    @property
+    def api_time(self):
+        """Total seconds spent waiting for the API."""
+        with self._lock:
+            return sum(h.sum for h in self.methods.values())
+
+
+@contextlib.contextmanager
+def timer(registry, name):
+    """Time a block in ``registry`` if one is given, else do nothing."""
+    if registry is None:
+        yield
+    else:
+        with registry.timer(name):
+            yield
+
+
+_registry = None
+
+
+def get_registry():
+    """Return the process wide metrics registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
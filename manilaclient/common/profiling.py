@@ -0,0 +1,145 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Phase level profiling of the manila shell.
+
+Code blocks are attributed to named phases with :func:`phase` or the
+:func:`timed` decorator. Both are no-ops unless a :class:`Profiler` has been
+started. Phases may nest; the time reported for a phase excludes the time
+spent in the phases nested in it, while its peak memory includes them.
+Inclusive phases account the phases nested in them as their own, e.g. the API
+call made to discover the API version belongs to version discovery.
+"""
+
+import collections
+import contextlib
+import functools
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Phases of a shell invocation, in the order they are reported.
+IMPORTS = 'imports'
+BASE_PARSER = 'base parser'
+EXTENSION_DISCOVERY = 'extension discovery'
+SUBPARSER_BUILD = 'subparser build'
+AUTHENTICATION = 'authentication'
+VERSION_DISCOVERY = 'version discovery'
+API_CALLS = 'API calls'
+TABLE_RENDERING = 'table rendering'
+PHASES = (IMPORTS, BASE_PARSER, EXTENSION_DISCOVERY, SUBPARSER_BUILD,
+          AUTHENTICATION, VERSION_DISCOVERY, API_CALLS, TABLE_RENDERING)
+
+_active_profiler = None
+
+
+class _Frame(object):
+
+    def __init__(self, name, inclusive=False):
+        self.name = name
+        self.inclusive = inclusive
+        self.start = time.monotonic()
+        self.child_time = 0.0
+        self.peak = 0
+
+
+class Profiler(object):
+    """Accumulates wall clock time and peak memory per phase.
+
+    :param trace_memory: whether to trace memory allocations with
+        tracemalloc to report peak memory per phase.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory and tracemalloc is not None
+        self.times = collections.OrderedDict()
+        self.peaks = collections.OrderedDict()
+        self._stack = []
+
+    def start(self):
+        global _active_profiler
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _active_profiler = self
+
+    def stop(self):
+        global _active_profiler
+        if _active_profiler is self:
+            _active_profiler = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            peaks = list(self.peaks.values())
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            self.peaks['total'] = max(peaks)
+            tracemalloc.stop()
+
+    def add_time(self, name, seconds):
+        self.times[name] = self.times.get(name, 0.0) + seconds
+
+    def _get_peak(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        # NOTE: reset_peak() is only available since Python 3.9, older
+        # versions report the peak of the whole run so far.
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        return peak
+
+    @contextlib.contextmanager
+    def phase(self, name, inclusive=False):
+        if self._stack and self._stack[-1].inclusive:
+            yield
+            return
+        if self.trace_memory and self._stack:
+            parent = self._stack[-1]
+            parent.peak = max(parent.peak, self._get_peak())
+        frame = _Frame(name, inclusive=inclusive)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.monotonic() - frame.start
+            self.add_time(name, elapsed - frame.child_time)
+            if self.trace_memory:
+                frame.peak = max(frame.peak, self._get_peak())
+                self.peaks[name] = max(self.peaks.get(name, 0), frame.peak)
+            if self._stack:
+                parent = self._stack[-1]
+                parent.child_time += elapsed
+                parent.peak = max(parent.peak, frame.peak)
+
+
+@contextlib.contextmanager
+def phase(name, inclusive=False):
+    """Attribute the enclosed block to a phase of the active profiler.
+
+    :param inclusive: whether the phases nested in the block are attributed
+        to this phase too.
+    """
+    if _active_profiler is None:
+        yield
+    else:
+        with _active_profiler.phase(name, inclusive=inclusive):
+            yield
+
+
+def timed(name):
+    """Decorator attributing calls of a function to a profiling phase."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,169 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Capture of HTTP exchanges and their replay without a network.
+
+:class:`HTTPCapture` writes every request made by an HTTP client and the
+response it got to a newline delimited JSON file, one exchange per line,
+with auth tokens and passwords redacted. :class:`ReplayTransport` serves
+the responses of such a file to an HTTP client in place of the network.
+"""
+
+import collections
+import json
+import threading
+import time
+
+import six
+from six.moves.urllib import parse
+
+from manilaclient import exceptions
+from manilaclient import utils
+
+requests = utils.LazyModule('requests')
+strutils = utils.LazyModule('oslo_utils.strutils')
+structures = utils.LazyModule('requests.structures')
+
+REDACTED = '<redacted>'
+SENSITIVE_HEADERS = ('x-auth-token', 'x-subject-token', 'authorization')
+
+
+def redact_headers(headers):
+    return {k: REDACTED if k.lower() in SENSITIVE_HEADERS else v
+            for k, v in headers.items()}
+
+
+def _text(data):
+    if data is None:
+        return None
+    if isinstance(data, six.binary_type):
+        data = data.decode('utf-8', 'replace')
+    return data
+
+
+def _request_key(method, url):
+    """Key recorded responses by method, path and query, but not host."""
+    parts = parse.urlsplit(url)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    return method.upper(), path
+
+
+class HTTPCapture(object):
+    """Writes HTTP exchanges to a newline delimited JSON file.
+
+    The file is closed by :meth:`close`, or on exit when used as a context
+    manager.
+
+    :param path: name of the file, it is truncated when opened.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'w')
+
+    def record(self, info, endpoint, headers, data, resp=None):
+        """Write one exchange.
+
+        :param info: :class:`manilaclient.common.httpclient.RequestInfo`
+            of the request.
+        :param endpoint: endpoint URL of the client that made the request.
+        :param headers: headers of the request.
+        :param data: body of the request.
+        :param resp: response received, if any.
+        """
+        data = _text(data)
+        if data and 'password' in data:
+            data = strutils.mask_password(data)
+        entry = collections.OrderedDict((
+            ('timestamp', info.started_at),
+            ('latency', info.elapsed),
+            ('endpoint', endpoint),
+            ('method', info.method),
+            ('url', info.url),
+            ('request_headers', redact_headers(headers)),
+            ('request_body', data),
+        ))
+        if resp is not None:
+            entry['status'] = resp.status_code
+            entry['response_headers'] = redact_headers(resp.headers)
+            entry['response_body'] = _text(resp.content) or None
+        else:
+            entry['error'] = six.text_type(info.exception)
+        line = json.dumps(entry, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ReplayTransport(object):
+    """Serves responses recorded by :class:`HTTPCapture`.
+
+    Used as the ``transport`` of an HTTP client, it is called like
+    :func:`requests.request`. Requests are matched to recorded exchanges by
+    method, path and query string, in the order they were recorded. The
+    last exchange of a request is replayed again once the others have
+    been consumed, so that polling loops terminate.
+
+    :param path: name of a file written by :class:`HTTPCapture`.
+    :param timing: whether to wait for the recorded latency of every
+        exchange before returning it.
+    """
+
+    def __init__(self, path, timing=False):
+        self.timing = timing
+        self.endpoint = None
+        self._lock = threading.Lock()
+        self._exchanges = collections.defaultdict(collections.deque)
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self.endpoint = self.endpoint or entry.get('endpoint')
+                key = _request_key(entry['method'], entry['url'])
+                self._exchanges[key].append(entry)
+
+    def __call__(self, method, url, **kwargs):
+        key = _request_key(method, url)
+        with self._lock:
+            exchanges = self._exchanges.get(key)
+            if not exchanges:
+                raise exceptions.ClientException(
+                    "No recorded response for %s %s." % key)
+            entry = (exchanges.popleft() if len(exchanges) > 1
+                     else exchanges[0])
+
+        if self.timing and entry['latency']:
+            time.sleep(entry['latency'])
+        if 'error' in entry:
+            raise requests.exceptions.ConnectionError(entry['error'])
+
+        resp = requests.Response()
+        resp.status_code = entry['status']
+        resp.headers = structures.CaseInsensitiveDict(
+            entry['response_headers'])
+        resp.url = url
+        resp.encoding = 'utf-8'
+        body = entry['response_body']
+        resp._content = body.encode('utf-8') if body else b''
+        return resp
@@ -13,9 +13,38 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+"""Client extensions and their discovery.
+
+Extensions are registered in the ``manilaclient.extension`` entry point
+group, with a module as the value of the entry point. Top level modules
+whose name ends with ``python_manilaclient_ext`` and the modules of the
+``contrib`` package of an API major version are extensions too.
+
+Finding the installed extensions requires to scan the metadata of every
+installed distribution and every module on ``sys.path``, so the result is
+kept in an index file. The index is rebuilt when a directory on
+``sys.path`` is modified, which happens whenever a distribution is
+installed, upgraded or removed. Discovery runs at most once per process.
+"""
+
+import importlib
+import json
+import os
+import pkgutil
+import sys
+
+import manilaclient
 from manilaclient import base
+from manilaclient.common import cliutils
 from manilaclient import utils
 
+ENTRY_POINT_GROUP = 'manilaclient.extension'
+MODULE_SUFFIX = 'python_manilaclient_ext'
+INDEX_FILE = 'extensions-index.json'
+
+_installed_extensions = None
+_discovered_extensions = {}
+
 
 class Extension(utils.HookableMixin):
     """Extension descriptor."""
@@ -37,3 +66,125 @@ class Extension(utils.HookableMixin):
 
     def __repr__(self):
         return "<Extension '%s'>" % self.name
+
+
+def _get_index_path():
+    base_dir = cliutils.env('manilaclient_UUID_CACHE_DIR',
+                            'MANILACLIENT_UUID_CACHE_DIR',
+                            default="~/.manilaclient")
+    return os.path.expanduser(os.path.join(base_dir, INDEX_FILE))
+
+
+def _get_fingerprint():
+    """Return the state of the environment the index is valid for."""
+    paths = []
+    for path in sys.path:
+        path = os.path.abspath(path or os.curdir)
+        try:
+            paths.append([path, os.stat(path).st_mtime])
+        except OSError:
+            paths.append([path, None])
+    return {'python': sys.version, 'version': manilaclient.__version__,
+            'paths': paths}
+
+
+def _get_entry_points():
+    # NOTE: the metadata libraries are only needed when the index is
+    # rebuilt, so they are imported here.
+    try:
+        from importlib import metadata as importlib_metadata
+    except ImportError:
+        import pkg_resources
+        return [(ep.name, '%s:%s' % (ep.module_name, '.'.join(ep.attrs))
+                 if ep.attrs else ep.module_name)
+                for ep in pkg_resources.iter_entry_points(ENTRY_POINT_GROUP)]
+
+    entry_points = importlib_metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        entry_points = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:
+        entry_points = entry_points.get(ENTRY_POINT_GROUP, [])
+    return [(ep.name, ep.value) for ep in entry_points]
+
+
+def _scan_installed_extensions():
+    extensions = _get_entry_points()
+    for _loader, name, _ispkg in pkgutil.iter_modules():
+        if name.endswith(MODULE_SUFFIX):
+            extensions.append((name, name))
+    return extensions
+
+
+def _read_index(fingerprint):
+    try:
+        with open(_get_index_path()) as f:
+            index = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get('fingerprint') != fingerprint:
+        return None
+    return [tuple(extension) for extension in index['extensions']]
+
+
+def _write_index(fingerprint, extensions):
+    path = _get_index_path()
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        try:
+            os.makedirs(os.path.dirname(path), 0o755)
+        except OSError:
+            # NOTE: the directory usually exists already, failures to
+            # write the index are handled below.
+            pass
+        with open(tmp_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint,
+                       'extensions': extensions}, f)
+        os.rename(tmp_path, path)
+    except (IOError, OSError):
+        # NOTE: the index is only an optimization, discovery works without
+        # it on read-only home directories.
+        pass
+
+
+def _get_installed_extensions():
+    """Return (name, import path) of the installed extensions."""
+    global _installed_extensions
+    if _installed_extensions is None:
+        fingerprint = _get_fingerprint()
+        extensions = _read_index(fingerprint)
+        if extensions is None:
+            extensions = _scan_installed_extensions()
+            _write_index(fingerprint, extensions)
+        _installed_extensions = extensions
+    return _installed_extensions
+
+
+def _get_contrib_extensions(major_version):
+    package = 'manilaclient.v%s.contrib' % major_version
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'v%s' % major_version, 'contrib')
+    return [(name, '%s.%s' % (package, name))
+            for _loader, name, _ispkg in pkgutil.iter_modules([path])]
+
+
+def _load(import_path):
+    module_name, _sep, attrs = import_path.partition(':')
+    obj = importlib.import_module(module_name)
+    for attr in filter(None, attrs.split('.')):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def discover_extensions(major_version):
+    """Return the extensions of an API major version.
+
+    :param major_version: text with the API major version, e.g. '2'.
+    :rtype: list of :class:`Extension`
+    """
+    if major_version not in _discovered_extensions:
+        extensions = list(_get_installed_extensions())
+        extensions.extend(_get_contrib_extensions(major_version))
+        _discovered_extensions[major_version] = [
+            Extension(name, _load(import_path))
+            for name, import_path in extensions]
+    return _discovered_extensions[major_version]
@@ -12,6 +12,7 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
+import itertools
 import logging
 
 from openstackclient.identity import common as identity_common
@@ -24,6 +25,7 @@ from osc_lib import utils as oscutils
 from manilaclient.common._i18n import _
 from manilaclient.common.apiclient import utils as apiutils
 from manilaclient.common import cliutils
+from manilaclient.common import constants
 from manilaclient.osc import utils
 
 LOG = logging.getLogger(__name__)
@@ -91,6 +93,14 @@ SHARE_ATTRIBUTES_HEADERS = [
 ]
 
 
+def _paginate(shares, marker=None, limit=None):
+    """Return the shares after the marker share, up to limit shares."""
+    if marker is not None:
+        shares = itertools.dropwhile(lambda s: s.id != marker, shares)
+        next(shares, None)
+    return itertools.islice(shares, limit)
+
+
 class CreateShare(command.ShowOne):
     """Create a new share."""
     _description = _("Create new share")
@@ -480,7 +490,6 @@ class ListShare(command.Lister):
                 parsed_args.property),
             'extra_specs': utils.extract_key_value_options(
                 parsed_args.extra_spec),
-            'limit': parsed_args.limit,
             'name': parsed_args.name,
             'status': parsed_args.status,
             'host': parsed_args.host,
@@ -491,14 +500,41 @@ class ListShare(command.Lister):
             'share_group_id': share_group_id,
             'project_id': project_id,
             'user_id': user_id,
-            'offset': parsed_args.marker,
-            'limit': parsed_args.limit,
         }
 
-        # NOTE(vkmc) We implemented sorting and filtering in manilaclient
-        # but we will use the one provided by osc
-        data = share_client.shares.list(search_opts=search_opts)
-        data = oscutils.sort_items(data, parsed_args.sort, str)
+        # NOTE: the summary listing only has the IDs and names of the shares,
+        # it is enough when only those are displayed and sorted by.
+        summary_columns = ('id', 'name')
+        selected = [c.lower() for c in parsed_args.columns or ()]
+        sort = [key.split(':') for key in parsed_args.sort.split(',')]
+        sort_keys = [key[0].strip().lower() for key in sort]
+        detailed = not selected or any(
+            key not in summary_columns for key in selected + sort_keys)
+
+        marker = None
+        if parsed_args.marker:
+            marker = apiutils.find_resource(share_client.shares,
+                                            parsed_args.marker).id
+
+        sort_dir = sort[0][1].strip().lower() if len(sort[0]) > 1 else 'asc'
+        server_sort = all((len(sort) == 1,
+                           sort_keys[0] in constants.SHARE_SORT_KEY_VALUES,
+                           sort_dir in constants.SORT_DIR_VALUES))
+        if server_sort:
+            # NOTE: the API sorts and pages the shares, only the requested
+            # page is listed and the shares are yielded as they are listed.
+            data = share_client.shares.iterate(
+                detailed=detailed, search_opts=search_opts,
+                sort_key=sort_keys[0], sort_dir=sort_dir,
+                marker=marker, limit=parsed_args.limit)
+        else:
+            # NOTE: the API sorts by a single key, all the shares are
+            # listed to be sorted here.
+            data = oscutils.sort_items(
+                share_client.shares.iterate(detailed=detailed,
+                                            search_opts=search_opts),
+                parsed_args.sort, str)
+            data = _paginate(data, marker, parsed_args.limit)
 
         return (column_headers, (oscutils.get_item_properties
                 (s, columns, formatters={'Metadata': oscutils.format_dict},)
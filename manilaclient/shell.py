@@ -21,13 +21,11 @@ Command-line interface to the OpenStack Manila API.
 from __future__ import print_function
 
 import argparse
-import glob
-import imp
-import itertools
+import collections
+import cProfile
 import logging
-import os
-import pkgutil
 import sys
+import time
 
 from oslo_utils import encodeutils
 import six
@@ -35,7 +33,11 @@ import six
 from manilaclient import api_versions
 from manilaclient import client
 from manilaclient.common import cliutils
+from manilaclient.common import completion
 from manilaclient.common import constants
+from manilaclient.common import metrics as client_metrics
+from manilaclient.common import profiling
+from manilaclient.common import recording
 from manilaclient import exceptions as exc
 import manilaclient.extension
 from manilaclient.v2 import shell as shell_v2
@@ -43,6 +45,7 @@ from manilaclient.v2 import shell as shell_v2
 DEFAULT_OS_SHARE_API_VERSION = api_versions.MAX_VERSION
 DEFAULT_MANILA_ENDPOINT_TYPE = 'publicURL'
 DEFAULT_MAJOR_OS_SHARE_API_VERSION = "2"
+DEFAULT_PROFILE_FILE = 'manila.prof'
 V1_MAJOR_VERSION = '1'
 V2_MAJOR_VERSION = '2'
 
@@ -118,6 +121,12 @@ class ManilaClientArgumentParser(argparse.ArgumentParser):
 
 class OpenStackManilaShell(object):
 
+    metrics = None
+    profiler = None
+    http_capture = None
+    _discovery_api_time = 0.0
+
+    @profiling.timed(profiling.BASE_PARSER)
     def get_base_parser(self):
         parser = ManilaClientArgumentParser(
             prog='manila',
@@ -144,6 +153,77 @@ class OpenStackManilaShell(object):
                                                  default=False),
                             help="Print debugging output.")
 
+        parser.add_argument('--timings',
+                            default=False,
+                            action='store_true',
+                            help="Print call timing info.")
+
+        parser.add_argument('--profile',
+                            default=False,
+                            action='store_true',
+                            help="Profile the command, print the time spent "
+                                 "in each phase and write cProfile data to "
+                                 "a file. Use --profile=<path> to choose the "
+                                 "file, defaults to '%s'." %
+                                 DEFAULT_PROFILE_FILE)
+
+        parser.add_argument('--profile-file',
+                            metavar='<path>',
+                            default=DEFAULT_PROFILE_FILE,
+                            help=argparse.SUPPRESS)
+
+        parser.add_argument('--profile-memory',
+                            default=False,
+                            action='store_true',
+                            help="Trace memory allocations and print the "
+                                 "peak memory of each phase. "
+                                 "Implies --profile.")
+
+        parser.add_argument('--http-capture',
+                            metavar='<file>',
+                            help="Write every HTTP request made to the share "
+                                 "API and its response to <file> as "
+                                 "newline delimited JSON, with auth tokens "
+                                 "and passwords redacted.")
+
+        parser.add_argument('--http-replay',
+                            metavar='<file>',
+                            help="Serve the responses recorded in <file> by "
+                                 "--http-capture instead of sending requests "
+                                 "to the share API. Credentials are not "
+                                 "needed.")
+
+        parser.add_argument('--http-replay-timing',
+                            default=False,
+                            action='store_true',
+                            help="Wait for the recorded latency of every "
+                                 "response replayed by --http-replay.")
+
+        parser.add_argument('--format',
+                            metavar='<format>',
+                            choices=cliutils.OUTPUT_FORMATS,
+                            default=cliutils.TABLE_FORMAT,
+                            help="Output format of the commands, one of %s. "
+                                 "The formats other than 'table' write the "
+                                 "rows of listings as they are received, "
+                                 "and the totals, --timings and --profile "
+                                 "tables to stderr. Default=%s." % (
+                                     ', '.join(cliutils.OUTPUT_FORMATS),
+                                     cliutils.TABLE_FORMAT))
+
+        parser.add_argument('--lazy-load',
+                            metavar='<policy>',
+                            choices=constants.LAZY_LOAD_POLICIES,
+                            default=cliutils.env(
+                                'MANILACLIENT_LAZY_LOAD',
+                                default=constants.LAZY_LOAD_ALLOW),
+                            help="What to do when an attribute is missing on "
+                                 "a resource that was not fetched in full: "
+                                 "'allow' fetches it, 'warn' fetches it and "
+                                 "logs a warning, 'forbid' fails. "
+                                 "Defaults to env[MANILACLIENT_LAZY_LOAD] or "
+                                 "'allow'.")
+
         parser.add_argument('--os-cache',
                             default=cliutils.env('OS_CACHE', default=False),
                             action='store_true',
@@ -351,6 +431,7 @@ class OpenStackManilaShell(object):
 
         return parser
 
+    @profiling.timed(profiling.SUBPARSER_BUILD)
     def get_subcommand_parser(self, version):
         parser = self.get_base_parser()
 
@@ -374,41 +455,10 @@ class OpenStackManilaShell(object):
 
         return parser
 
+    @profiling.timed(profiling.EXTENSION_DISCOVERY)
     def _discover_extensions(self, api_version):
-        extensions = []
-        for name, module in itertools.chain(
-                self._discover_via_python_path(),
-                self._discover_via_contrib_path(api_version)):
-
-            extension = manilaclient.extension.Extension(name, module)
-            extensions.append(extension)
-
-        return extensions
-
-    def _discover_via_python_path(self):
-        for (module_loader, name, ispkg) in pkgutil.iter_modules():
-            if name.endswith('python_manilaclient_ext'):
-                if not hasattr(module_loader, 'load_module'):
-                    # Python 2.6 compat: actually get an ImpImporter obj
-                    module_loader = module_loader.find_module(name)
-
-                module = module_loader.load_module(name)
-                yield name, module
-
-    def _discover_via_contrib_path(self, api_version):
-        module_path = os.path.dirname(os.path.abspath(__file__))
-        version_str = 'v' + api_version.get_major_version()
-        ext_path = os.path.join(module_path, version_str, 'contrib')
-        ext_glob = os.path.join(ext_path, "*.py")
-
-        for ext_path in glob.iglob(ext_glob):
-            name = os.path.basename(ext_path)[:-3]
-
-            if name == "__init__":
-                continue
-
-            module = imp.load_source(name, ext_path)
-            yield name, module
+        return manilaclient.extension.discover_extensions(
+            api_version.get_major_version())
 
     def _add_bash_completion_subparser(self, subparsers):
         subparser = subparsers.add_parser(
@@ -481,11 +531,39 @@ class OpenStackManilaShell(object):
         return args
 
     def main(self, argv):
+        start_time = time.monotonic()
+        import_time = start_time - manilaclient.IMPORT_START_TIME
+        argv = self._expand_profile_option(argv)
         # Parse args once to find version and debug settings
         parser = self.get_base_parser()
         (options, args) = parser.parse_known_args(argv)
         self.setup_debugging(options.debug)
+        cliutils.set_output_format(options.format)
+        self.metrics = (client_metrics.MetricsRegistry()
+                        if options.timings else None)
+        options.profile = options.profile or options.profile_memory
+        if options.profile:
+            self._start_profiling(options, import_time,
+                                  time.monotonic() - start_time)
 
+        try:
+            return self._main(argv, options)
+        finally:
+            total_time = time.monotonic() - start_time
+            if self.http_capture is not None:
+                self.http_capture.close()
+            if options.profile:
+                self._stop_profiling(options.profile_file)
+            # NOTE: the measurements are kept out of the machine readable
+            # output of the command.
+            with cliutils.diagnostic_output():
+                if self.metrics is not None:
+                    self._print_timings(total_time)
+                if options.profile:
+                    self._print_profile(options.profile_file,
+                                        import_time + total_time)
+
+    def _main(self, argv, options):
         os_api_version = self._validate_input_api_version(options)
 
         # build available subcommands based on version
@@ -502,6 +580,9 @@ class OpenStackManilaShell(object):
         elif args.func == self.do_bash_completion:
             self.do_bash_completion(args)
             return 0
+        elif args.func == self.do_completion:
+            self.do_completion(args)
+            return 0
 
         if not options.os_share_api_version:
             api_version = api_versions.get_api_version(
@@ -542,27 +623,45 @@ class OpenStackManilaShell(object):
             cert=args.os_cert,
             input_auth_token=args.os_token,
             service_catalog_url=args.bypass_url,
+            lazy_load=args.lazy_load,
         )
 
         # Handle deprecated parameters
         if args.share_service_name:
             client_args['share_service_name'] = args.share_service_name
 
+        if self.metrics is not None:
+            client_args['metrics'] = self.metrics
+
+        if options.http_capture:
+            self.http_capture = recording.HTTPCapture(options.http_capture)
+            client_args['http_capture'] = self.http_capture
+
+        if options.http_replay:
+            transport = recording.ReplayTransport(
+                options.http_replay, timing=options.http_replay_timing)
+            client_args['http_transport'] = transport
+            # NOTE: keystone is never contacted when replaying, the share
+            # API endpoint is the one the responses were recorded from.
+            client_args['input_auth_token'] = args.os_token or 'replay'
+            client_args['service_catalog_url'] = (
+                args.bypass_url or transport.endpoint)
+
         self._validate_required_options(
             args.os_tenant_name, args.os_tenant_id,
             args.os_project_name, args.os_project_id,
-            args.os_token, args.bypass_url,
+            client_args['input_auth_token'],
+            client_args['service_catalog_url'],
             client_args['auth_url'])
 
         # This client is needed to discover the server api version.
-        temp_client = client.Client(manilaclient.API_MAX_VERSION,
-                                    **client_args)
+        with profiling.phase(profiling.AUTHENTICATION, inclusive=True):
+            temp_client = client.Client(manilaclient.API_MAX_VERSION,
+                                        **client_args)
 
-        self.cs, discovered_version = self._discover_client(temp_client,
-                                                            os_api_version,
-                                                            os_endpoint_type,
-                                                            os_service_type,
-                                                            client_args)
+        self.cs, discovered_version = self._discover_client(
+            temp_client, os_api_version, os_endpoint_type,
+            os_service_type, client_args)
 
         args = self._build_subcommands_and_extensions(discovered_version,
                                                       argv,
@@ -570,6 +669,113 @@ class OpenStackManilaShell(object):
 
         args.func(self.cs, args)
 
+    @staticmethod
+    def _expand_profile_option(argv):
+        # NOTE: '--profile' is a flag, so that argparse never takes the
+        # subcommand name as its value, but '--profile=<path>' is accepted
+        # as a shortcut for '--profile --profile-file <path>'.
+        expanded = []
+        for arg in argv:
+            if arg.startswith('--profile='):
+                expanded.extend(('--profile', '--profile-file',
+                                 arg.split('=', 1)[1]))
+            else:
+                expanded.append(arg)
+        return expanded
+
+    def _start_profiling(self, options, import_time, parse_time):
+        self.profiler = profiling.Profiler(
+            trace_memory=options.profile_memory)
+        self.profiler.add_time(profiling.IMPORTS, import_time)
+        self.profiler.add_time(profiling.BASE_PARSER, parse_time)
+        self.profiler.start()
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    def _stop_profiling(self, profile_file):
+        self._cprofile.disable()
+        self.profiler.stop()
+        self._cprofile.dump_stats(profile_file)
+
+    def _print_profile(self, profile_file, total_time):
+        """Print the time, and optionally peak memory, of each phase."""
+        times = self.profiler.times
+        other_time = max(total_time - sum(times.values()), 0.0)
+        rows = [(phase, times.get(phase, 0.0),
+                 self.profiler.peaks.get(phase))
+                for phase in profiling.PHASES]
+        rows.append(('other', other_time, None))
+        rows.append(('total', total_time, self.profiler.peaks.get('total')))
+
+        fields = ['Phase', 'Time', 'Percent']
+        labels = ['Phase', 'Time (s)', '%']
+        if self.profiler.trace_memory:
+            fields.append('Peak memory')
+            labels.append('Peak memory (KiB)')
+        phase_row = collections.namedtuple(
+            'Phase', ('phase', 'time', 'percent', 'peak_memory'))
+        cliutils.print_list(
+            [phase_row(phase, '%.3f' % seconds,
+                       '%.1f' % (100.0 * seconds / total_time
+                                 if total_time else 0.0),
+                       '-' if peak is None else '%d' % (peak // 1024))
+             for phase, seconds, peak in rows],
+            fields, sortby_index=None, field_labels=labels)
+        print("Profile data written to %(file)s, inspect it with "
+              "'python -m pstats %(file)s'." % {'file': profile_file})
+
+    def _print_timings(self, total_time):
+        """Print per-request timings and a summary of the client phases."""
+        snapshot = self.metrics.snapshot()
+        request_row = collections.namedtuple(
+            'Request', ('method', 'url', 'status', 'time', 'bytes',
+                        'request_id'))
+        cliutils.print_list(
+            [request_row(r['method'], r['url'], r['status_code'],
+                         '%.3f' % r['elapsed'], r['response_bytes'],
+                         r['request_id'])
+             for r in snapshot['records']],
+            ['Method', 'URL', 'Status', 'Time', 'Bytes', 'Request ID'],
+            sortby_index=None,
+            field_labels=['Method', 'URL', 'Status', 'Time (s)', 'Bytes',
+                          'Request ID'])
+
+        endpoint_row = collections.namedtuple(
+            'Endpoint', ('endpoint', 'count', 'total', 'avg', 'p95', 'max'))
+        cliutils.print_list(
+            [endpoint_row(name, h['count'], '%.3f' % h['sum'],
+                          '%.3f' % h['avg'], '%.3f' % h['p95'],
+                          '%.3f' % h['max'])
+             for name, h in snapshot['endpoints'].items()],
+            ['Endpoint', 'Count', 'Total', 'Avg', 'P95', 'Max'],
+            sortby_index=None,
+            field_labels=['Endpoint', 'Count', 'Total (s)', 'Avg (s)',
+                          'P95 (s)', 'Max (s)'])
+
+        timers = snapshot['timers']
+        auth_time = timers.get(client_metrics.AUTH_TIMER, 0.0)
+        discovery_time = timers.get(client_metrics.VERSION_DISCOVERY_TIMER,
+                                    0.0)
+        # NOTE: the API call made by version discovery is accounted in the
+        # version discovery phase only.
+        api_time = self.metrics.api_time - self._discovery_api_time
+        counters = snapshot['counters']
+        summary = collections.OrderedDict((
+            ('Authentication (s)', '%.3f' % auth_time),
+            ('Version discovery (s)', '%.3f' % discovery_time),
+            ('API calls (s)', '%.3f' % api_time),
+            ('Client (s)', '%.3f' % max(
+                total_time - auth_time - discovery_time - api_time, 0.0)),
+            ('Total (s)', '%.3f' % total_time),
+            ('Requests', counters['requests']),
+            ('Retries', counters['retries']),
+            ('Errors', counters['errors']),
+            ('Bytes sent', counters['request_bytes']),
+            ('Bytes received', counters['response_bytes']),
+            ('Implicit fetches', counters['implicit_fetches']),
+        ))
+        cliutils.print_dict(summary, dict_property='Summary')
+
     def _discover_client(self,
                          current_client,
                          os_api_version,
@@ -581,10 +787,17 @@ class OpenStackManilaShell(object):
             discovered_version = manilaclient.API_DEPRECATED_VERSION
             os_service_type = constants.V1_SERVICE_TYPE
         else:
-            discovered_version = api_versions.discover_version(
-                current_client,
-                os_api_version
-            )
+            api_time = self.metrics.api_time if self.metrics else 0.0
+            with client_metrics.timer(
+                    self.metrics, client_metrics.VERSION_DISCOVERY_TIMER), \
+                    profiling.phase(profiling.VERSION_DISCOVERY,
+                                    inclusive=True):
+                discovered_version = api_versions.discover_version(
+                    current_client,
+                    os_api_version
+                )
+            if self.metrics is not None:
+                self._discovery_api_time = self.metrics.api_time - api_time
 
         if not os_endpoint_type:
             os_endpoint_type = DEFAULT_MANILA_ENDPOINT_TYPE
@@ -599,8 +812,10 @@ class OpenStackManilaShell(object):
             client_args['service_type'] = os_service_type
             client_args['endpoint_type'] = os_endpoint_type
 
-            return (client.Client(discovered_version, **client_args),
-                    discovered_version)
+            with profiling.phase(profiling.AUTHENTICATION, inclusive=True):
+                discovered_client = client.Client(discovered_version,
+                                                  **client_args)
+            return discovered_client, discovered_version
         else:
             return current_client, discovered_version
 
@@ -671,6 +886,28 @@ class OpenStackManilaShell(object):
         commands.remove('bash_completion')
         print(' '.join(commands | options))
 
+    @cliutils.arg('shell', metavar='<shell>', nargs='?', default='bash',
+                  choices=completion.SHELLS,
+                  help='Shell to print the completion script of, one of '
+                       '%s. Default=bash.' % ', '.join(completion.SHELLS))
+    def do_completion(self, args):
+        """Print a completion script for bash or zsh.
+
+        The script is also cached, per API version, in the completion
+        directory of the client cache, and completes commands without
+        running manila. Load it with 'source <(manila completion)'.
+        """
+        spec = completion.get_spec(self.parser, self.subcommands)
+        api_version = cliutils.env('OS_SHARE_API_VERSION') or None
+        script = completion.generate_script(args.shell, spec, api_version)
+        try:
+            completion.write_script(args.shell, script, api_version)
+        except (IOError, OSError):
+            # NOTE: the script still works when it cannot be cached, it
+            # runs 'manila completion' again when needed.
+            pass
+        print(script, end='')
+
     @cliutils.arg('command', metavar='<subcommand>', nargs='?',
                   help='Display help for <subcommand>')
     def do_help(self, args):
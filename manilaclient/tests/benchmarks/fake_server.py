@@ -0,0 +1,678 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Stateful fake manila API server to exercise the client offline.
+
+It keeps shares, snapshots, access rules and metadata in memory and serves
+the versions, share, snapshot, access rule and export location endpoints of
+the v2 API. The initial dataset size and the latency of every response can
+be configured. Run it standalone with::
+
+    python -m manilaclient.tests.benchmarks.fake_server [--shares 10000]
+
+and point the client at the printed endpoint, for instance::
+
+    manila --os-token fake --bypass-url <endpoint> list
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import datetime
+import json
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from wsgiref import simple_server
+
+from six.moves.urllib import parse
+
+PROJECT_ID = '16e1ab15c35a457e9c2b2aa189f544e1'
+USER_ID = '5c7bdb6eb0504d54a619acf8375c08ce'
+MIN_VERSION = '2.0'
+MAX_VERSION = '2.51'
+BASE_TIME = datetime.datetime(2019, 3, 12, 10, 11, 12)
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+# Query parameters that are not filters on the listed resources.
+LIST_PARAMS = ('limit', 'offset', 'sort_key', 'sort_dir', 'is_public',
+               'all_tenants', 'with_count', 'marker')
+
+STATUS_CODES = {
+    200: '200 OK',
+    202: '202 Accepted',
+    204: '204 No Content',
+    400: '400 Bad Request',
+    404: '404 Not Found',
+    405: '405 Method Not Allowed',
+}
+ERROR_KEYS = {400: 'badRequest', 404: 'itemNotFound',
+              405: 'HTTPMethodNotAllowed'}
+
+
+class FakeAPIError(Exception):
+
+    def __init__(self, code, message):
+        super(FakeAPIError, self).__init__(message)
+        self.code = code
+        self.message = message
+
+
+def timestamp(seconds):
+    return (BASE_TIME + datetime.timedelta(seconds=seconds)).strftime(
+        TIME_FORMAT)
+
+
+def fake_uuid(prefix, index):
+    return '%08d-aaaa-4bbb-8ccc-%012d' % (prefix, index)
+
+
+def fake_share(index):
+    share_id = fake_uuid(1, index)
+    return {
+        'id': share_id,
+        'name': 'share-%d' % index,
+        'description': 'Benchmark share number %d' % index,
+        'status': 'available',
+        'size': index % 100 + 1,
+        'share_proto': 'NFS',
+        'share_type': 'c0086582-30a6-4060-b096-a42ec9d66b86',
+        'share_type_name': 'default',
+        'share_network_id': '5c9a1bc3-3f35-4c24-9de8-13a6b5d94b3a',
+        'share_server_id': None,
+        'share_group_id': None,
+        'snapshot_id': None,
+        'source_share_group_snapshot_member_id': None,
+        'availability_zone': 'nova',
+        'host': 'manila@backend%d#pool%d' % (index % 4, index % 16),
+        'project_id': PROJECT_ID,
+        'user_id': USER_ID,
+        'is_public': False,
+        'snapshot_support': True,
+        'create_share_from_snapshot_support': True,
+        'revert_to_snapshot_support': False,
+        'mount_snapshot_support': False,
+        'replication_type': None,
+        'has_replicas': False,
+        'task_state': None,
+        'access_rules_status': 'active',
+        'created_at': timestamp(index),
+        'updated_at': timestamp(index + 60),
+        'metadata': {'purpose': 'benchmark', 'index': str(index)},
+        'links': [
+            {'href': 'http://manila:8786/v2/%s/shares/%s' % (
+                PROJECT_ID, share_id), 'rel': 'self'},
+            {'href': 'http://manila:8786/%s/shares/%s' % (
+                PROJECT_ID, share_id), 'rel': 'bookmark'},
+        ],
+    }
+
+
+def fake_snapshot(index, share):
+    return {
+        'id': fake_uuid(2, index),
+        'share_id': share['id'],
+        'name': 'snapshot-%d' % index,
+        'description': 'Benchmark snapshot number %d' % index,
+        'status': 'available',
+        'size': share['size'],
+        'share_size': share['size'],
+        'share_proto': share['share_proto'],
+        'project_id': PROJECT_ID,
+        'user_id': USER_ID,
+        'provider_location': None,
+        'created_at': timestamp(index),
+        'updated_at': timestamp(index + 60),
+        'links': [],
+    }
+
+
+class FakeManilaAPI(object):
+    """WSGI application emulating a subset of the manila v2 API.
+
+    :param shares: number of shares created on start.
+    :param snapshots: number of snapshots created on start, spread over
+        the initial shares.
+    :param latency: seconds every response is delayed by.
+    :param jitter: upper bound, in seconds, of a random delay added to
+        ``latency``.
+    :param transition_time: seconds created shares, snapshots and access
+        rules stay in a transitional status before they become usable.
+    """
+
+    def __init__(self, shares=0, snapshots=0, latency=0.0, jitter=0.0,
+                 transition_time=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.transition_time = transition_time
+        self.lock = threading.Lock()
+        self.requests = collections.Counter()
+        self.shares = collections.OrderedDict()
+        self.snapshots = collections.OrderedDict()
+        self.access_rules = collections.OrderedDict()
+        self._counter = 0
+        for index in range(shares):
+            share = fake_share(index)
+            self.shares[share['id']] = share
+        initial_shares = list(self.shares.values())
+        for index in range(snapshots if initial_shares else 0):
+            snapshot = fake_snapshot(
+                index, initial_shares[index % len(initial_shares)])
+            self.snapshots[snapshot['id']] = snapshot
+        self._counter = max(shares, snapshots)
+        self.routes = [
+            ('GET', r'/$', self.get_versions),
+            ('GET', r'/v2/?$', self.get_versions),
+            ('GET', r'/shares(?P<detail>/detail)?$', self.list_shares),
+            ('POST', r'/shares$', self.create_share),
+            ('GET', r'/shares/(?P<id>[^/]+)$', self.get_share),
+            ('PUT', r'/shares/(?P<id>[^/]+)$', self.update_share),
+            ('DELETE', r'/shares/(?P<id>[^/]+)$', self.delete_share),
+            ('POST', r'/shares/(?P<id>[^/]+)/action$', self.share_action),
+            ('GET', r'/shares/(?P<id>[^/]+)/metadata$', self.get_metadata),
+            ('POST', r'/shares/(?P<id>[^/]+)/metadata$',
+             self.update_metadata),
+            ('PUT', r'/shares/(?P<id>[^/]+)/metadata$', self.set_metadata),
+            ('DELETE', r'/shares/(?P<id>[^/]+)/metadata/(?P<key>[^/]+)$',
+             self.delete_metadata_key),
+            ('GET', r'/shares/(?P<id>[^/]+)/export_locations$',
+             self.list_export_locations),
+            ('GET', r'/shares/(?P<id>[^/]+)/export_locations/(?P<el>[^/]+)$',
+             self.get_export_location),
+            ('GET', r'/snapshots(?P<detail>/detail)?$', self.list_snapshots),
+            ('POST', r'/snapshots$', self.create_snapshot),
+            ('GET', r'/snapshots/(?P<id>[^/]+)$', self.get_snapshot),
+            ('PUT', r'/snapshots/(?P<id>[^/]+)$', self.update_snapshot),
+            ('DELETE', r'/snapshots/(?P<id>[^/]+)$', self.delete_snapshot),
+            ('GET', r'/share-access-rules$', self.list_access_rules),
+            ('GET', r'/share-access-rules/(?P<id>[^/]+)$',
+             self.get_access_rule),
+            ('PUT', r'/share-access-rules/(?P<id>[^/]+)/metadata$',
+             self.update_access_metadata),
+            ('DELETE',
+             r'/share-access-rules/(?P<id>[^/]+)/metadata/(?P<key>[^/]+)$',
+             self.delete_access_metadata_key),
+        ]
+        self.routes = [(method, re.compile(pattern), handler)
+                       for method, pattern, handler in self.routes]
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        path = re.sub(r'^/v[12]/[^/]+(?=/)', '', environ.get('PATH_INFO', '/'))
+        query = parse.parse_qsl(environ.get('QUERY_STRING', ''),
+                                keep_blank_values=True)
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        raw_body = environ['wsgi.input'].read(length) if length else b''
+        version = environ.get('HTTP_X_OPENSTACK_MANILA_API_VERSION',
+                              MAX_VERSION)
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            handler, params = self._route(method, path)
+            with self.lock:
+                self.requests['%s %s' % (method, handler.__name__)] += 1
+                code, result = handler(body=body, query=query, **params)
+        except FakeAPIError as e:
+            code = e.code
+            result = {ERROR_KEYS[code]: {'code': code, 'message': e.message}}
+        except (ValueError, KeyError, TypeError) as e:
+            code = 400
+            result = {'badRequest': {'code': 400, 'message': str(e)}}
+
+        payload = json.dumps(result).encode('utf-8') if result else b''
+        start_response(STATUS_CODES[code], [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(payload))),
+            ('X-OpenStack-Manila-API-Version', version),
+            ('x-compute-request-id', 'req-%s' % uuid.uuid4()),
+        ])
+        return [payload]
+
+    def _route(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return handler, match.groupdict()
+                allowed = True
+        if allowed:
+            raise FakeAPIError(405, 'Method %s not allowed.' % method)
+        raise FakeAPIError(404, 'Resource %s could not be found.' % path)
+
+    def _now(self):
+        self._counter += 1
+        return timestamp(self._counter + 3600)
+
+    def _new_id(self):
+        return str(uuid.uuid4())
+
+    def _settle(self, resource, key='status', final='available'):
+        """Move a resource out of its transitional status once it is due."""
+        ready_at = resource.get('_ready_at')
+        if ready_at is not None and time.monotonic() >= ready_at:
+            resource[key] = final
+            resource.pop('_ready_at')
+
+    def _transition(self, resource, key, transitional):
+        if self.transition_time:
+            resource[key] = transitional
+            resource['_ready_at'] = time.monotonic() + self.transition_time
+
+    @staticmethod
+    def _public(resource):
+        return {k: v for k, v in resource.items() if not k.startswith('_')}
+
+    def _find(self, collection, resource_id, name):
+        try:
+            return collection[resource_id]
+        except KeyError:
+            raise FakeAPIError(404, '%s %s could not be found.' % (
+                name, resource_id))
+
+    def _list(self, resources, query, summary_keys=None):
+        params = dict(query)
+        filters = [(k, v) for k, v in query if k not in LIST_PARAMS]
+        result = []
+        for resource in resources:
+            for key, value in filters:
+                inexact = key.endswith('~')
+                attr = resource.get(key.rstrip('~'), value)
+                if attr is None:
+                    attr = ''
+                if inexact and value.lower() not in str(attr).lower():
+                    break
+                elif not inexact and str(attr) != value:
+                    break
+            else:
+                result.append(resource)
+
+        sort_key = params.get('sort_key', 'created_at')
+        reverse = params.get('sort_dir', 'desc') == 'desc'
+        result.sort(key=lambda r: (r.get(sort_key) is not None,
+                                   r.get(sort_key)), reverse=reverse)
+
+        count = len(result)
+        if 'marker' in params:
+            ids = [r['id'] for r in result]
+            if params['marker'] not in ids:
+                raise FakeAPIError(400, 'Marker %s not found.' %
+                                   params['marker'])
+            result = result[ids.index(params['marker']) + 1:]
+        offset = int(params.get('offset', 0))
+        limit = params.get('limit')
+        result = result[offset:offset + int(limit) if limit else None]
+
+        if summary_keys:
+            result = [{k: r[k] for k in summary_keys} for r in result]
+        else:
+            result = [self._public(r) for r in result]
+        return result, count
+
+    # Versions
+
+    def get_versions(self, **kwargs):
+        return 200, {'versions': [
+            {'id': 'v1.0', 'status': 'DEPRECATED', 'version': '',
+             'min_version': '', 'updated': '2015-08-27T11:33:21Z',
+             'links': []},
+            {'id': 'v2.0', 'status': 'CURRENT', 'version': MAX_VERSION,
+             'min_version': MIN_VERSION, 'updated': '2015-08-27T11:33:21Z',
+             'links': []},
+        ]}
+
+    # Shares
+
+    def list_shares(self, query, detail=None, **kwargs):
+        for share in self.shares.values():
+            self._settle(share)
+            self._settle_access(share)
+        return 200, self._list_response(
+            'shares', self.shares.values(), query, detail)
+
+    def _list_response(self, key, resources, query, detail):
+        summary_keys = None if detail else ('id', 'name', 'links')
+        result, count = self._list(resources, query, summary_keys)
+        response = {key: result}
+        if dict(query).get('with_count'):
+            response['count'] = count
+        return response
+
+    def get_share(self, id, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        self._settle(share)
+        self._settle_access(share)
+        return 200, {'share': self._public(share)}
+
+    def create_share(self, body, **kwargs):
+        params = body['share']
+        share = fake_share(0)
+        share.update({
+            'id': self._new_id(),
+            'name': params.get('name'),
+            'description': params.get('description'),
+            'size': int(params['size']),
+            'share_proto': params['share_proto'].upper(),
+            'availability_zone': params.get('availability_zone') or 'nova',
+            'is_public': bool(params.get('is_public', False)),
+            'snapshot_id': params.get('snapshot_id'),
+            'share_network_id': params.get('share_network_id'),
+            'metadata': params.get('metadata') or {},
+            'created_at': self._now(),
+            'updated_at': None,
+            'links': [],
+        })
+        self._transition(share, 'status', 'creating')
+        self.shares[share['id']] = share
+        return 200, {'share': self._public(share)}
+
+    def update_share(self, id, body, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        share.update(body['share'])
+        share['updated_at'] = self._now()
+        return 200, {'share': self._public(share)}
+
+    def delete_share(self, id, **kwargs):
+        self._find(self.shares, id, 'Share')
+        del self.shares[id]
+        for rule_id, rule in list(self.access_rules.items()):
+            if rule['share_id'] == id:
+                del self.access_rules[rule_id]
+        return 202, None
+
+    def share_action(self, id, body, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        (action, info), = body.items()
+        action = action.replace('os-', '')
+        if action == 'allow_access':
+            return self._allow_access(share, info)
+        elif action == 'deny_access':
+            self._find(self.access_rules, info['access_id'], 'Access rule')
+            del self.access_rules[info['access_id']]
+            return 202, None
+        elif action == 'access_list':
+            return 200, {'access_list': self._access_list(id)}
+        elif action in ('extend', 'shrink'):
+            share['size'] = int(info['new_size'])
+            return 202, None
+        elif action == 'reset_status':
+            share['status'] = info['status']
+            return 202, None
+        elif action == 'force_delete':
+            return self.delete_share(id)
+        raise FakeAPIError(400, 'Unsupported share action %s.' % action)
+
+    def _allow_access(self, share, info):
+        key = (share['id'], info['access_type'], info['access_to'])
+        for rule in self.access_rules.values():
+            if key == (rule['share_id'], rule['access_type'],
+                       rule['access_to']):
+                raise FakeAPIError(400, 'Share access %s:%s exists.' % (
+                    info['access_type'], info['access_to']))
+        now = self._now()
+        rule = {
+            'id': self._new_id(),
+            'share_id': share['id'],
+            'access_type': info['access_type'],
+            'access_to': info['access_to'],
+            'access_level': info.get('access_level', 'rw'),
+            'access_key': None,
+            'state': 'active',
+            'metadata': info.get('metadata') or {},
+            'created_at': now,
+            'updated_at': None,
+        }
+        self._transition(rule, 'state', 'queued_to_apply')
+        self.access_rules[rule['id']] = rule
+        if rule['state'] != 'active':
+            share['access_rules_status'] = 'syncing'
+        return 200, {'access': self._public(rule)}
+
+    def _share_rules(self, share_id):
+        rules = [rule for rule in self.access_rules.values()
+                 if rule['share_id'] == share_id]
+        for rule in rules:
+            self._settle(rule, 'state', 'active')
+        return rules
+
+    def _settle_access(self, share):
+        """Mark the access rules of a share applied once they all are."""
+        if share.get('access_rules_status') == 'syncing':
+            if all(rule['state'] == 'active'
+                   for rule in self._share_rules(share['id'])):
+                share['access_rules_status'] = 'active'
+
+    def _access_list(self, share_id):
+        share = self.shares.get(share_id)
+        if share is not None:
+            self._settle_access(share)
+        return [self._public(rule) for rule in self._share_rules(share_id)]
+
+    def get_metadata(self, id, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        return 200, {'metadata': share['metadata']}
+
+    def update_metadata(self, id, body, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        share['metadata'].update(body['metadata'])
+        return 200, {'metadata': share['metadata']}
+
+    def set_metadata(self, id, body, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        share['metadata'] = dict(body['metadata'])
+        return 200, {'metadata': share['metadata']}
+
+    def delete_metadata_key(self, id, key, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        if key not in share['metadata']:
+            raise FakeAPIError(404, 'Metadata item %s was not found.' % key)
+        del share['metadata'][key]
+        return 200, None
+
+    # Export locations
+
+    def _export_locations(self, share):
+        return [{
+            'id': str(uuid.uuid5(uuid.NAMESPACE_URL,
+                                 '%s/%d' % (share['id'], index))),
+            'share_instance_id': share['id'],
+            'path': '10.0.0.%d:/shares/%s' % (index + 1, share['id']),
+            'preferred': index == 0,
+            'is_admin_only': False,
+            'created_at': share['created_at'],
+            'updated_at': share['created_at'],
+        } for index in range(2)]
+
+    def list_export_locations(self, id, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        return 200, {'export_locations': self._export_locations(share)}
+
+    def get_export_location(self, id, el, **kwargs):
+        share = self._find(self.shares, id, 'Share')
+        for export_location in self._export_locations(share):
+            if export_location['id'] == el:
+                return 200, {'export_location': export_location}
+        raise FakeAPIError(404, 'Export location %s could not be found.' % el)
+
+    # Snapshots
+
+    def list_snapshots(self, query, detail=None, **kwargs):
+        for snapshot in self.snapshots.values():
+            self._settle(snapshot)
+        return 200, self._list_response(
+            'snapshots', self.snapshots.values(), query, detail)
+
+    def get_snapshot(self, id, **kwargs):
+        snapshot = self._find(self.snapshots, id, 'Snapshot')
+        self._settle(snapshot)
+        return 200, {'snapshot': self._public(snapshot)}
+
+    def create_snapshot(self, body, **kwargs):
+        params = body['snapshot']
+        share = self._find(self.shares, params['share_id'], 'Share')
+        snapshot = fake_snapshot(0, share)
+        snapshot.update({
+            'id': self._new_id(),
+            'name': params.get('name'),
+            'description': params.get('description'),
+            'created_at': self._now(),
+            'updated_at': None,
+        })
+        self._transition(snapshot, 'status', 'creating')
+        self.snapshots[snapshot['id']] = snapshot
+        return 202, {'snapshot': self._public(snapshot)}
+
+    def update_snapshot(self, id, body, **kwargs):
+        snapshot = self._find(self.snapshots, id, 'Snapshot')
+        snapshot.update(body['snapshot'])
+        snapshot['updated_at'] = self._now()
+        return 200, {'snapshot': self._public(snapshot)}
+
+    def delete_snapshot(self, id, **kwargs):
+        self._find(self.snapshots, id, 'Snapshot')
+        del self.snapshots[id]
+        return 202, None
+
+    # Access rules (2.45+)
+
+    def list_access_rules(self, query, **kwargs):
+        share_id = dict(query).get('share_id')
+        if not share_id:
+            raise FakeAPIError(400, 'share_id is required.')
+        self._find(self.shares, share_id, 'Share')
+        return 200, {'access_list': self._access_list(share_id)}
+
+    def get_access_rule(self, id, **kwargs):
+        rule = self._find(self.access_rules, id, 'Access rule')
+        self._settle(rule, 'state', 'active')
+        return 200, {'access': self._public(rule)}
+
+    def update_access_metadata(self, id, body, **kwargs):
+        rule = self._find(self.access_rules, id, 'Access rule')
+        rule['metadata'].update(body['metadata'])
+        return 200, {'metadata': rule['metadata']}
+
+    def delete_access_metadata_key(self, id, key, **kwargs):
+        rule = self._find(self.access_rules, id, 'Access rule')
+        if key not in rule['metadata']:
+            raise FakeAPIError(404, 'Metadata item %s was not found.' % key)
+        del rule['metadata'][key]
+        return 200, None
+
+
+class _ThreadingWSGIServer(socketserver.ThreadingMixIn,
+                           simple_server.WSGIServer):
+    daemon_threads = True
+
+
+class _QuietRequestHandler(simple_server.WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeManilaServer(object):
+    """Serves a :class:`FakeManilaAPI` over HTTP from a background thread.
+
+    Can be used as a context manager. The keyword arguments not listed
+    below are passed to :class:`FakeManilaAPI`.
+
+    :param host: address to listen on.
+    :param port: port to listen on, a free one is picked by default.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, **kwargs):
+        self.app = FakeManilaAPI(**kwargs)
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        return 'http://%s:%d/v2/%s' % (self.host, self.port, PROJECT_ID)
+
+    def start(self):
+        self._server = simple_server.make_server(
+            self.host, self.port, self.app,
+            server_class=_ThreadingWSGIServer,
+            handler_class=_QuietRequestHandler)
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to listen on.')
+    parser.add_argument('--port', type=int, default=0,
+                        help='Port to listen on, a free one by default.')
+    parser.add_argument('--shares', type=int, default=1000,
+                        help='Number of shares created on start.')
+    parser.add_argument('--snapshots', type=int, default=0,
+                        help='Number of snapshots created on start.')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds every response is delayed by.')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Maximum random seconds added to the latency.')
+    parser.add_argument('--transition-time', type=float, default=0.0,
+                        help='Seconds new resources stay in a transitional '
+                             'status.')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    server = FakeManilaServer(
+        host=args.host, port=args.port, shares=args.shares,
+        snapshots=args.snapshots, latency=args.latency, jitter=args.jitter,
+        transition_time=args.transition_time)
+    server.start()
+    # NOTE: the endpoint is the first line printed so that the benchmarks
+    # can run the server in a subprocess.
+    print(server.endpoint)
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
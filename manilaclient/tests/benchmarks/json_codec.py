@@ -0,0 +1,76 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Benchmark decoding of a large ``/shares/detail`` response body.
+
+Usage::
+
+    python -m manilaclient.tests.benchmarks.json_codec [--shares 50000]
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import timeit
+
+from oslo_serialization import jsonutils
+
+from manilaclient.common import jsoncodec
+from manilaclient.tests.benchmarks import fake_server
+
+
+def build_payload(shares):
+    body = {'shares': [fake_server.fake_share(i) for i in range(shares)]}
+    return json.dumps(body).encode('utf-8')
+
+
+def run(shares=50000, repeat=5):
+    payload = build_payload(shares)
+    print("Decoding /shares/detail with %(count)d shares (%(size).1f MiB), "
+          "best of %(repeat)d runs:" % {
+              'count': shares, 'size': len(payload) / 1048576.0,
+              'repeat': repeat})
+
+    candidates = [
+        ('jsonutils.loads(resp.text)',
+         lambda: jsonutils.loads(payload.decode('utf-8'))),
+    ]
+    for name in jsoncodec.available_codecs():
+        codec = jsoncodec.get_codec(name)
+        candidates.append(('%s codec' % name,
+                           lambda codec=codec: codec.loads(payload)))
+
+    results = []
+    for label, func in candidates:
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        results.append((label, best))
+
+    baseline = results[0][1]
+    for label, best in results:
+        print("  %-30s %8.1f ms  %5.2fx" % (
+            label, best * 1000, baseline / best))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shares', type=int, default=50000,
+                        help='Number of shares in the payload.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timed runs per codec.')
+    args = parser.parse_args()
+    run(args.shares, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
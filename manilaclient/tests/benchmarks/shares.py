@@ -0,0 +1,315 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Benchmark share operations of the library and the CLI.
+
+Every dataset size gets its own fake API server, run in a subprocess so
+that it does not affect the measurements of the client. Library scenarios
+run in this process, their peak memory is measured with tracemalloc in an
+extra run. CLI scenarios run ``manila`` in a subprocess and report its
+maximum resident set size.
+
+Usage::
+
+    python -m manilaclient.tests.benchmarks.shares [--shares 10000 100000]
+        [--latency 0.001] [--output results.json] [--compare baseline.json]
+
+The command exits with a non-zero status when ``--compare`` finds a
+scenario slower, or using more memory, than the baseline by more than the
+tolerance.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from manilaclient import api_versions
+from manilaclient import client
+from manilaclient.common.apiclient import utils as apiclient_utils
+from manilaclient.tests.benchmarks import fake_server
+
+LIBRARY = 'library'
+CLI = 'cli'
+
+
+class Recorder(object):
+    """Records the latency and result of the calls made through it."""
+
+    def __init__(self):
+        self.latencies = []
+        self.results = []
+
+    def __call__(self, func, *args, **kwargs):
+        start = time.monotonic()
+        result = func(*args, **kwargs)
+        self.latencies.append(time.monotonic() - start)
+        self.results.append(result)
+        return result
+
+
+class Context(object):
+    """State shared by the scenarios run against one server."""
+
+    def __init__(self, endpoint, shares, bulk, finds):
+        self.endpoint = endpoint
+        self.cs = client.Client(
+            api_versions.MAX_VERSION, input_auth_token='benchmark',
+            service_catalog_url=endpoint)
+        self.shares = shares
+        self.bulk = bulk
+        self.finds = finds
+        self.runs = 0
+
+    @property
+    def share_name(self):
+        return 'share-%d' % (self.shares // 2)
+
+    def new_ip(self, index=0):
+        self.runs += 1
+        return '10.%d.%d.%d' % (self.runs % 250, index // 250 % 250,
+                                index % 250 + 1)
+
+
+def lib_list(cs, ctx, record):
+    return len(record(cs.shares.list))
+
+
+def lib_list_summary(cs, ctx, record):
+    return len(record(cs.shares.list, detailed=False))
+
+
+def lib_find_by_name(cs, ctx, record):
+    for _i in range(ctx.finds):
+        record(apiclient_utils.find_resource, cs.shares, ctx.share_name)
+    return ctx.finds
+
+
+def lib_bulk_create_delete(cs, ctx, record):
+    shares = [record(cs.shares.create, 'NFS', 1, name='bench-%d' % i)
+              for i in range(ctx.bulk)]
+    for share in shares:
+        record(cs.shares.delete, share)
+    return len(shares)
+
+
+def lib_access_allow(cs, ctx, record):
+    shares = cs.shares.list(detailed=False,
+                            search_opts={'limit': ctx.bulk})
+    rules = [(share, record(cs.shares.allow, share, 'ip',
+                            ctx.new_ip(i), 'rw'))
+             for i, share in enumerate(shares)]
+    for share, rule in rules:
+        cs.shares.deny(share, rule['id'])
+    return len(rules)
+
+
+def cli_list(ctx, record):
+    record(run_cli, ctx, 'list')
+    return ctx.shares
+
+
+def cli_show_by_name(ctx, record):
+    record(run_cli, ctx, 'show', ctx.share_name)
+    return 1
+
+
+def cli_create_delete(ctx, record):
+    name = 'bench-cli-%d' % ctx.runs
+    ctx.runs += 1
+    record(run_cli, ctx, 'create', 'NFS', '1', '--name', name)
+    record(run_cli, ctx, 'delete', name)
+    return 1
+
+
+def cli_access_allow(ctx, record):
+    record(run_cli, ctx, 'access-allow', ctx.share_name, 'ip', ctx.new_ip())
+    return 1
+
+
+SCENARIOS = (
+    (LIBRARY, 'list', lib_list),
+    (LIBRARY, 'list summary', lib_list_summary),
+    (LIBRARY, 'find by name', lib_find_by_name),
+    (LIBRARY, 'bulk create/delete', lib_bulk_create_delete),
+    (LIBRARY, 'access allow', lib_access_allow),
+    (CLI, 'list', cli_list),
+    (CLI, 'show by name', cli_show_by_name),
+    (CLI, 'create/delete', cli_create_delete),
+    (CLI, 'access allow', cli_access_allow),
+)
+
+
+def run_cli(ctx, *args):
+    """Run a manila command and return its maximum RSS in bytes."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith('OS_')}
+    env.update({'OS_TOKEN': 'benchmark',
+                'OS_MANILA_BYPASS_URL': ctx.endpoint})
+    with open(os.devnull, 'w') as devnull:
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'manilaclient.shell'] + list(args),
+            stdout=devnull, stderr=subprocess.PIPE, env=env)
+        _pid, status, rusage = os.wait4(proc.pid, 0)
+        error = proc.stderr.read()
+        proc.stderr.close()
+    if status:
+        raise RuntimeError("'manila %s' failed: %s" % (
+            ' '.join(args), error.decode('utf-8', 'replace')))
+    # NOTE: ru_maxrss is in KiB on Linux.
+    return rusage.ru_maxrss * 1024
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = int(round(percent / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+def run_scenario(mode, func, ctx, repeat):
+    """Run a scenario and return its best timed run and peak memory."""
+    best = None
+    peak = 0
+    for _i in range(repeat):
+        record = Recorder()
+        if mode == LIBRARY:
+            items = func(ctx.cs, ctx, record)
+        else:
+            items = func(ctx, record)
+            peak = max([peak] + record.results)
+        if best is None or sum(record.latencies) < sum(best[1]):
+            best = items, record.latencies
+
+    if mode == LIBRARY:
+        tracemalloc.start()
+        try:
+            func(ctx.cs, ctx, Recorder())
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    items, latencies = best
+    total = sum(latencies)
+    return {
+        'ops': len(latencies),
+        'items': items,
+        'time': total,
+        'items_per_second': items / total if total else None,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'peak_memory_mib': peak / 1048576.0,
+    }
+
+
+def start_server(shares, latency):
+    proc = subprocess.Popen(
+        [sys.executable, '-m', fake_server.__name__,
+         '--shares', str(shares), '--latency', str(latency)],
+        stdout=subprocess.PIPE)
+    endpoint = proc.stdout.readline().decode('utf-8').strip()
+    if not endpoint:
+        proc.kill()
+        raise RuntimeError('The fake manila API server failed to start.')
+    return proc, endpoint
+
+
+def run(shares=(10000, 100000), latency=0.0, repeat=3, bulk=100, finds=5,
+        modes=(LIBRARY, CLI)):
+    results = []
+    for count in shares:
+        proc, endpoint = start_server(count, latency)
+        try:
+            ctx = Context(endpoint, count, bulk, finds)
+            for mode, name, func in SCENARIOS:
+                if mode not in modes:
+                    continue
+                result = run_scenario(mode, func, ctx, repeat)
+                result.update(mode=mode, scenario=name, shares=count)
+                print_result(result)
+                results.append(result)
+        finally:
+            proc.terminate()
+            proc.wait()
+    return results
+
+
+def print_result(result):
+    print("%(shares)7d shares  %(mode)-7s  %(scenario)-18s  %(ops)4d ops  "
+          "%(time)8.3f s  %(rate)10s items/s  p50 %(p50_ms)8.1f ms  "
+          "p95 %(p95_ms)8.1f ms  peak %(peak_memory_mib)7.1f MiB" % dict(
+              result, rate='%.1f' % result['items_per_second']))
+    sys.stdout.flush()
+
+
+def compare(results, baseline, tolerance):
+    """Return descriptions of the results worse than the baseline."""
+    def key(result):
+        return result['mode'], result['scenario'], result['shares']
+
+    baseline = {key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        reference = baseline.get(key(result))
+        if reference is None:
+            continue
+        for metric in ('time', 'peak_memory_mib'):
+            if result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(
+                    '%s %s with %d shares: %s %.3f > %.3f' % (
+                        result['mode'], result['scenario'], result['shares'],
+                        metric, result[metric], reference[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--shares', type=int, nargs='+',
+                        default=[10000, 100000],
+                        help='Dataset sizes to benchmark.')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds the fake server delays responses by.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of timed runs per scenario.')
+    parser.add_argument('--bulk', type=int, default=100,
+                        help='Number of shares of the bulk scenarios.')
+    parser.add_argument('--finds', type=int, default=5,
+                        help='Number of lookups of the find scenario.')
+    parser.add_argument('--mode', choices=(LIBRARY, CLI), action='append',
+                        help='Only run the library or the CLI scenarios.')
+    parser.add_argument('--output',
+                        help='File to write the results to as JSON.')
+    parser.add_argument('--compare',
+                        help='JSON results of a previous run to compare to.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative slowdown allowed by --compare.')
+    args = parser.parse_args()
+
+    results = run(args.shares, args.latency, args.repeat, args.bulk,
+                  args.finds, args.mode or (LIBRARY, CLI))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: %s' % regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sys
+
+import ddt
+import fixtures
+import six
+
+from manilaclient.common.apiclient import base as common_base
+from manilaclient.common import cliutils
+from manilaclient.tests.unit import utils
+
+
+def fake_resource(resource_id, name, **kwargs):
+    info = {'id': resource_id, 'name': name}
+    info.update(kwargs)
+    return common_base.Resource(None, info, loaded=True)
+
+
+@ddt.ddt
+class PrintTest(utils.TestCase):
+
+    def setUp(self):
+        super(PrintTest, self).setUp()
+        self.stdout = six.StringIO()
+        self.useFixture(fixtures.MonkeyPatch('sys.stdout', self.stdout))
+        self.addCleanup(cliutils.set_output_format, cliutils.TABLE_FORMAT)
+
+    def print_list(self, objs, output_format, **kwargs):
+        cliutils.set_output_format(output_format)
+        cliutils.print_list(objs, ['ID', 'Name', 'Share Proto'], **kwargs)
+        return self.stdout.getvalue()
+
+    @ddt.data(
+        ('json', '[\n  {"ID": "1", "Name": "a", "Share Proto": "NFS"},\n'
+                 '  {"ID": "2", "Name": "b c", "Share Proto": ""}\n]\n'),
+        ('jsonl', '{"ID": "1", "Name": "a", "Share Proto": "NFS"}\n'
+                  '{"ID": "2", "Name": "b c", "Share Proto": ""}\n'),
+        ('csv', 'ID,Name,Share Proto\r\n1,a,NFS\r\n2,b c,\r\n'),
+        ('value', '1 a NFS\n2 b c \n'),
+    )
+    @ddt.unpack
+    def test_print_list(self, output_format, expected):
+        objs = [fake_resource('1', 'a', share_proto='NFS'),
+                fake_resource('2', 'b c')]
+
+        self.assertEqual(expected, self.print_list(objs, output_format))
+
+    def test_print_list_streams_rows(self):
+        def objs():
+            yield fake_resource('1', 'a')
+            self.assertEqual('1 a \n', self.stdout.getvalue())
+            yield fake_resource('2', 'b')
+
+        self.assertEqual('1 a \n2 b \n', self.print_list(objs(), 'value'))
+
+    def test_print_list_empty_json(self):
+        self.assertEqual('[]\n', self.print_list([], 'json'))
+
+    def test_print_list_formatters(self):
+        output = self.print_list(
+            [fake_resource('1', 'a', share_proto='NFS')], 'jsonl',
+            formatters={'Name': lambda o: {'name': o.name}})
+
+        self.assertEqual('{"ID": "1", "Name": {"name": "a"}, '
+                         '"Share Proto": "NFS"}\n', output)
+
+    def test_print_list_table(self):
+        output = self.print_list(
+            [fake_resource('2', 'b'), fake_resource('1', 'a')], 'table')
+
+        lines = output.splitlines()
+        self.assertIn('| ID | Name | Share Proto |', lines)
+        self.assertLess(lines.index('| 1  | a    |             |'),
+                        lines.index('| 2  | b    |             |'))
+
+    @ddt.data(
+        ('json', '{\n  "id": "1",\n  "size": 1\n}\n'),
+        ('jsonl', '{"id": "1", "size": 1}\n'),
+        ('csv', 'Property,Value\r\nid,1\r\nsize,1\r\n'),
+        ('value', 'id 1\nsize 1\n'),
+    )
+    @ddt.unpack
+    def test_print_dict(self, output_format, expected):
+        cliutils.set_output_format(output_format)
+
+        cliutils.print_dict({'id': '1', 'size': 1})
+
+        self.assertEqual(expected, self.stdout.getvalue())
+
+    @ddt.data(('table', 'foo\n', ''), ('json', '', 'foo\n'))
+    @ddt.unpack
+    def test_diagnostic_output(self, output_format, stdout, stderr):
+        self.useFixture(fixtures.MonkeyPatch('sys.stderr', six.StringIO()))
+        cliutils.set_output_format(output_format)
+
+        with cliutils.diagnostic_output():
+            print('foo')
+
+        self.assertEqual(stdout, self.stdout.getvalue())
+        self.assertEqual(stderr, sys.stderr.getvalue())
+        self.assertIs(self.stdout, sys.stdout)
+
+    def test_set_output_format_invalid(self):
+        self.assertRaises(ValueError, cliutils.set_output_format, 'yaml')
@@ -0,0 +1,140 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import argparse
+import os
+import subprocess
+
+import ddt
+import fixtures
+import testtools
+
+from manilaclient.common import completion
+from manilaclient.tests.unit import utils
+
+
+def find_bash():
+    for path in os.environ.get('PATH', '').split(os.pathsep):
+        if os.access(os.path.join(path, 'bash'), os.X_OK):
+            return os.path.join(path, 'bash')
+
+
+@ddt.ddt
+class CompletionTest(utils.TestCase):
+
+    def setUp(self):
+        super(CompletionTest, self).setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable(
+            'MANILACLIENT_UUID_CACHE_DIR', self.cache_dir))
+        self.useFixture(fixtures.EnvironmentVariable(
+            'manilaclient_UUID_CACHE_DIR'))
+
+        self.parser = argparse.ArgumentParser()
+        self.parser.add_argument('--debug', action='store_true')
+        self.parser.add_argument('--os-username')
+        self.parser.add_argument('--os_username', help=argparse.SUPPRESS)
+        subparsers = self.parser.add_subparsers()
+        self.subcommands = {}
+        for command, positional, options in (
+                ('show', 'share', []),
+                ('snapshot-show', 'snapshot', []),
+                ('create', 'share_protocol',
+                 ['--snapshot-id', '--name', '--share-network']),
+                ('bash-completion', None, [])):
+            sc = subparsers.add_parser(command)
+            if positional:
+                sc.add_argument(positional)
+            for option in options:
+                sc.add_argument(option)
+            sc.add_argument('--wait', action='store_true')
+            self.subcommands[command] = sc
+
+    def test_get_spec(self):
+        spec = completion.get_spec(self.parser, self.subcommands)
+
+        self.assertEqual(['-h', '--help', '--debug', '--os-username'],
+                         spec['options'])
+        self.assertEqual({'show', 'snapshot-show', 'create'},
+                         set(spec['commands']))
+        self.assertIn('--snapshot-id', spec['commands']['create'])
+        self.assertEqual({'show': 'share', 'snapshot-show': 'sharesnapshot',
+                          'create': completion.NO_RESOURCE},
+                         spec['positional'])
+        self.assertEqual('sharesnapshot',
+                         spec['values']['create:--snapshot-id'])
+        self.assertEqual('sharenetwork',
+                         spec['values']['create:--share-network'])
+        self.assertEqual(completion.NO_RESOURCE,
+                         spec['values'][':--os_username'])
+        self.assertNotIn('create:--wait', spec['values'])
+
+    @ddt.data(('bash', None), ('zsh', '2.40'))
+    @ddt.unpack
+    def test_write_script(self, shell, api_version):
+        spec = completion.get_spec(self.parser, self.subcommands)
+        script = completion.generate_script(shell, spec, api_version)
+
+        path = completion.write_script(shell, script, api_version)
+
+        self.assertEqual(os.path.join(
+            self.cache_dir, 'completion', 'manila-%s.%s' % (
+                api_version or 'default', shell)), path)
+        with open(path) as f:
+            self.assertEqual(script, f.read())
+        self.assertIn("_manila_opts[create]='--help --name --share-network "
+                      "--snapshot-id --wait -h'", script)
+        self.assertIn('_manila_positional[show]=share', script)
+        self.assertNotIn('_manila_positional[create]', script)
+
+    @testtools.skipUnless(find_bash(), 'bash is not available')
+    @ddt.data(
+        (['s'], ['show', 'snapshot-show']),
+        (['show', ''], ['share-a', 'share-b', 'ID-1']),
+        (['snapshot-show', ''], ['snap-a']),
+        (['create', 'NFS', '--snapshot-id', 's'], ['snap-a']),
+        (['create', 'NFS', '--name', ''], []),
+        (['create', '--sn'], ['--snapshot-id']),
+        (['--os-username', 'show', 'sh'], ['show']),
+    )
+    @ddt.unpack
+    def test_bash_completion(self, words, expected):
+        spec = completion.get_spec(self.parser, self.subcommands)
+        completion.write_script(
+            'bash', completion.generate_script('bash', spec))
+        # NOTE: the names cached for several endpoints, or that are human IDs
+        # too, are completed once, and the IDs of removed resources are not.
+        for endpoint, resource, lines in (
+                ('endpoint', 'share', ['ID-1\tshare-a\t', 'share-b\t\t']),
+                ('endpoint', 'sharesnapshot', ['snap-a\t\t']),
+                ('other', 'share', ['ID-1\tshare-a\tshare-a', 'ID-2'])):
+            endpoint_dir = os.path.join(self.cache_dir, endpoint)
+            if not os.path.isdir(endpoint_dir):
+                os.mkdir(endpoint_dir)
+            with open(os.path.join(endpoint_dir,
+                                   '%s.tsv' % resource), 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+
+        command = (
+            'manila() { regenerated=1; }; %s\n'
+            'COMP_WORDS=(manila "$@"); COMP_CWORD=$#; _manila\n'
+            'echo "${COMPREPLY[@]}"\n'
+            '[[ -z $regenerated ]] || echo regenerated >&2'
+            % completion._LOADERS['bash'])
+        env = dict(os.environ, OS_SHARE_API_VERSION='')
+        proc = subprocess.Popen(
+            [find_bash(), '-c', command, 'bash'] + words,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        out, err = proc.communicate()
+
+        self.assertEqual(b'', err)
+        self.assertEqual(sorted(expected), sorted(out.decode().split()))
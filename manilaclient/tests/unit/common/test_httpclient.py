@@ -17,10 +17,12 @@ import requests
 
 import manilaclient
 from manilaclient.common import httpclient
+from manilaclient.common import jsoncodec
 from manilaclient import exceptions
 from manilaclient.tests.unit import utils
 
 fake_user_agent = "fake"
+FAKE_UUID = "b2d18606-2673-4965-885a-4f5a8b955b9b"
 
 fake_response = utils.TestResponse({
     "status_code": 200,
@@ -73,10 +75,12 @@ retry_after_non_supporting_mock_request = mock.Mock(
     return_value=retry_after_non_supporting_response)
 
 
-def get_authed_client(endpoint_url="http://example.com", retries=0):
+def get_authed_client(endpoint_url="http://example.com", retries=0,
+                      json_codec='stdlib'):
     cl = httpclient.HTTPClient(endpoint_url, "token", fake_user_agent,
                                retries=retries, http_log_debug=True,
-                               api_version=manilaclient.API_MAX_VERSION)
+                               api_version=manilaclient.API_MAX_VERSION,
+                               json_codec=json_codec)
     return cl
 
 
@@ -235,3 +239,147 @@ class ClientTest(utils.TestCase):
                                       endpoint_url)[0] + "/", cl.base_url)
 
         test_post_call()
+
+    def test_default_json_codec(self):
+        cl = get_authed_client(json_codec=None)
+
+        self.assertIs(jsoncodec.get_codec(), cl.json_codec)
+
+    @ddt.data(*jsoncodec.available_codecs())
+    def test_get_decodes_raw_content(self, codec_name):
+        cl = get_authed_client(json_codec=codec_name)
+        response = mock.Mock(status_code=200, content=b'{"hi": "there"}')
+        type(response).text = mock.PropertyMock(
+            side_effect=AssertionError("text must not be used"))
+        cl.http_log_debug = False
+
+        with mock.patch.object(requests, "request",
+                               mock.Mock(return_value=response)):
+            resp, body = cl.get("/hi")
+
+        self.assertEqual(codec_name, cl.json_codec.name)
+        self.assertEqual({"hi": "there"}, body)
+
+    def test_get_non_json_content(self):
+        cl = get_authed_client()
+        response = utils.TestResponse({"status_code": 200, "text": "foo"})
+
+        with mock.patch.object(requests, "request",
+                               mock.Mock(return_value=response)):
+            resp, body = cl.get("/hi")
+
+        self.assertIsNone(body)
+
+    def _get_hooked_client(self, retries=0):
+        cl = get_authed_client(retries=retries)
+        events = []
+        for hook_type in httpclient.HOOK_TYPES:
+            cl.add_hook(hook_type,
+                        lambda info, t=hook_type: events.append(
+                            (t, info.to_dict())))
+        return cl, events
+
+    def test_hooks_successful_request(self):
+        cl, events = self._get_hooked_client()
+        response = utils.TestResponse({
+            "status_code": 200,
+            "text": '{"share": {}}',
+            "x-openstack-request-id": "req-1",
+        })
+
+        with mock.patch.object(requests, "request",
+                               mock.Mock(return_value=response)):
+            cl.post("/shares/%s/action" % FAKE_UUID, body={"extend": {}})
+
+        self.assertEqual([httpclient.PRE_REQUEST, httpclient.POST_RESPONSE],
+                         [e[0] for e in events])
+        pre, post = events[0][1], events[1][1]
+        self.assertEqual('/shares/{id}/action', pre['url_template'])
+        self.assertEqual('POST', pre['method'])
+        self.assertEqual(self.max_version_str, pre['api_version'])
+        self.assertEqual(len('{"extend": {}}'), pre['request_bytes'])
+        self.assertIsNone(pre['status_code'])
+        self.assertEqual(200, post['status_code'])
+        self.assertEqual(len('{"share": {}}'), post['response_bytes'])
+        self.assertEqual('req-1', post['request_id'])
+        self.assertEqual(1, post['attempt'])
+        self.assertIsNotNone(post['elapsed'])
+        self.assertIsNotNone(post['started_at'])
+
+    def test_hooks_retry_and_error(self):
+        cl, events = self._get_hooked_client(retries=1)
+        self.mock_object(httpclient, 'sleep')
+
+        with mock.patch.object(requests, "request", bad_500_request):
+            self.assertRaises(exceptions.ClientException,
+                              cl.get, "/shares/detail?limit=1")
+
+        self.assertEqual(
+            [httpclient.PRE_REQUEST, httpclient.POST_RESPONSE,
+             httpclient.ERROR, httpclient.RETRY,
+             httpclient.PRE_REQUEST, httpclient.POST_RESPONSE,
+             httpclient.ERROR],
+            [e[0] for e in events])
+        retry = events[3][1]
+        self.assertEqual('/shares/detail', retry['url_template'])
+        self.assertEqual(1, retry['attempt'])
+        self.assertEqual(1, retry['retry_delay'])
+        self.assertIsInstance(retry['exception'], exceptions.ClientException)
+        self.assertEqual(2, events[-1][1]['attempt'])
+        self.assertEqual(500, events[-1][1]['status_code'])
+
+    def test_hooks_connection_error(self):
+        cl, events = self._get_hooked_client()
+        error = requests.exceptions.ConnectionError()
+
+        with mock.patch.object(requests, "request",
+                               mock.Mock(side_effect=error)):
+            self.assertRaises(requests.exceptions.ConnectionError,
+                              cl.get, "/shares")
+
+        self.assertEqual([httpclient.PRE_REQUEST, httpclient.ERROR],
+                         [e[0] for e in events])
+        self.assertIs(error, events[1][1]['exception'])
+        self.assertIsNone(events[1][1]['status_code'])
+
+    def test_failing_hook_does_not_break_request(self):
+        cl = get_authed_client()
+        cl.add_hook(httpclient.POST_RESPONSE,
+                    mock.Mock(side_effect=Exception("boom")))
+
+        with mock.patch.object(requests, "request", mock_request):
+            resp, body = cl.get("/hi")
+
+        self.assertEqual({"hi": "there"}, body)
+
+    def test_remove_hook(self):
+        cl = get_authed_client()
+        hook = mock.Mock()
+        cl.add_hook(httpclient.PRE_REQUEST, hook)
+        cl.remove_hook(httpclient.PRE_REQUEST, hook)
+
+        with mock.patch.object(requests, "request", mock_request):
+            cl.get("/hi")
+
+        self.assertFalse(hook.called)
+
+    def test_add_hook_invalid_type(self):
+        cl = get_authed_client()
+
+        self.assertRaises(ValueError, cl.add_hook, 'fake', mock.Mock())
+
+    @ddt.data(
+        ('', '/'),
+        ('/shares', '/shares'),
+        ('/shares/detail?all_tenants=1', '/shares/detail'),
+        ('/shares/%s/metadata/key' % FAKE_UUID, '/shares/{id}/metadata/key'),
+        ('/os-quota-sets/1234abcd1234abcd1234abcd1234abcd',
+         '/os-quota-sets/{id}'),
+        ('/limits/42', '/limits/{id}'),
+    )
+    @ddt.unpack
+    def test_get_url_template(self, path, expected):
+        cl = get_authed_client()
+
+        self.assertEqual(expected,
+                         cl._get_url_template(cl.endpoint_url + path))
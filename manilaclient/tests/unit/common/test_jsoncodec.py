@@ -0,0 +1,78 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+import ddt
+import mock
+
+from manilaclient.common import jsoncodec
+from manilaclient.tests.unit import utils
+
+
+@ddt.ddt
+class JSONCodecTest(utils.TestCase):
+
+    @ddt.data(*jsoncodec.available_codecs())
+    def test_round_trip(self, name):
+        codec = jsoncodec.get_codec(name)
+        data = {'share': {'name': u'föö', 'size': 1,
+                          'metadata': {'k': 'v'}, 'tags': [1, None]}}
+
+        encoded = codec.dumps(data)
+
+        self.assertEqual(data, codec.loads(encoded))
+        self.assertEqual(name, codec.name)
+
+    @ddt.data(*jsoncodec.available_codecs())
+    def test_loads_bytes(self, name):
+        codec = jsoncodec.get_codec(name)
+
+        result = codec.loads(u'{"name": "föö"}'.encode('utf-8'))
+
+        self.assertEqual({'name': u'föö'}, result)
+
+    @ddt.data(*jsoncodec.available_codecs())
+    def test_loads_invalid(self, name):
+        codec = jsoncodec.get_codec(name)
+
+        self.assertRaises(ValueError, codec.loads, b'<html></html>')
+
+    @ddt.data(*jsoncodec.available_codecs())
+    def test_dumps_primitives(self, name):
+        codec = jsoncodec.get_codec(name)
+        data = {1: datetime.datetime(2019, 1, 2, 3, 4, 5)}
+
+        result = jsoncodec.get_codec('stdlib').loads(codec.dumps(data))
+
+        self.assertEqual(['1'], list(result))
+        self.assertIn('2019-01-02', result['1'])
+
+    def test_get_codec_default(self):
+        codec = jsoncodec.get_codec()
+
+        self.assertEqual(jsoncodec.available_codecs()[0], codec.name)
+        self.assertIs(codec, jsoncodec.get_codec())
+
+    def test_get_codec_unknown(self):
+        self.assertRaises(ValueError, jsoncodec.get_codec, 'fake')
+
+    @mock.patch.object(jsoncodec, 'orjson', None)
+    def test_available_codecs_without_orjson(self):
+        self.assertEqual(['stdlib'], jsoncodec.available_codecs())
+        self.assertRaises(ImportError, jsoncodec.get_codec, 'orjson')
+
+    @mock.patch.object(jsoncodec, '_default_codec', None)
+    @mock.patch.object(jsoncodec, 'orjson', None)
+    def test_get_codec_default_without_orjson(self):
+        self.assertIsInstance(jsoncodec.get_codec(),
+                              jsoncodec.StdlibJSONCodec)
@@ -0,0 +1,204 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import ddt
+import fixtures
+import mock
+
+from manilaclient.common.apiclient import base as common_base
+from manilaclient.common.apiclient import exceptions
+from manilaclient.common.apiclient import utils as apiclient_utils
+from manilaclient.common import lookup
+from manilaclient.tests.unit import utils
+
+ENDPOINT = 'http://127.0.0.1:8786/v2'
+
+
+class FakeResource(common_base.Resource):
+    HUMAN_ID = True
+
+
+def fake_resource(resource_id, name=None):
+    info = {'id': resource_id}
+    if name is not None:
+        info['name'] = name
+    return FakeResource(None, info, loaded=True)
+
+
+@ddt.ddt
+class LookupStoreTest(utils.TestCase):
+
+    def setUp(self):
+        super(LookupStoreTest, self).setUp()
+        self.store = lookup.LookupStore(
+            self.useFixture(fixtures.TempDir()).path)
+
+    def read(self):
+        with open(self.store.get_path(ENDPOINT, 'share')) as f:
+            return f.read().splitlines()
+
+    def test_update(self):
+        self.store.update(ENDPOINT, 'share', [
+            fake_resource('1', 'My Share'), fake_resource('2'),
+            common_base.Resource(None, {'name': 'no-id'})])
+
+        self.assertEqual(['1\tMy Share\tmy-share', '2\t\t'], self.read())
+        self.assertEqual(['1'], self.store.find(ENDPOINT, 'share', 'My Share'))
+        self.assertEqual(['1'], self.store.find(ENDPOINT, 'share', 'my-share'))
+        self.assertEqual(['2'], self.store.find(ENDPOINT, 'share', '2'))
+        self.assertEqual([], self.store.find(ENDPOINT, 'share', 'no-id'))
+        self.assertEqual([], self.store.find(ENDPOINT, 'snapshot', '1'))
+        self.assertEqual([], self.store.find('http://other', 'share', '1'))
+
+    def test_update_merges(self):
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a'),
+                                              fake_resource('2', 'b')])
+
+        mock_write = self.mock_object(self.store, '_write')
+
+        self.store.update(ENDPOINT, 'share', [fake_resource('2', 'a'),
+                                              fake_resource('3', 'c')])
+
+        self.assertFalse(mock_write.called)
+        self.assertEqual(['1\ta\ta', '2\tb\tb', '2\ta\ta', '3\tc\tc'],
+                         self.read())
+        self.assertEqual(['1', '2'], self.store.find(ENDPOINT, 'share', 'a'))
+        self.assertEqual([], self.store.find(ENDPOINT, 'share', 'b'))
+        # NOTE: another process parses the appended lines the same way.
+        store = lookup.LookupStore(self.store.cache_dir)
+        self.assertEqual(['1', '2'], store.find(ENDPOINT, 'share', 'a'))
+        self.assertEqual([], store.find(ENDPOINT, 'share', 'b'))
+
+    def test_update_replaces(self):
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a')])
+
+        self.store.update(ENDPOINT, 'share', [fake_resource('2', 'b')],
+                          replace=True)
+
+        self.assertEqual(['2\tb\tb'], self.read())
+
+    def test_update_unchanged(self):
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a')])
+        mock_write = self.mock_object(self.store, '_write')
+
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a')])
+
+        self.assertFalse(mock_write.called)
+
+    @ddt.data('tab\there', 'new\nline', 42)
+    def test_update_invalid_name(self, name):
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', name)])
+
+        self.assertEqual(['1\t\t'], self.read())
+
+    def test_remove(self):
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a'),
+                                              fake_resource('2', 'b')])
+
+        self.store.remove(ENDPOINT, 'share', '1')
+        self.store.remove(ENDPOINT, 'share', 'unknown')
+
+        self.assertEqual(['1\ta\ta', '2\tb\tb', '1'], self.read())
+        self.assertEqual([], self.store.find(ENDPOINT, 'share', 'a'))
+        store = lookup.LookupStore(self.store.cache_dir)
+        self.assertEqual([], store.find(ENDPOINT, 'share', '1'))
+        self.assertEqual(['2'], store.find(ENDPOINT, 'share', 'b'))
+
+    def test_update_compacts(self):
+        self.mock_object(lookup, 'COMPACT_MIN', 1)
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a')])
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'b')])
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'c')])
+
+        self.assertEqual(['1\ta\ta', '1\tb\tb', '1\tc\tc'], self.read())
+
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'd')])
+
+        self.assertEqual(['1\td\td'], self.read())
+        self.assertEqual(['1'], self.store.find(ENDPOINT, 'share', 'd'))
+
+    def test_get_index_cached(self):
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a')])
+        index = self.store.get_index(ENDPOINT, 'share')
+
+        self.assertIs(index, self.store.get_index(ENDPOINT, 'share'))
+
+        mock_open = self.mock_object(lookup, 'open', mock.Mock(
+            side_effect=open), create=True)
+        self.store.update(ENDPOINT, 'share', [fake_resource('2', 'bb')])
+
+        self.assertEqual(['2'], self.store.find(ENDPOINT, 'share', 'bb'))
+        # NOTE: the file appended to is not read again.
+        self.assertEqual([mock.call(mock.ANY, 'a')],
+                         mock_open.call_args_list)
+        self.assertIs(index, self.store.get_index(ENDPOINT, 'share'))
+
+    def test_unwritable_directory(self):
+        self.store.cache_dir = '/dev/null/manilaclient'
+
+        self.store.update(ENDPOINT, 'share', [fake_resource('1', 'a')])
+
+        self.assertEqual([], self.store.find(ENDPOINT, 'share', 'a'))
+
+
+class FindCachedResourceTest(utils.TestCase):
+
+    def setUp(self):
+        super(FindCachedResourceTest, self).setUp()
+        self.manager = mock.Mock(spec=['get', 'find', 'lookup_cached_ids',
+                                       'update_lookup_cache',
+                                       'remove_from_lookup_cache',
+                                       'resource_class'])
+        self.manager.resource_class = FakeResource
+        self.manager.get.side_effect = self.get
+        self.manager.find.side_effect = exceptions.NotFound(404)
+        self.manager.lookup_cached_ids.return_value = ['1234']
+        self.resources = {'1234': fake_resource('1234', 'sharename')}
+
+    def get(self, resource_id):
+        try:
+            return self.resources[resource_id]
+        except KeyError:
+            raise exceptions.NotFound(404)
+
+    def test_cached(self):
+        resource = apiclient_utils.find_resource(self.manager, 'sharename')
+
+        self.assertEqual('1234', resource.id)
+        self.manager.lookup_cached_ids.assert_called_once_with('sharename')
+        self.assertFalse(self.manager.find.called)
+
+    def test_deleted(self):
+        del self.resources['1234']
+
+        self.assertRaises(exceptions.CommandError,
+                          apiclient_utils.find_resource,
+                          self.manager, 'sharename')
+        self.manager.remove_from_lookup_cache.assert_called_once_with('1234')
+        self.assertTrue(self.manager.find.called)
+
+    def test_renamed(self):
+        self.resources['1234'] = fake_resource('1234', 'newname')
+
+        self.assertRaises(exceptions.CommandError,
+                          apiclient_utils.find_resource,
+                          self.manager, 'sharename')
+        self.manager.update_lookup_cache.assert_called_once_with(
+            [self.resources['1234']])
+
+    def test_ambiguous(self):
+        self.manager.lookup_cached_ids.return_value = ['1', '2']
+
+        self.assertRaises(exceptions.CommandError,
+                          apiclient_utils.find_resource,
+                          self.manager, 'sharename')
+        self.assertTrue(self.manager.find.called)
@@ -0,0 +1,143 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+import requests
+
+import manilaclient
+from manilaclient.common import httpclient
+from manilaclient.common import metrics
+from manilaclient import exceptions
+from manilaclient.tests.unit import utils
+
+
+def get_info(method='GET', url_template='/shares/detail', elapsed=0.2,
+             status_code=200, **kwargs):
+    info = httpclient.RequestInfo(method, 'http://fake' + url_template,
+                                  url_template, '2.51')
+    info.elapsed = elapsed
+    info.status_code = status_code
+    for k, v in kwargs.items():
+        setattr(info, k, v)
+    return info
+
+
+class HistogramTest(utils.TestCase):
+
+    def test_observe(self):
+        histogram = metrics.Histogram(buckets=(0.1, 1.0, float('inf')))
+
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        result = histogram.to_dict()
+        self.assertEqual(4, result['count'])
+        self.assertEqual(0.05, result['min'])
+        self.assertEqual(3.0, result['max'])
+        self.assertAlmostEqual(1.0625, result['avg'])
+        self.assertEqual([1, 2, 1], list(result['buckets'].values()))
+        self.assertEqual(1.0, result['p50'])
+        self.assertEqual(3.0, result['p95'])
+
+    def test_empty(self):
+        result = metrics.Histogram().to_dict()
+
+        self.assertEqual(0, result['count'])
+        self.assertIsNone(result['avg'])
+        self.assertIsNone(result['p95'])
+
+
+class MetricsRegistryTest(utils.TestCase):
+
+    def setUp(self):
+        super(MetricsRegistryTest, self).setUp()
+        self.registry = metrics.MetricsRegistry()
+
+    def test_hooks(self):
+        self.registry._on_pre_request(get_info(request_bytes=10))
+        self.registry._on_response(get_info(response_bytes=100,
+                                            request_id='req-1'))
+        self.registry._on_pre_request(get_info(method='POST'))
+        self.registry._on_retry(get_info(method='POST'))
+        self.registry._on_error(get_info(method='POST', status_code=None,
+                                         elapsed=1.5))
+
+        snapshot = self.registry.snapshot()
+
+        self.assertEqual({'requests': 2, 'retries': 1, 'errors': 1,
+                          'request_bytes': 10, 'response_bytes': 100,
+                          'implicit_fetches': 0},
+                         snapshot['counters'])
+        self.assertEqual(['GET /shares/detail', 'POST /shares/detail'],
+                         list(snapshot['endpoints']))
+        self.assertEqual(['GET', 'POST'], list(snapshot['methods']))
+        self.assertEqual(1.5, snapshot['methods']['POST']['sum'])
+        self.assertEqual(2, len(snapshot['records']))
+        self.assertEqual('req-1', snapshot['records'][0]['request_id'])
+        self.assertAlmostEqual(1.7, self.registry.api_time)
+
+    def test_error_with_response_not_observed_twice(self):
+        self.registry._on_response(get_info(status_code=500))
+        self.registry._on_error(get_info(status_code=500))
+
+        self.assertEqual(1, self.registry.snapshot()['methods']['GET'][
+            'count'])
+
+    def test_records_are_bounded(self):
+        registry = metrics.MetricsRegistry(max_records=2)
+
+        for i in range(3):
+            registry._on_response(get_info(request_id=i))
+
+        self.assertEqual([1, 2], [r['request_id'] for r in
+                                  registry.snapshot()['records']])
+
+    def test_timer(self):
+        with self.registry.timer(metrics.AUTH_TIMER):
+            pass
+        self.registry.add_time(metrics.AUTH_TIMER, 1.0)
+
+        timers = self.registry.snapshot()['timers']
+        self.assertGreaterEqual(timers[metrics.AUTH_TIMER], 1.0)
+
+    def test_timer_without_registry(self):
+        with metrics.timer(None, metrics.AUTH_TIMER):
+            pass
+
+    def test_reset(self):
+        self.registry._on_response(get_info())
+
+        self.registry.reset()
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual({}, dict(snapshot['endpoints']))
+        self.assertEqual(0, snapshot['counters']['requests'])
+
+    def test_attach_and_detach(self):
+        cl = httpclient.HTTPClient('http://example.com', 'token', 'fake',
+                                   api_version=manilaclient.API_MAX_VERSION)
+        response = utils.TestResponse({'status_code': 404, 'text': '{}'})
+        self.registry.attach(cl)
+
+        with mock.patch.object(requests, 'request',
+                               mock.Mock(return_value=response)):
+            self.assertRaises(exceptions.NotFound, cl.get, '/shares/1')
+            self.registry.detach(cl)
+            self.assertRaises(exceptions.NotFound, cl.get, '/shares/1')
+
+        snapshot = self.registry.snapshot()
+        self.assertEqual(1, snapshot['counters']['requests'])
+        self.assertEqual(1, snapshot['counters']['errors'])
+        self.assertEqual(['GET /shares/{id}'], list(snapshot['endpoints']))
+
+    def test_get_registry(self):
+        self.assertIs(metrics.get_registry(), metrics.get_registry())
@@ -0,0 +1,110 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from manilaclient.common import profiling
+from manilaclient.tests.unit import utils
+
+
+class ProfilerTest(utils.TestCase):
+
+    def setUp(self):
+        super(ProfilerTest, self).setUp()
+        self.mock_time = self.mock_object(profiling.time, 'monotonic')
+
+    def test_nested_phases(self):
+        self.mock_time.side_effect = [0.0, 1.0, 3.0, 4.0]
+        profiler = profiling.Profiler()
+        profiler.start()
+
+        with profiling.phase('outer'):
+            with profiling.phase('inner'):
+                pass
+        profiler.stop()
+
+        self.assertEqual({'outer': 2.0, 'inner': 2.0}, dict(profiler.times))
+        self.assertIsNone(profiling._active_profiler)
+
+    def test_inclusive_phase(self):
+        self.mock_time.side_effect = [0.0, 4.0, 5.0, 7.0]
+        profiler = profiling.Profiler()
+        profiler.start()
+
+        with profiling.phase('outer', inclusive=True):
+            with profiling.phase('inner'):
+                with profiling.phase('innermost'):
+                    pass
+        with profiling.phase('inner'):
+            pass
+        profiler.stop()
+
+        self.assertEqual({'outer': 4.0, 'inner': 2.0}, dict(profiler.times))
+
+    def test_timed(self):
+        self.mock_time.side_effect = [0.0, 0.5, 1.0, 1.5]
+
+        @profiling.timed('foo')
+        def foo(arg):
+            return arg
+
+        profiler = profiling.Profiler()
+        profiler.start()
+        self.assertEqual('bar', foo('bar'))
+        self.assertEqual('bar', foo('bar'))
+        profiler.stop()
+
+        self.assertEqual({'foo': 1.0}, dict(profiler.times))
+
+    def test_phase_without_profiler(self):
+        with profiling.phase('foo'):
+            pass
+
+        self.assertFalse(self.mock_time.called)
+
+    def test_phase_with_exception(self):
+        self.mock_time.side_effect = [0.0, 1.0]
+        profiler = profiling.Profiler()
+        profiler.start()
+        self.addCleanup(profiler.stop)
+
+        def fail():
+            with profiling.phase('foo'):
+                raise ValueError()
+
+        self.assertRaises(ValueError, fail)
+        self.assertEqual({'foo': 1.0}, dict(profiler.times))
+
+    @mock.patch.object(profiling, 'tracemalloc')
+    def test_trace_memory(self, mock_tracemalloc):
+        self.mock_time.return_value = 0.0
+        mock_tracemalloc.is_tracing.side_effect = [False, True]
+        mock_tracemalloc.get_traced_memory.side_effect = [
+            (0, 100), (0, 300), (0, 200), (0, 50)]
+        profiler = profiling.Profiler(trace_memory=True)
+        profiler.start()
+
+        with profiling.phase('outer'):
+            with profiling.phase('inner'):
+                pass
+        profiler.stop()
+
+        self.assertEqual({'inner': 300, 'outer': 300, 'total': 300},
+                         dict(profiler.peaks))
+        mock_tracemalloc.start.assert_called_once_with()
+        mock_tracemalloc.stop.assert_called_once_with()
+
+    @mock.patch.object(profiling, 'tracemalloc', None)
+    def test_trace_memory_unavailable(self):
+        profiler = profiling.Profiler(trace_memory=True)
+
+        self.assertFalse(profiler.trace_memory)
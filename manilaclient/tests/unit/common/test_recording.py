@@ -0,0 +1,153 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+
+import fixtures
+import mock
+import requests
+
+import manilaclient
+from manilaclient.common import httpclient
+from manilaclient.common import recording
+from manilaclient import exceptions
+from manilaclient.tests.unit import utils
+
+
+class RecordingTest(utils.TestCase):
+
+    def setUp(self):
+        super(RecordingTest, self).setUp()
+        self.path = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'capture.ndjson')
+
+    def get_client(self, **kwargs):
+        return httpclient.HTTPClient(
+            'http://example.com/v2/fake', 'secret-token', 'fake-agent',
+            api_version=manilaclient.API_MAX_VERSION, **kwargs)
+
+    def read_capture(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def capture(self, responses):
+        cl = self.get_client(capture=self.path)
+        request = mock.Mock(side_effect=responses)
+        with mock.patch.object(requests, 'request', request):
+            cl.get('/shares')
+            cl.post('/shares', body={'share': {'password': 'secret'}})
+            cl.get('/shares')
+        cl.capture.close()
+        return request
+
+    def test_capture(self):
+        self.capture([
+            utils.TestResponse({'status_code': 200, 'text': '{"a": 1}'}),
+            utils.TestResponse({'status_code': 202, 'text': ''}),
+            utils.TestResponse({'status_code': 200, 'text': '{"a": 2}'}),
+        ])
+
+        entries = self.read_capture()
+        self.assertEqual(3, len(entries))
+        self.assertEqual('GET', entries[0]['method'])
+        self.assertEqual('http://example.com/v2/fake/shares',
+                         entries[0]['url'])
+        self.assertEqual('http://example.com/v2/fake', entries[0]['endpoint'])
+        self.assertEqual(recording.REDACTED,
+                         entries[0]['request_headers']['X-Auth-Token'])
+        self.assertEqual(200, entries[0]['status'])
+        self.assertEqual('{"a": 1}', entries[0]['response_body'])
+        self.assertIsNotNone(entries[0]['latency'])
+        self.assertIsNotNone(entries[0]['timestamp'])
+        self.assertNotIn('secret', entries[1]['request_body'])
+        self.assertIsNone(entries[1]['response_body'])
+
+    def test_capture_error(self):
+        error = requests.exceptions.ConnectionError('boom')
+
+        with recording.HTTPCapture(self.path) as capture:
+            cl = self.get_client(capture=capture)
+            with mock.patch.object(requests, 'request',
+                                   mock.Mock(side_effect=error)):
+                self.assertRaises(requests.exceptions.ConnectionError,
+                                  cl.get, '/shares')
+
+        self.assertTrue(capture._file.closed)
+        entry, = self.read_capture()
+        self.assertEqual('boom', entry['error'])
+        self.assertNotIn('status', entry)
+
+    def test_replay(self):
+        self.capture([
+            utils.TestResponse({'status_code': 200, 'text': '{"a": 1}'}),
+            utils.TestResponse({'status_code': 202, 'text': ''}),
+            utils.TestResponse({'status_code': 200, 'text': '{"a": 2}'}),
+        ])
+        transport = recording.ReplayTransport(self.path)
+        cl = self.get_client(transport=transport)
+
+        with mock.patch.object(requests, 'request') as mock_request:
+            first = cl.get('/shares')[1]
+            second = cl.get('/shares')[1]
+            third = cl.get('/shares')[1]
+            resp = cl.post('/shares', body={})[0]
+
+        self.assertFalse(mock_request.called)
+        self.assertEqual([{'a': 1}, {'a': 2}, {'a': 2}],
+                         [first, second, third])
+        self.assertEqual(202, resp.status_code)
+        self.assertEqual('http://example.com/v2/fake', transport.endpoint)
+
+    def test_replay_error_response(self):
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({
+                'latency': 0.5, 'method': 'GET', 'endpoint': None,
+                'url': 'http://example.com/v2/fake/shares',
+                'status': 404, 'response_headers': {},
+                'response_body': '{"itemNotFound": {}}'}) + '\n')
+        cl = self.get_client(transport=recording.ReplayTransport(self.path))
+
+        self.assertRaises(exceptions.NotFound, cl.get, '/shares')
+
+    def test_replay_missing(self):
+        self.capture([utils.TestResponse({'status_code': 200, 'text': '{}'})
+                      for i in range(3)])
+        cl = self.get_client(transport=recording.ReplayTransport(self.path))
+
+        self.assertRaises(exceptions.ClientException, cl.get, '/snapshots')
+
+    @mock.patch.object(recording.time, 'sleep')
+    def test_replay_timing(self, mock_sleep):
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({
+                'latency': 0.5, 'method': 'GET', 'endpoint': None,
+                'url': 'http://other/v2/fake/shares?limit=1',
+                'status': 200, 'response_headers': {},
+                'response_body': '{}'}) + '\n')
+        cl = self.get_client(
+            transport=recording.ReplayTransport(self.path, timing=True))
+
+        cl.get('/shares?limit=1')
+
+        mock_sleep.assert_called_once_with(0.5)
+
+    def test_replay_connection_error(self):
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({
+                'latency': 0.5, 'method': 'GET', 'endpoint': None,
+                'url': 'http://example.com/v2/fake/shares',
+                'error': 'boom'}) + '\n')
+        cl = self.get_client(transport=recording.ReplayTransport(self.path))
+
+        self.assertRaises(requests.exceptions.ConnectionError,
+                          cl.get, '/shares')
@@ -264,7 +264,7 @@ class TestShareList(TestShare):
         super(TestShareList, self).setUp()
 
         self.new_share = manila_fakes.FakeShare.create_one_share()
-        self.shares_mock.list.return_value = [self.new_share]
+        self.shares_mock.iterate.return_value = [self.new_share]
 
         self.users_mock.get.return_value = self.user
 
@@ -293,7 +293,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -304,7 +303,6 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
         return search_opts
 
@@ -325,7 +323,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -336,11 +333,15 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         self.assertEqual(self.columns, cmd_columns)
@@ -368,7 +369,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -379,14 +379,18 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
         search_opts['project_id'] = self.project.id
         search_opts['all_tenants'] = True
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         self.assertEqual(self.columns, cmd_columns)
@@ -416,7 +420,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -427,14 +430,18 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
         search_opts['project_id'] = self.project.id
         search_opts['all_tenants'] = True
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         self.assertEqual(self.columns, cmd_columns)
@@ -462,7 +469,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -473,13 +479,17 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
         search_opts['user_id'] = self.user.id
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
         self.assertEqual(self.columns, cmd_columns)
 
@@ -508,7 +518,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -519,13 +528,17 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
         search_opts['user_id'] = self.user.id
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         self.assertEqual(self.columns, cmd_columns)
@@ -553,7 +566,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -564,13 +576,17 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
         search_opts['name'] = self.new_share.name
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         self.assertEqual(self.columns, cmd_columns)
@@ -598,7 +614,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -609,13 +624,17 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
         search_opts['status'] = self.new_share.status
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         self.assertEqual(self.columns, cmd_columns)
@@ -643,7 +662,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -654,13 +672,17 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
         search_opts['all_tenants'] = True
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         self.assertEqual(self.columns, cmd_columns)
@@ -687,7 +709,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': None,
             'name': None,
             'status': None,
             'host': None,
@@ -698,11 +719,15 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': None,
         }
 
-        self.shares_mock.list.assert_called_once_with(
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
             search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
         )
 
         collist = [
@@ -770,6 +795,44 @@ class TestShareList(TestShare):
 
         self.assertEqual(data, tuple(cmd_data))
 
+    def test_share_list_summary_columns(self):
+        arglist = ['-c', 'ID', '-c', 'Name']
+        verifylist = [
+            ('columns', ['ID', 'Name']),
+            ('sort', 'name:asc'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=False,
+            search_opts=self._get_search_opts(),
+            sort_key='name',
+            sort_dir='asc',
+            marker=None,
+            limit=None,
+        )
+
+    def test_share_list_summary_columns_detail_sort(self):
+        arglist = ['-c', 'ID', '--sort', 'size:desc']
+        verifylist = [
+            ('columns', ['ID']),
+            ('sort', 'size:desc'),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        self.cmd.take_action(parsed_args)
+
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
+            search_opts=self._get_search_opts(),
+            sort_key='size',
+            sort_dir='desc',
+            marker=None,
+            limit=None,
+        )
+
     def test_share_list_with_marker_and_limit(self):
         arglist = [
             "--marker", self.new_share.id,
@@ -794,7 +857,6 @@ class TestShareList(TestShare):
             'is_public': False,
             'metadata': {},
             'extra_specs': {},
-            'limit': 2,
             'name': None,
             'status': None,
             'host': None,
@@ -805,16 +867,47 @@ class TestShareList(TestShare):
             'share_group_id': None,
             'project_id': None,
             'user_id': None,
-            'offset': self.new_share.id
         }
 
         data = self._get_data()
 
-        self.shares_mock.list.assert_called_once_with(
-            search_opts=search_opts
+        self.shares_mock.get.assert_called_with(self.new_share.id)
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
+            search_opts=search_opts,
+            sort_key='name',
+            sort_dir='asc',
+            marker=self.shares_mock.get.return_value.id,
+            limit=2,
         )
         self.assertEqual(data, tuple(cmd_data))
 
+    def test_share_list_client_sort(self):
+        shares = manila_fakes.FakeShare.create_shares(count=4)
+        shares.sort(key=lambda s: (s.status, s.name))
+        self.shares_mock.iterate.return_value = iter(shares)
+        self.shares_mock.get.return_value = shares[0]
+        arglist = [
+            '--sort', 'status,name:asc',
+            '--marker', shares[0].id,
+            '--limit', '2',
+        ]
+        verifylist = [
+            ('sort', 'status,name:asc'),
+            ('marker', shares[0].id),
+            ('limit', 2),
+        ]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+
+        cmd_columns, cmd_data = self.cmd.take_action(parsed_args)
+
+        self.shares_mock.iterate.assert_called_once_with(
+            detailed=True,
+            search_opts=self._get_search_opts(),
+        )
+        self.assertEqual([s.id for s in shares[1:3]],
+                         [row[0] for row in cmd_data])
+
     def test_share_list_negative_limit(self):
         arglist = [
             "--limit", "-2",
@@ -9,9 +9,16 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import glob
+import os
+
+import ddt
+import fixtures
 from mock import mock
 
+from manilaclient import base
 from manilaclient.common.apiclient import base as common_base
+from manilaclient.common import metrics
 from manilaclient import exceptions
 from manilaclient.tests.unit import utils
 from manilaclient.tests.unit.v2 import fakes
@@ -66,3 +73,181 @@ class BaseTest(utils.TestCase):
         cs.shares.list = mock.Mock(return_value=[])
         cs.shares.findall()
         cs.shares.list.assert_called_once_with(search_opts={'all_tenants': 1})
+
+    def test_lookup_cache(self):
+        cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable(
+            'MANILACLIENT_UUID_CACHE_DIR', cache_dir))
+        client = fakes.FakeClient()
+
+        client.shares.list()
+
+        path, = glob.glob(os.path.join(cache_dir, '*', 'share.tsv'))
+        with open(path) as f:
+            self.assertEqual(['1234\tsharename\t'], f.read().splitlines())
+        self.assertEqual(['1234'],
+                         client.shares.lookup_cached_ids('sharename'))
+
+        client.shares.delete('1234')
+
+        with open(path) as f:
+            self.assertEqual(['1234\tsharename\t', '1234'],
+                             f.read().splitlines())
+        self.assertEqual([], client.shares.lookup_cached_ids('sharename'))
+
+    def test_delete_lookup_cache(self):
+        client = fakes.FakeClient()
+        mock_remove = self.mock_object(client.shares,
+                                       'remove_from_lookup_cache')
+
+        client.shares.delete_metadata('1234', ['key1'])
+        self.assertFalse(mock_remove.called)
+
+        client.shares.delete('1234', share_group_id='fake_group')
+        mock_remove.assert_called_once_with('1234')
+
+    def test_prefetch(self):
+        client = fakes.FakeClient()
+        resources = [shares.Share(client.shares, {'id': share_id})
+                     for share_id in ('1234', '5678')]
+
+        missing = client.shares.prefetch(
+            resources, search_opts={'status': 'fake_status'})
+
+        self.assertEqual([resources[1]], missing)
+        self.assertTrue(resources[0].is_loaded())
+        self.assertEqual('fake_host', resources[0].host)
+        self.assertFalse(resources[1].is_loaded())
+        client.assert_called(
+            'GET', '/shares/detail?is_public=True&status=fake_status')
+
+    def test_prefetch_nothing(self):
+        client = fakes.FakeClient()
+
+        self.assertEqual([], client.shares.prefetch([]))
+        self.assertEqual([], client.client.callstack)
+
+
+@ddt.ddt
+class LazyLoadTest(utils.TestCase):
+
+    def setUp(self):
+        super(LazyLoadTest, self).setUp()
+        self.client = fakes.FakeClient()
+        self.client.metrics = metrics.MetricsRegistry()
+        self.share = shares.Share(self.client.shares, {'id': '1234'})
+        self.mock_log = self.mock_object(common_base, 'LOG')
+
+    @ddt.data(('allow', 'debug'), ('warn', 'warning'))
+    @ddt.unpack
+    def test_lazy_load(self, policy, log_level):
+        self.client.lazy_load = policy
+
+        self.assertEqual('sharename', self.share.name)
+
+        self.client.assert_called('GET', '/shares/1234')
+        self.assertTrue(getattr(self.mock_log, log_level).called)
+        self.assertEqual(
+            1, self.client.metrics.snapshot()['counters']['implicit_fetches'])
+
+    def test_lazy_load_forbidden(self):
+        self.client.lazy_load = 'forbid'
+
+        self.assertRaises(AttributeError, getattr, self.share, 'name')
+        self.assertIsNone(getattr(self.share, 'name', None))
+        self.assertFalse(self.share.is_loaded())
+        self.assertEqual([], self.client.client.callstack)
+        self.assertEqual(
+            0, self.client.metrics.snapshot()['counters']['implicit_fetches'])
+
+
+class WatchTest(utils.TestCase):
+
+    def setUp(self):
+        super(WatchTest, self).setUp()
+        self.manager = shares.ShareManager(fakes.FakeClient())
+        self.shares = {}
+        self.mock_object(self.manager, 'list',
+                         mock.Mock(side_effect=self.list_shares))
+        self.mock_object(self.manager, 'get',
+                         mock.Mock(side_effect=self.get_share))
+        self.mock_sleep = self.mock_object(base.time, 'sleep')
+        self.set_share('1', '2020-01-01T00:00:00', '2020-01-01T00:00:01')
+        self.set_share('2', '2020-01-01T00:00:00', '2020-01-02T00:00:00')
+
+    def set_share(self, share_id, created_at, updated_at, status='available'):
+        self.shares[share_id] = {'id': share_id, 'status': status,
+                                 'created_at': created_at,
+                                 'updated_at': updated_at}
+
+    def list_shares(self, detailed=True, search_opts=None, sort_key=None,
+                    sort_dir=None):
+        search_opts = search_opts or {}
+        items = sorted(self.shares.values(),
+                       key=lambda s: s['updated_at'] or '', reverse=True)
+        offset = search_opts.get('offset', 0)
+        items = items[offset:offset + search_opts.get('limit', len(items))]
+        return [shares.Share(self.manager, dict(s), loaded=True)
+                for s in items]
+
+    def get_share(self, share_id):
+        if share_id not in self.shares:
+            raise exceptions.NotFound(404)
+        return shares.Share(self.manager, dict(self.shares[share_id]),
+                            loaded=True)
+
+    def test_watch(self):
+        steps = [
+            lambda: (self.set_share('3', '2020-01-03T00:00:00',
+                                    '2020-01-03T00:00:01'),
+                     self.set_share('1', '2020-01-01T00:00:00',
+                                    '2020-01-04T00:00:00',
+                                    status='deleting')),
+            lambda: self.shares.pop('1'),
+            lambda: self.shares.pop('2'),
+        ]
+        # NOTE: the shares change while the generator sleeps between polls.
+        self.mock_sleep.side_effect = lambda interval: steps.pop(0)()
+
+        changes = [(c.action, c.resource.id) for c in self.manager.watch(
+            interval=5, page_size=1, resync_every=2, max_polls=4)]
+
+        self.assertEqual([('updated', '1'), ('created', '3'),
+                          ('deleted', '1'), ('deleted', '2')], changes)
+        self.manager.list.assert_any_call(
+            search_opts={'limit': 1, 'offset': 0}, sort_key='updated_at',
+            sort_dir='desc')
+        self.manager.list.assert_called_with(
+            detailed=False, search_opts={'limit': base.WATCH_PAGE_SIZE,
+                                         'offset': 0})
+        self.assertEqual([mock.call(5)] * 3, self.mock_sleep.call_args_list)
+
+    def test_watch_created_without_updated_at(self):
+        self.mock_object(base, 'WATCH_PAGE_SIZE', 1)
+        self.mock_sleep.side_effect = lambda interval: self.set_share(
+            '3', '2020-01-03T00:00:00', None)
+
+        changes = [(c.action, c.resource.id) for c in self.manager.watch(
+            page_size=1, resync_every=2, max_polls=2)]
+
+        # NOTE: share 3 sorts last, after the shares not updated since the
+        # previous poll, it is found by the listing of the IDs.
+        self.assertEqual([('created', '3')], changes)
+        self.manager.get.assert_called_once_with('3')
+        self.manager.list.assert_any_call(
+            detailed=False, search_opts={'limit': 1, 'offset': 2})
+
+    def test_watch_steady_state(self):
+        watch = self.manager.watch(page_size=2, resync_every=0, max_polls=3)
+
+        self.assertEqual([], list(watch))
+        # NOTE: the first listing seeds the digests, then each poll lists a
+        # single page.
+        self.assertEqual(4, self.manager.list.call_count)
+        self.assertFalse(self.manager.get.called)
+
+    def test_watch_since(self):
+        watch = self.manager.watch(since='2020-01-01T12:00:00', max_polls=1)
+
+        self.assertEqual([('updated', '2')], [
+            (c.action, c.resource.id) for c in watch])
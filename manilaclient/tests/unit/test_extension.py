@@ -0,0 +1,105 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import os
+
+import fixtures
+import mock
+
+from manilaclient import extension
+from manilaclient.tests.unit import utils
+from manilaclient.v2.contrib import list_extensions
+
+
+class DiscoverExtensionsTest(utils.TestCase):
+
+    def setUp(self):
+        super(DiscoverExtensionsTest, self).setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable(
+            'MANILACLIENT_UUID_CACHE_DIR', self.cache_dir))
+        self.useFixture(fixtures.EnvironmentVariable(
+            'manilaclient_UUID_CACHE_DIR'))
+        self.reset()
+        self.addCleanup(self.reset)
+        self.original_scan = extension._scan_installed_extensions
+        self.mock_scan = self.mock_object(
+            extension, '_scan_installed_extensions',
+            mock.Mock(return_value=[
+                ('fake_ext', 'manilaclient.v2.contrib.list_extensions')]))
+
+    def reset(self):
+        extension._installed_extensions = None
+        extension._discovered_extensions.clear()
+
+    def test_discover_extensions(self):
+        extensions = extension.discover_extensions('2')
+
+        self.assertEqual(['fake_ext', 'list_extensions'],
+                         [e.name for e in extensions])
+        self.assertIs(list_extensions, extensions[1].module)
+        self.assertIs(extensions, extension.discover_extensions('2'))
+        self.mock_scan.assert_called_once_with()
+
+    def test_discover_extensions_uses_index(self):
+        extension.discover_extensions('2')
+        self.reset()
+
+        extensions = extension.discover_extensions('2')
+
+        self.assertEqual('fake_ext', extensions[0].name)
+        self.mock_scan.assert_called_once_with()
+        with open(os.path.join(self.cache_dir, extension.INDEX_FILE)) as f:
+            index = json.load(f)
+        self.assertEqual(extension._get_fingerprint(), index['fingerprint'])
+
+    def test_discover_extensions_stale_index(self):
+        extension.discover_extensions('2')
+        self.reset()
+        fingerprint = extension._get_fingerprint()
+        fingerprint['paths'][0][1] = -1
+        self.mock_object(extension, '_get_fingerprint',
+                         mock.Mock(return_value=fingerprint))
+
+        extension.discover_extensions('2')
+
+        self.assertEqual(2, self.mock_scan.call_count)
+
+    def test_discover_extensions_unwritable_index(self):
+        self.mock_object(extension, '_get_index_path', mock.Mock(
+            return_value=os.path.join(self.cache_dir, 'missing', 'dir',
+                                      extension.INDEX_FILE)))
+        self.mock_object(extension.os, 'makedirs',
+                         mock.Mock(side_effect=OSError))
+
+        extensions = extension.discover_extensions('2')
+
+        self.assertEqual(2, len(extensions))
+
+    def test_load_attribute(self):
+        self.assertIs(
+            list_extensions.ListExtManager,
+            extension._load('manilaclient.v2.contrib.list_extensions:'
+                            'ListExtManager'))
+
+    def test_scan_installed_extensions(self):
+        self.mock_object(extension, '_get_entry_points', mock.Mock(
+            return_value=[('entry_point_ext', 'foo.bar')]))
+        self.mock_object(extension.pkgutil, 'iter_modules', mock.Mock(
+            return_value=[(None, 'foo_python_manilaclient_ext', False),
+                          (None, 'other', False)]))
+
+        self.assertEqual(
+            [('entry_point_ext', 'foo.bar'),
+             ('foo_python_manilaclient_ext', 'foo_python_manilaclient_ext')],
+            self.original_scan())
@@ -0,0 +1,220 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import io
+import json
+
+import mock
+
+import manilaclient
+from manilaclient import api_versions
+from manilaclient import client
+from manilaclient import exceptions
+from manilaclient.tests.benchmarks import fake_server
+from manilaclient.tests.benchmarks import shares as shares_benchmark
+from manilaclient.tests.unit import utils
+from manilaclient.v2 import inventory
+
+
+class FakeManilaServerTest(utils.TestCase):
+
+    def setUp(self):
+        super(FakeManilaServerTest, self).setUp()
+        self.server = fake_server.FakeManilaServer(shares=20, snapshots=4)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.cs = client.Client(manilaclient.API_MAX_VERSION,
+                                input_auth_token='fake',
+                                service_catalog_url=self.server.endpoint)
+
+    def test_discover_version(self):
+        version = api_versions.discover_version(
+            self.cs, manilaclient.API_MAX_VERSION)
+
+        self.assertEqual(manilaclient.API_MAX_VERSION, version)
+
+    def test_list_shares(self):
+        detailed = self.cs.shares.list()
+        summary = self.cs.shares.list(detailed=False)
+
+        self.assertEqual(20, len(detailed))
+        self.assertEqual('share-19', detailed[0].name)
+        self.assertEqual('available', detailed[0].status)
+        self.assertEqual({'id', 'name', 'links'}, set(summary[0]._info))
+
+    def test_list_shares_with_filters(self):
+        result = self.cs.shares.list(
+            search_opts={'name~': 'share-1', 'offset': 1, 'limit': 2},
+            sort_key='name', sort_dir='asc')
+
+        self.assertEqual(['share-10', 'share-11'], [s.name for s in result])
+
+    def test_get_share_not_found(self):
+        self.assertRaises(exceptions.NotFound, self.cs.shares.get, 'fake')
+
+    def test_create_and_delete_share(self):
+        self.server.app.transition_time = 60
+        share = self.cs.shares.create('nfs', 1, name='foo')
+
+        self.assertEqual('creating', share.status)
+        self.assertEqual('NFS', self.cs.shares.get(share.id).share_proto)
+
+        self.cs.shares.delete(share)
+
+        self.assertRaises(exceptions.NotFound, self.cs.shares.get, share.id)
+
+    def test_access_rules(self):
+        share = self.cs.shares.list()[0]
+
+        rule = self.cs.shares.allow(share, 'ip', '10.0.0.1', 'ro')
+
+        self.assertRaises(exceptions.BadRequest, self.cs.shares.allow,
+                          share, 'ip', '10.0.0.1', 'ro')
+        rules = self.cs.share_access_rules.access_list(share)
+        self.assertEqual([rule['id']], [r.id for r in rules])
+        self.assertEqual('ro', rules[0].access_level)
+        self.cs.shares.deny(share, rule['id'])
+        self.assertEqual([], self.cs.share_access_rules.access_list(share))
+
+    def test_wait_for_access_rules(self):
+        share = self.cs.shares.list()[3]
+        self.cs.shares.allow(share, 'ip', '10.0.0.1', 'rw')
+        listings = self.server.app.requests['GET list_shares']
+
+        statuses = self.cs.shares.wait_for_access_rules([share.id])
+
+        self.assertEqual({share.id: 'active'}, statuses)
+        # NOTE: a single share is fetched, the shares are not listed.
+        self.assertEqual(listings, self.server.app.requests['GET list_shares'])
+        self.assertEqual(1, self.server.app.requests['GET get_share'])
+
+    def test_wait_for_access_rules_transition(self):
+        self.server.app.transition_time = 0.05
+        share = self.cs.shares.list()[3]
+
+        rule = self.cs.shares.allow(share, 'ip', '10.0.0.1', 'rw')
+
+        self.assertEqual('queued_to_apply', rule['state'])
+        self.assertEqual('syncing',
+                         self.cs.shares.get(share.id).access_rules_status)
+        statuses = self.cs.shares.wait_for_access_rules([share.id],
+                                                        interval=0.05)
+        self.assertEqual({share.id: 'active'}, statuses)
+        self.assertEqual(['active'], [
+            r.state for r in self.cs.share_access_rules.access_list(share)])
+
+    def test_reconcile_access_rules(self):
+        share, other = self.cs.shares.list()[:2]
+        self.cs.shares.allow(share, 'ip', '10.0.0.1', 'rw')
+        self.cs.shares.allow(share, 'ip', '10.0.0.2', 'rw')
+        desired = [(share, [
+            {'access_type': 'ip', 'access_to': '10.0.0.1',
+             'metadata': {'k': 'v'}},
+            {'access_type': 'ip', 'access_to': '10.0.0.3',
+             'access_level': 'ro'},
+        ]), (other, [])]
+
+        changes = self.cs.share_access_rules.reconcile_many(desired)
+
+        self.assertEqual(['update', 'deny', 'allow'],
+                         [c.action for c in changes])
+        self.assertEqual([None] * 3, [c.error for c in changes])
+        rules = self.cs.share_access_rules.access_list(share)
+        self.assertEqual(
+            [('10.0.0.1', 'rw', {'k': 'v'}), ('10.0.0.3', 'ro', {})],
+            sorted((r.access_to, r.access_level, r.metadata) for r in rules))
+        self.assertEqual([], self.cs.share_access_rules.reconcile_many(
+            desired))
+
+    def test_update_metadata_many(self):
+        listed = self.cs.shares.list()
+        self.cs.shares.set_metadata(listed[0], {'tag': 'x'})
+
+        results = self.cs.shares.update_metadata_many(
+            {'tag': 'x'}, ['index'], search_opts={'name~': 'share-1'})
+
+        self.assertEqual(11, len(results))
+        self.assertEqual([None] * 11, [r.error for r in results])
+        self.assertEqual({'purpose': 'benchmark', 'tag': 'x'},
+                         self.cs.shares.get_metadata(listed[1])._info)
+        self.assertEqual(
+            [], [r for r in self.cs.shares.update_metadata_many(
+                {'tag': 'x'}, ['index'], search_opts={'name~': 'share-1'})
+                if r.set or r.unset])
+
+    def test_export_inventory(self):
+        share = self.cs.shares.list()[0]
+        self.cs.shares.allow(share, 'ip', '10.0.0.1', 'ro')
+        listings = self.server.app.requests['GET list_shares']
+        fp = io.BytesIO()
+
+        results = inventory.export(self.cs, fp, max_workers=4, page_size=7)
+
+        records = [json.loads(line) for line in fp.getvalue().splitlines()]
+        counts = collections.Counter(r['type'] for r in records)
+        for resource_type, count in (('shares', 20), ('snapshots', 4),
+                                     ('export_locations', 40),
+                                     ('access_rules', 1)):
+            self.assertEqual({'count': count}, results[resource_type])
+            self.assertEqual(count, counts[resource_type])
+        self.assertIsInstance(results['share_types']['error'],
+                              exceptions.NotFound)
+        self.assertEqual(list(inventory.EXPORT_TYPES), list(results))
+        rule, = [r['resource'] for r in records
+                 if r['type'] == 'access_rules']
+        self.assertEqual(share.id, rule['share_id'])
+        # NOTE: the shares are listed in 3 pages, detailed for the shares
+        # and summarized for their export locations and access rules.
+        self.assertEqual(
+            9, self.server.app.requests['GET list_shares'] - listings)
+        self.assertEqual(
+            20, self.server.app.requests['GET list_export_locations'])
+
+    def test_export_locations(self):
+        share = self.cs.shares.list()[0]
+
+        export_locations = self.cs.share_export_locations.list(share)
+        export_location = self.cs.share_export_locations.get(
+            share, export_locations[1].id)
+
+        self.assertEqual(2, len(export_locations))
+        self.assertEqual(export_locations[1].path, export_location.path)
+
+    def test_snapshots(self):
+        snapshots = self.cs.share_snapshots.list()
+        snapshot = self.cs.share_snapshots.create(snapshots[0].share_id,
+                                                  name='foo')
+
+        self.assertEqual(4, len(snapshots))
+        self.assertEqual('foo', self.cs.share_snapshots.get(snapshot).name)
+
+    @mock.patch.object(fake_server.time, 'sleep')
+    def test_latency(self, mock_sleep):
+        self.server.app.latency = 0.5
+
+        self.cs.shares.get(fake_server.fake_share(1)['id'])
+
+        mock_sleep.assert_called_once_with(0.5)
+
+
+class SharesBenchmarkTest(utils.TestCase):
+
+    def test_compare(self):
+        result = {'mode': 'library', 'scenario': 'list', 'shares': 10,
+                  'time': 1.0, 'peak_memory_mib': 10.0}
+        baseline = [dict(result, time=0.5), dict(result, shares=20)]
+
+        regressions = shares_benchmark.compare([result], baseline, 0.2)
+
+        self.assertEqual(1, len(regressions))
+        self.assertIn('time 1.000 > 0.500', regressions[0])
@@ -0,0 +1,88 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import os
+import subprocess
+import sys
+
+import ddt
+
+import manilaclient
+from manilaclient.tests.unit import utils
+
+# Modules that must not be imported before they are needed, i.e. when the
+# shell only prints help or fails to parse its arguments.
+HEAVY_MODULES = (
+    'debtcollector',
+    'keystoneauth1',
+    'keystoneclient',
+    'oslo_serialization',
+    'oslo_utils.strutils',
+    'prettytable',
+    'requests',
+)
+
+# Milliseconds 'import manilaclient.shell' may take, override it with the
+# MANILACLIENT_IMPORT_TIME_BUDGET environment variable on slow machines.
+DEFAULT_BUDGET = 1000
+
+
+def import_times(*args):
+    """Run python with -X importtime and return the cumulative times."""
+    root = os.path.dirname(os.path.dirname(manilaclient.__file__))
+    env = dict(os.environ, PYTHONPATH=root)
+    with open(os.devnull, 'w') as devnull:
+        proc = subprocess.Popen(
+            [sys.executable, '-X', 'importtime'] + list(args),
+            stdout=devnull, stderr=subprocess.PIPE, cwd=root, env=env)
+        _out, err = proc.communicate()
+    times = {}
+    for line in err.decode('utf-8', 'replace').splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1]) / 1000.0
+    return times
+
+
+@ddt.ddt
+class ImportTimeTest(utils.TestCase):
+
+    def assertNoHeavyModules(self, times):
+        imported = [name for name in times for module in HEAVY_MODULES
+                    if name == module or name.startswith(module + '.')]
+        self.assertEqual([], imported)
+
+    def test_import_shell(self):
+        budget = float(os.environ.get('MANILACLIENT_IMPORT_TIME_BUDGET',
+                                      DEFAULT_BUDGET))
+        # NOTE: the best of a few runs is kept, so that a busy machine
+        # does not fail the test.
+        best = None
+        for _i in range(3):
+            times = import_times('-c', 'import manilaclient.shell')
+            self.assertNoHeavyModules(times)
+            total = times['manilaclient.shell']
+            best = total if best is None else min(best, total)
+            if best <= budget:
+                break
+
+        self.assertLessEqual(best, budget)
+
+    @ddt.data(['help'], ['help', 'list'], ['bash-completion'],
+              ['list', '--invalid-option'])
+    def test_shell_without_api_calls(self, args):
+        times = import_times('-m', 'manilaclient.shell', *args)
+
+        self.assertIn('manilaclient.v2.shell', times)
+        self.assertNoHeavyModules(times)
@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
+import os
 import re
 import sys
 
@@ -23,6 +25,10 @@ from testtools import matchers
 import manilaclient
 from manilaclient.common import cliutils
 from manilaclient.common import constants
+from manilaclient.common import httpclient
+from manilaclient.common import metrics
+from manilaclient.common import profiling
+from manilaclient.common import recording
 from manilaclient import exceptions
 from manilaclient import shell
 from manilaclient.tests.unit import utils
@@ -134,6 +140,7 @@ class OpenstackManilaShellTest(utils.TestCase):
                 cert=env_vars['OS_CERT'],
                 input_auth_token='',
                 service_catalog_url='',
+                lazy_load='allow',
             )
 
     @ddt.data(
@@ -206,6 +213,7 @@ class OpenstackManilaShellTest(utils.TestCase):
                 cert="",
                 input_auth_token=expected["input_auth_token"],
                 service_catalog_url=expected["service_catalog_url"],
+                lazy_load='allow',
             )
 
     @ddt.data(
@@ -285,8 +293,132 @@ class OpenstackManilaShellTest(utils.TestCase):
                 cert="",
                 input_auth_token=expected["input_auth_token"],
                 service_catalog_url=expected["service_catalog_url"],
+                lazy_load='allow',
             )
 
+    def test_main_with_timings(self):
+        self.set_env_vars({'OS_TOKEN': 'foo_token',
+                           'OS_MANILA_BYPASS_URL': 'http://bar.url'})
+        with mock.patch.object(shell, 'client') as mock_client:
+
+            output = self.shell('--timings list')
+
+            registry = mock_client.Client.call_args[1]['metrics']
+            self.assertIsInstance(registry, metrics.MetricsRegistry)
+            for label in ('Request ID', 'Authentication (s)',
+                          'Version discovery (s)', 'API calls (s)',
+                          'Client (s)', 'Total (s)', 'Retries'):
+                self.assertIn(label, output)
+
+    def test_main_with_timings_format(self):
+        self.set_env_vars({'OS_TOKEN': 'foo_token',
+                           'OS_MANILA_BYPASS_URL': 'http://bar.url'})
+        stderr = self.useFixture(fixtures.MonkeyPatch(
+            'sys.stderr', moves.StringIO())).new_value
+        self.addCleanup(cliutils.set_output_format, cliutils.TABLE_FORMAT)
+        with mock.patch.object(shell, 'client') as mock_client:
+            mock_client.Client.return_value.shares.iterate.return_value = []
+
+            output = self.shell('--timings --format json list')
+
+        self.assertEqual([], json.loads(output))
+        self.assertIn('"Authentication (s)"', stderr.getvalue())
+
+    def test_print_timings(self):
+        _shell = shell.OpenStackManilaShell()
+        _shell.metrics = metrics.MetricsRegistry()
+        info = httpclient.RequestInfo('GET', 'http://fake/shares/detail',
+                                      '/shares/detail', '2.51')
+        info.elapsed = 0.5
+        info.status_code = 200
+        info.response_bytes = 1024
+        info.request_id = 'req-foo'
+        _shell.metrics._on_pre_request(info)
+        _shell.metrics._on_response(info)
+        _shell.metrics.add_time(metrics.AUTH_TIMER, 0.25)
+        self.mock_object(cliutils, 'print_list')
+        self.mock_object(cliutils, 'print_dict')
+
+        _shell._print_timings(1.0)
+
+        self.assertEqual(2, cliutils.print_list.call_count)
+        rows = cliutils.print_list.call_args_list[0][0][0]
+        self.assertEqual('req-foo', rows[0].request_id)
+        self.assertEqual('0.500', rows[0].time)
+        endpoints = cliutils.print_list.call_args_list[1][0][0]
+        self.assertEqual('GET /shares/detail', endpoints[0].endpoint)
+        summary = cliutils.print_dict.call_args[0][0]
+        self.assertEqual('0.250', summary['Authentication (s)'])
+        self.assertEqual('0.500', summary['API calls (s)'])
+        self.assertEqual('0.250', summary['Client (s)'])
+        self.assertEqual(1, summary['Requests'])
+
+    @ddt.data('--profile=%s list', '--profile --profile-file %s list',
+              '--profile-memory --profile-file %s list')
+    def test_main_with_profile(self, cmd):
+        self.set_env_vars({'OS_TOKEN': 'foo_token',
+                           'OS_MANILA_BYPASS_URL': 'http://bar.url'})
+        profile_file = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, 'manila.prof')
+        with mock.patch.object(shell, 'client'):
+
+            output = self.shell(cmd % profile_file)
+
+        self.assertTrue(os.path.exists(profile_file))
+        self.assertIn(profile_file, output)
+        for phase in profiling.PHASES + ('other', 'total'):
+            self.assertIn(phase, output)
+        self.assertIsNone(profiling._active_profiler)
+        self.assertEqual('--profile-memory' in cmd,
+                         'Peak memory (KiB)' in output)
+
+    def test_main_with_http_capture_and_replay(self):
+        self.set_env_vars({})
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'capture.ndjson')
+        with open(path, 'w') as f:
+            f.write('{"method": "GET", "url": "http://fake/v2/p/shares", '
+                    '"endpoint": "http://fake/v2/p"}\n')
+        with mock.patch.object(shell, 'client') as mock_client:
+
+            self.shell('--http-replay %s --http-capture %s.new list' % (
+                path, path))
+
+            kwargs = mock_client.Client.call_args[1]
+            self.assertIsInstance(kwargs['http_transport'],
+                                  recording.ReplayTransport)
+            self.assertIsInstance(kwargs['http_capture'],
+                                  recording.HTTPCapture)
+            self.assertTrue(kwargs['http_capture']._file.closed)
+            self.assertEqual('replay', kwargs['input_auth_token'])
+            self.assertEqual('http://fake/v2/p',
+                             kwargs['service_catalog_url'])
+
+    @ddt.data(('completion', 'bash'), ('completion zsh', 'zsh'))
+    @ddt.unpack
+    def test_completion(self, cmd, shell_name):
+        cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.set_env_vars({'MANILACLIENT_UUID_CACHE_DIR': cache_dir,
+                           'OS_SHARE_API_VERSION': '2.40'})
+
+        output = self.shell(cmd)
+
+        path = os.path.join(cache_dir, 'completion',
+                            'manila-2.40.%s' % shell_name)
+        with open(path) as f:
+            self.assertEqual(output, f.read())
+        self.assertIn('_manila_positional[show]=share', output)
+        self.assertIn('_manila_positional[snapshot-show]=sharesnapshot',
+                      output)
+        self.assertNotIn('bash-completion', output)
+
+    def test_expand_profile_option(self):
+        argv = shell.OpenStackManilaShell._expand_profile_option(
+            ['--profile=/tmp/foo=bar', '--profile', 'list'])
+
+        self.assertEqual(['--profile', '--profile-file', '/tmp/foo=bar',
+                          '--profile', 'list'], argv)
+
     def test_help_unknown_command(self):
         self.assertRaises(exceptions.CommandError, self.shell, 'help foofoo')
 
@@ -311,6 +443,8 @@ class OpenstackManilaShellTest(utils.TestCase):
             '--os-auth-url', '--os-region-name', '--service-type',
             '--service-name', '--share-service-name', '--endpoint-type',
             '--os-share-api-version', '--os-cacert', '--retries', '--os-cert',
+            '--timings', '--profile', '--profile-memory', '--http-capture',
+            '--http-replay', '--http-replay-timing',
         )
 
         help_text = self.shell('help')
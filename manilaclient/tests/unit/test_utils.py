@@ -10,6 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
+
+import mock
 import six
 import testtools
 
@@ -27,3 +30,36 @@ class TestCommonUtils(testtools.TestCase):
             # u'xxxx' in PY3 is str, we will not get extra 'u' from cli
             # output in PY3
             self.assertEqual(src, utils.unicode_key_value_to_string(src))
+
+
+class TestLazyModule(testtools.TestCase):
+
+    def test_attributes(self):
+        module = utils.LazyModule('json')
+
+        self.assertIs(json.dumps, module.dumps)
+        self.assertEqual('json', module.__name__)
+
+    def test_patch(self):
+        module = utils.LazyModule('json')
+
+        with mock.patch.object(module, 'dumps') as mock_dumps:
+            self.assertIs(mock_dumps, json.dumps)
+
+        self.assertIsNot(mock_dumps, json.dumps)
+        self.assertIs(json.dumps, module.dumps)
+
+    def test_lazy_decorator(self):
+        factory = mock.Mock()
+        factory.return_value.side_effect = lambda func: func
+        module = mock.Mock(decorate=factory)
+
+        @utils.lazy_decorator(module, 'decorate', 'arg', key='value')
+        def func(value):
+            return value * 2
+
+        self.assertFalse(factory.called)
+        self.assertEqual(4, func(2))
+        self.assertEqual(6, func(3))
+        factory.assert_called_once_with('arg', key='value')
+        self.assertEqual('func', func.__name__)
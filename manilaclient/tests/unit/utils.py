@@ -33,6 +33,13 @@ class TestCase(testtools.TestCase):
                 os.environ.get('OS_STDERR_CAPTURE') == '1'):
             stderr = self.useFixture(fixtures.StringStream('stderr')).stream
             self.useFixture(fixtures.MonkeyPatch('sys.stderr', stderr))
+        # NOTE: managers record what they list in the lookup cache, keep it
+        # out of the home directory of the user running the tests.
+        cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable(
+            'MANILACLIENT_UUID_CACHE_DIR', cache_dir))
+        self.useFixture(fixtures.EnvironmentVariable(
+            'manilaclient_UUID_CACHE_DIR'))
 
     def mock_object(self, obj, attr_name, new_attr=None, **kwargs):
         """Mock an object attribute.
@@ -76,3 +83,9 @@ class TestResponse(requests.Response):
     @property
     def text(self):
         return self._text
+
+    @property
+    def content(self):
+        if self._text is None:
+            return None
+        return self._text.encode('utf-8')
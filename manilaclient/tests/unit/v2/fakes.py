@@ -662,6 +662,9 @@ class FakeHTTPClient(fakes.FakeHTTPClient):
         share_nw = {'share_network': {'id': 1111, 'name': 'fake_share_nw'}}
         return (200, {}, share_nw)
 
+    def get_share_networks(self, **kw):
+        return self.get_share_networks_detail(**kw)
+
     def get_share_networks_detail(self, **kw):
         share_nw = {
             'share_networks': [
@@ -0,0 +1,208 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import ddt
+
+from manilaclient.tests.unit import utils
+from manilaclient.v2 import capacity
+from manilaclient.v2 import scheduler_stats
+from manilaclient.v2 import shares
+
+
+def fake_pool(host, backend, pool, **capabilities):
+    return scheduler_stats.Pool(None, {
+        'name': '%s@%s#%s' % (host, backend, pool), 'host': host,
+        'backend': backend, 'pool': pool, 'capabilities': capabilities},
+        loaded=True)
+
+
+@ddt.ddt
+class MatchExtraSpecsTest(utils.TestCase):
+
+    @ddt.data(
+        ({}, True),
+        ({'dedupe': 'True'}, True),
+        ({'dedupe': 'False'}, False),
+        ({'capabilities:dedupe': '<is> True'}, True),
+        ({'thin_provisioning': '<is> False'}, True),
+        ({'thin_provisioning': 'maybe'}, False),
+        ({'share_backend_name': 'backend1'}, True),
+        ({'share_backend_name': '<or> backend2 <or> backend1'}, True),
+        ({'share_backend_name': '<or> backend2 <or> backend3'}, False),
+        ({'share_backend_name': 's== backend1'}, True),
+        ({'share_backend_name': 's> backend2'}, False),
+        ({'storage_protocol': '<in> CIFS'}, True),
+        ({'storage_protocol': '<in> GLUSTERFS'}, False),
+        ({'free_capacity_gb': '>= 10'}, True),
+        ({'free_capacity_gb': '<= 10'}, False),
+        ({'free_capacity_gb': '== 100'}, True),
+        ({'free_capacity_gb': '= 200'}, False),
+        ({'free_capacity_gb': '>='}, False),
+        ({'share_backend_name': '>= 10'}, False),
+        ({'compression': 'True'}, False),
+        ({'dedupe': 'True', 'snapshot_support': 'True'}, False),
+        ({'capabilities:nested:dedupe': '<is> False'}, True),
+        ({'capabilities:nested:compression': 'True'}, False),
+        ({'vendor:dedupe': 'False'}, True),
+        ({'replication_type': 'dr'}, False),
+    )
+    @ddt.unpack
+    def test_match_extra_specs(self, extra_specs, expected):
+        capabilities = {
+            'share_backend_name': 'backend1',
+            'storage_protocol': 'NFS_CIFS',
+            'free_capacity_gb': 100,
+            'dedupe': True,
+            'thin_provisioning': [True, False],
+            'driver_handles_share_servers': True,
+            'nested': {'dedupe': False},
+        }
+
+        self.assertEqual(expected, capacity.match_extra_specs(
+            capabilities, dict(extra_specs,
+                               driver_handles_share_servers='True')))
+
+
+class PoolSnapshotTest(utils.TestCase):
+
+    def setUp(self):
+        super(PoolSnapshotTest, self).setUp()
+        self.snapshot = capacity.PoolSnapshot([
+            fake_pool('host1', 'backend1', 'pool1', total_capacity_gb=100,
+                      free_capacity_gb=60, allocated_capacity_gb=40,
+                      provisioned_capacity_gb=80, dedupe=True,
+                      availability_zone='az1'),
+            fake_pool('host1', 'backend1', 'pool2', total_capacity_gb=50,
+                      free_capacity_gb=10, allocated_capacity_gb=30,
+                      availability_zone='az2'),
+            fake_pool('host1', 'backend2', 'pool1',
+                      total_capacity_gb='infinite',
+                      free_capacity_gb='infinite', dedupe=False,
+                      availability_zone='az1'),
+            fake_pool('host2', 'backend1', 'pool1',
+                      total_capacity_gb='unknown',
+                      free_capacity_gb='unknown', allocated_capacity_gb=5),
+        ], taken_at=1.0)
+
+    def test_columns(self):
+        self.assertEqual(4, len(self.snapshot))
+        self.assertEqual([100.0, 50.0, float('inf'), None],
+                         self.snapshot.total_capacity_gb)
+        self.assertEqual([80.0, 30.0, 0.0, 5.0],
+                         self.snapshot.provisioned_capacity_gb)
+
+    def test_filter(self):
+        snapshot = self.snapshot.filter({'dedupe': '<is> True'})
+
+        self.assertEqual(1, len(snapshot))
+        self.assertEqual(['host1@backend1#pool1'], snapshot.names)
+        self.assertEqual([100.0], snapshot.total_capacity_gb)
+        self.assertEqual(1.0, snapshot.taken_at)
+        self.assertEqual(4, len(self.snapshot))
+
+    def test_groups(self):
+        self.assertEqual(['az1', 'az2', 'az1', None],
+                         self.snapshot.groups('availability_zone'))
+        self.assertRaises(ValueError, self.snapshot.groups, 'share_type')
+
+    def test_aggregate(self):
+        summaries = self.snapshot.aggregate()
+
+        self.assertEqual([
+            capacity.CapacitySummary('host1@backend1', 2, 150.0, 70.0, 60.0,
+                                     70.0, 110.0, 110.0 / 150.0, None),
+            capacity.CapacitySummary('host1@backend2', 1, float('inf'),
+                                     float('inf'), float('inf'), 0.0, 0.0,
+                                     0.0, None),
+            capacity.CapacitySummary('host2@backend1', 1, 0.0, 0.0, 0.0, 5.0,
+                                     5.0, None, None),
+        ], summaries)
+
+    def test_aggregate_shares(self):
+        share_list = [
+            shares.Share(None, {'id': share_id, 'host': host}, loaded=True)
+            for share_id, host in (('1', 'host1@backend1#pool1'),
+                                   ('2', 'host1@backend1#pool1'),
+                                   ('3', 'host2@backend1#pool1'),
+                                   ('4', None))]
+
+        summaries = self.snapshot.aggregate(by='availability_zone',
+                                            shares=iter(share_list))
+
+        self.assertEqual([('az1', 2, 2), ('az2', 1, 0), (None, 1, 1)],
+                         [(s.group, s.pools, s.shares) for s in summaries])
+
+
+@ddt.ddt
+class PlaceTest(utils.TestCase):
+
+    def setUp(self):
+        super(PlaceTest, self).setUp()
+        self.snapshot = capacity.PoolSnapshot([
+            fake_pool('host1', 'backend1', 'thick', total_capacity_gb=100,
+                      free_capacity_gb=30, reserved_percentage=10,
+                      storage_protocol='NFS_CIFS', availability_zone='az1',
+                      thin_provisioning=False),
+            fake_pool('host1', 'backend2', 'thin', total_capacity_gb=100,
+                      free_capacity_gb=20, provisioned_capacity_gb=150,
+                      max_over_subscription_ratio='2.0',
+                      storage_protocol='NFS', availability_zone='az2',
+                      thin_provisioning=[True, False]),
+            fake_pool('host2', 'backend1', 'unknown',
+                      total_capacity_gb='unknown',
+                      free_capacity_gb='unknown', storage_protocol='CEPHFS'),
+        ])
+
+    @ddt.data(
+        (10, {}, None, 'nfs', ['thin', 'thick'], ['capabilities']),
+        (20, {}, None, 'NFS', ['thin', 'thick'], ['capabilities']),
+        (21, {}, None, 'NFS', ['thin'], ['capacity', 'capabilities']),
+        (40, {}, None, 'NFS', ['thin'], ['capacity', 'capabilities']),
+        (41, {}, None, 'NFS', [], ['capacity', 'capacity', 'capabilities']),
+        (51, {}, None, None, ['unknown'], ['capacity', 'capacity']),
+        (21, {'thin_provisioning': '<is> False'}, None, 'NFS', [],
+         ['capacity', 'capacity', 'capabilities']),
+        (10, {}, 'az1', 'NFS', ['thick'],
+         ['availability_zone', 'capabilities']),
+        (10, {}, 'az1', None, ['unknown', 'thick'], ['availability_zone']),
+        (10, {'availability_zones': 'az2, az3'}, None, 'NFS', ['thin'],
+         ['availability_zone', 'capabilities']),
+        (10, {'availability_zones': 'az2'}, 'az1', None, [],
+         ['availability_zone'] * 3),
+        (10, {}, None, 'CIFS', ['thick'], ['capabilities', 'capabilities']),
+        (10, {}, None, 'CephFS', ['unknown'],
+         ['capabilities', 'capabilities']),
+    )
+    @ddt.unpack
+    def test_place(self, size, extra_specs, availability_zone, share_proto,
+                   expected, rejected):
+        checks = self.snapshot.place(size, extra_specs=extra_specs,
+                                     availability_zone=availability_zone,
+                                     share_proto=share_proto)
+
+        self.assertEqual(3, len(checks))
+        self.assertEqual(
+            expected, [c.pool.rsplit('#', 1)[1] for c in checks
+                       if c.reason is None])
+        self.assertEqual(rejected, [c.reason for c in checks if c.reason])
+
+    def test_place_capacity(self):
+        checks = self.snapshot.place(10)
+
+        self.assertEqual([
+            capacity.PlacementCheck('host2@backend1#unknown', None,
+                                    float('inf'), None, None),
+            capacity.PlacementCheck('host1@backend2#thin', 20.0, 40.0, 1.6,
+                                    None),
+            capacity.PlacementCheck('host1@backend1#thick', 30.0, 20.0, 0.1,
+                                    None),
+        ], checks)
@@ -71,6 +71,25 @@ class ClientTest(utils.TestCase):
         self.assertIsNotNone(c.client)
         self.assertIsNone(c.keystone_client)
 
+    def test_client_with_metrics(self):
+        registry = mock.Mock()
+
+        c = client.Client(input_auth_token='token',
+                          service_catalog_url='http://1.2.3.4',
+                          api_version=manilaclient.API_MAX_VERSION,
+                          metrics=registry)
+
+        self.assertIs(registry, c.metrics)
+        registry.add_time.assert_called_once_with('auth', mock.ANY)
+        registry.attach.assert_called_once_with(c.client)
+
+    def test_client_invalid_lazy_load(self):
+        self.assertRaises(ValueError, client.Client,
+                          input_auth_token='token',
+                          service_catalog_url='http://1.2.3.4',
+                          api_version=manilaclient.API_MAX_VERSION,
+                          lazy_load='sometimes')
+
     @mock.patch.object(client.Client, '_get_keystone_client', mock.Mock())
     def test_valid_region_name_v1(self):
         self.mock_object(client.httpclient, 'HTTPClient')
@@ -91,7 +110,10 @@ class ClientTest(utils.TestCase):
             timeout=None,
             retries=None,
             http_log_debug=False,
-            api_version=manilaclient.API_DEPRECATED_VERSION)
+            api_version=manilaclient.API_DEPRECATED_VERSION,
+            json_codec=None,
+            transport=None,
+            capture=None)
         self.assertIsNotNone(c.client)
 
     @mock.patch.object(client.Client, '_get_keystone_client', mock.Mock())
@@ -132,7 +154,10 @@ class ClientTest(utils.TestCase):
             timeout=None,
             retries=None,
             http_log_debug=False,
-            api_version=manilaclient.API_MIN_VERSION)
+            api_version=manilaclient.API_MIN_VERSION,
+            json_codec=None,
+            transport=None,
+            capture=None)
         self.assertIsNotNone(c.client)
 
     def _get_client_args(self, **kwargs):
@@ -210,7 +235,8 @@ class ClientTest(utils.TestCase):
         client.httpclient.HTTPClient.assert_called_with(
             'http://3.3.3.3', mock.ANY, 'python-manilaclient', insecure=False,
             cacert=None, timeout=None, retries=None, http_log_debug=False,
-            api_version=manilaclient.API_MIN_VERSION)
+            api_version=manilaclient.API_MIN_VERSION, json_codec=None,
+            transport=None, capture=None)
 
         client.ks_client.Client.assert_called_with(
             session=mock.ANY, version=(3, 0), auth_url='url_v3.0',
@@ -265,7 +291,8 @@ class ClientTest(utils.TestCase):
         client.httpclient.HTTPClient.assert_called_with(
             'http://3.3.3.3', mock.ANY, 'python-manilaclient', insecure=False,
             cacert=None, timeout=None, retries=None, http_log_debug=False,
-            api_version=manilaclient.API_MIN_VERSION)
+            api_version=manilaclient.API_MIN_VERSION, json_codec=None,
+            transport=None, capture=None)
         client.ks_client.Client.assert_called_with(
             session=mock.ANY, version=(2, 0), auth_url='url_v2.0',
             username=client_args['username'],
@@ -0,0 +1,244 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import json
+import os
+
+import ddt
+import fixtures
+import mock
+
+from manilaclient.common.apiclient import exceptions
+from manilaclient.tests.unit import utils
+from manilaclient.v2 import inventory
+from manilaclient.v2 import share_networks
+from manilaclient.v2 import share_snapshots
+from manilaclient.v2 import shares
+
+
+def fake_share(share_id, updated_at, **kwargs):
+    info = {'id': share_id, 'name': 'share-%s' % share_id,
+            'status': 'available', 'host': 'host1@backend#pool',
+            'created_at': '2020-01-01T00:00:00.000000',
+            'updated_at': updated_at, 'metadata': {}}
+    info.update(kwargs)
+    return info
+
+
+@ddt.ddt
+class InventoryTest(utils.TestCase):
+
+    def setUp(self):
+        super(InventoryTest, self).setUp()
+        self.shares = {}
+        self.snapshots = []
+        self.client = mock.Mock()
+        self.client.client.endpoint_url = 'http://127.0.0.1:8786/v2'
+
+        self.client.shares = mock.Mock(resource_class=shares.Share)
+        self.client.shares.list.side_effect = self.list_shares
+        self.client.shares.get.side_effect = self.get_share
+        self.client.share_snapshots = mock.Mock(
+            resource_class=share_snapshots.ShareSnapshot)
+        self.client.share_snapshots.list.side_effect = (
+            lambda search_opts=None: [share_snapshots.ShareSnapshot(
+                None, s, loaded=True) for s in self.snapshots])
+        self.client.share_networks = mock.Mock(
+            resource_class=share_networks.ShareNetwork)
+        self.client.share_networks.list.side_effect = exceptions.Forbidden(403)
+
+        self.shares.update((s['id'], s) for s in (
+            fake_share('1', '2020-01-02T00:00:00.000000',
+                       metadata={'team': 'a'}),
+            fake_share('2', '2020-01-03T00:00:00.000000', host='host2'),
+        ))
+        self.inventory = inventory.Inventory(self.client)
+        self.addCleanup(self.inventory.close)
+
+    def list_shares(self, detailed=True, search_opts=None, sort_key=None,
+                    sort_dir=None):
+        search_opts = search_opts or {}
+        items = sorted(self.shares.values(),
+                       key=lambda s: s['updated_at'] or '',
+                       reverse=sort_dir == 'desc')
+        offset = search_opts.get('offset', 0)
+        limit = search_opts.get('limit') or len(items)
+        items = items[offset:offset + limit]
+        if not detailed:
+            items = [{'id': s['id'], 'name': s['name']} for s in items]
+        return [shares.Share(None, s, loaded=True) for s in items]
+
+    def get_share(self, share_id):
+        if share_id not in self.shares:
+            raise exceptions.NotFound(404)
+        return shares.Share(None, self.shares[share_id], loaded=True)
+
+    def test_default_path(self):
+        self.assertEqual(os.path.join(
+            os.environ['MANILACLIENT_UUID_CACHE_DIR'], 'inventory'),
+            os.path.dirname(self.inventory.path))
+
+    def test_sync_full(self):
+        self.snapshots = [{'id': 's1', 'share_id': '1', 'status': 'available',
+                           'created_at': '2020-01-01T00:00:00.000000'}]
+
+        results = self.inventory.sync(
+            resource_types=['shares', 'snapshots', 'share_networks'])
+
+        self.assertEqual({'mode': 'full', 'updated': 2, 'deleted': 0,
+                          'total': 2}, results['shares'])
+        self.assertEqual(1, results['snapshots']['total'])
+        self.assertIsInstance(results['share_networks']['error'],
+                              exceptions.Forbidden)
+        snapshots = self.inventory.list('snapshots', share_id='1')
+        self.assertEqual(['s1'], [s.id for s in snapshots])
+        self.assertIsInstance(snapshots[0], share_snapshots.ShareSnapshot)
+
+    def test_sync_incremental(self):
+        self.inventory.sync(resource_types=['shares'])
+        self.client.shares.list.reset_mock()
+        del self.shares['1']
+        self.shares['2'] = fake_share('2', '2020-02-01T00:00:00.000000',
+                                      host='host2', status='error')
+        self.shares['3'] = fake_share('3', None)
+        self.shares['4'] = fake_share('4', '2020-01-01T00:00:00.000000')
+
+        result = self.inventory.sync(resource_types=['shares'])['shares']
+
+        self.assertEqual({'mode': 'incremental', 'updated': 3, 'deleted': 1,
+                          'total': 3}, result)
+        self.assertEqual(
+            [mock.call(search_opts={'limit': inventory.PAGE_SIZE,
+                                    'is_public': False, 'offset': 0},
+                       sort_key='updated_at', sort_dir='desc'),
+             mock.call(detailed=False,
+                       search_opts={'limit': inventory.PAGE_SIZE,
+                                    'is_public': False, 'offset': 0})],
+            self.client.shares.list.call_args_list)
+        # NOTE: share 3 has no updated_at and share 4 one older than the
+        # previous sync, they are only found by their IDs.
+        self.assertEqual([mock.call('3'), mock.call('4')], sorted(
+            self.client.shares.get.call_args_list))
+        self.assertEqual(['error'], [s.status for s in self.inventory.list(
+            'shares', host='host2')])
+        self.assertEqual(['2', '3', '4'], [
+            s.id for s in self.inventory.list('shares', sort_key='id')])
+
+    def test_sync_full_after_scope_change(self):
+        self.inventory.sync(resource_types=['shares'])
+
+        result = self.inventory.sync(resource_types=['shares'],
+                                     all_tenants=True)['shares']
+
+        self.assertEqual('full', result['mode'])
+        self.client.shares.list.assert_called_with(
+            search_opts={'all_tenants': 1, 'is_public': False,
+                         'limit': inventory.PAGE_SIZE, 'offset': 0})
+
+    def test_sync_paginated(self):
+        self.mock_object(inventory, 'PAGE_SIZE', 1)
+        self.shares['3'] = fake_share('3', '2020-01-04T00:00:00.000000')
+
+        result = self.inventory.sync(resource_types=['shares'])['shares']
+
+        self.assertEqual(3, result['total'])
+        self.assertEqual(4, self.client.shares.list.call_count)
+        self.client.shares.list.reset_mock()
+
+        result = self.inventory.sync(resource_types=['shares'])['shares']
+
+        # NOTE: the shares past the first page of the listing of IDs are
+        # not taken for deleted.
+        self.assertEqual({'mode': 'incremental', 'updated': 1, 'deleted': 0,
+                          'total': 3}, result)
+        self.client.shares.list.assert_called_with(
+            detailed=False, search_opts={'is_public': False, 'limit': 1,
+                                         'offset': 3})
+
+    def test_sync_unknown_type(self):
+        self.assertRaises(ValueError, self.inventory.sync, ['volumes'])
+
+    @ddt.data(
+        ({'metadata': {'team': 'a'}}, ['1']),
+        ({'metadata': {'team': 'b'}}, []),
+        ({'host': 'host2'}, ['2']),
+        ({'created_before': datetime.datetime(2020, 1, 2)}, ['1', '2']),
+        ({'created_since': '2020-01-02'}, []),
+        ({'sort_key': 'updated_at'}, ['1', '2']),
+    )
+    @ddt.unpack
+    def test_list(self, kwargs, expected):
+        self.inventory.sync(resource_types=['shares'])
+
+        self.assertEqual(expected, [s.id for s in self.inventory.list(
+            'shares', **kwargs)])
+
+    @ddt.data({'sort_key': 'data'}, {'size': 1}, {'resource_type': 'x'})
+    def test_list_invalid(self, kwargs):
+        kwargs.setdefault('resource_type', 'shares')
+
+        self.assertRaises(ValueError, self.inventory.list, **kwargs)
+
+    def test_schema_upgrade(self):
+        self.inventory.sync(resource_types=['shares'])
+        self.inventory.conn.execute('PRAGMA user_version = 0')
+        self.inventory.close()
+
+        self.assertEqual(0, self.inventory.count('shares'))
+        self.assertIsNone(self.inventory.get_synced_at('shares'))
+
+
+class ExportTest(utils.TestCase):
+
+    def test_export_unknown_type(self):
+        self.assertRaises(ValueError, inventory.export, mock.Mock(),
+                          mock.Mock(), ['volumes'])
+
+    def test_export_unexpected_error(self):
+        client = mock.Mock()
+        client.share_types.list.side_effect = exceptions.BadRequest(400)
+
+        self.assertRaises(exceptions.BadRequest, inventory.export, client,
+                          mock.Mock(), ['share_types'])
+
+    def test_export_share_network_subnets(self):
+        client = mock.Mock()
+        client.share_networks.list.return_value = [
+            share_networks.ShareNetwork(None, {
+                'id': 'sn1', 'share_network_subnets': [{'id': 's1'}]})]
+        fp = mock.Mock()
+
+        results = inventory.export(client, fp, ['share_network_subnets'],
+                                   all_tenants=True)
+
+        self.assertEqual({'count': 1}, results['share_network_subnets'])
+        client.share_networks.list.assert_called_once_with(
+            search_opts={'all_tenants': 1, 'limit': inventory.PAGE_SIZE,
+                         'offset': 0})
+        line, = fp.write.call_args[0]
+        self.assertEqual({'type': 'share_network_subnets',
+                          'resource': {'id': 's1', 'share_network_id': 'sn1'}},
+                         json.loads(line.decode('utf-8')))
+        self.assertTrue(line.endswith(b'\n'))
+
+
+class InventoryPathTest(utils.TestCase):
+
+    def test_path(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'sub', 'inventory.sqlite')
+        inv = inventory.Inventory(mock.Mock(), path=path)
+        self.addCleanup(inv.close)
+
+        self.assertEqual(0, inv.count('shares'))
+        self.assertTrue(os.path.exists(path))
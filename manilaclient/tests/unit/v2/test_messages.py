@@ -128,5 +128,55 @@ class MessageManagerTest(utils.TestCase):
         self.manager.delete(fake.Message())
 
         mock_delete.assert_called_once_with(
-            messages.RESOURCE_PATH % fake.Message.id)
+            messages.RESOURCE_PATH % fake.Message.id,
+            resource_id=fake.Message.id)
         self.assertFalse(mock_post.called)
+
+    def _message(self, message_id, created_at):
+        return messages.Message(
+            self.manager, {'id': message_id, 'created_at': created_at},
+            loaded=True)
+
+    def test_follow(self):
+        polls = [
+            # The initial listing.
+            [self._message('2', 't1'), self._message('1', 't1')],
+            # Nothing new, the page stops at the older messages.
+            [self._message('2', 't1'), self._message('1', 't1')],
+            # Two pages of new messages, one created at the same time as
+            # the last seen ones.
+            [self._message('5', 't3'), self._message('4', 't2')],
+            [self._message('3', 't1'), self._message('2', 't1')],
+            [self._message('5', 't3')],
+        ]
+        mock_list = self.mock_object(self.manager, '_list',
+                                     mock.Mock(side_effect=polls))
+        mock_sleep = self.mock_object(messages.time, 'sleep')
+
+        batches = list(self.manager.follow(
+            search_opts={'resource_type': 'share'}, interval=2, page_size=2,
+            max_polls=3))
+
+        self.assertEqual([['3', '4', '5']],
+                         [[m.id for m in b] for b in batches])
+        first_page = mock.call(
+            messages.RESOURCES_PATH + '?limit=2&resource_type=share&'
+                                      'sort_dir=desc&sort_key=created_at',
+            messages.RESOURCES_NAME)
+        second_page = mock.call(
+            messages.RESOURCES_PATH + '?limit=2&offset=2&resource_type=share'
+                                      '&sort_dir=desc&sort_key=created_at',
+            messages.RESOURCES_NAME)
+        self.assertEqual([first_page, first_page, first_page, second_page,
+                          mock.call(mock.ANY, messages.RESOURCES_NAME)],
+                         mock_list.call_args_list)
+        self.assertEqual([mock.call(2)] * 2, mock_sleep.call_args_list)
+
+    def test_follow_since(self):
+        self.mock_object(self.manager, '_list', mock.Mock(return_value=[
+            self._message('2', 't2'), self._message('1', 't1')]))
+
+        batches = list(self.manager.follow(since='t1', seen=['1'],
+                                           max_polls=1))
+
+        self.assertEqual([['2']], [[m.id for m in b] for b in batches])
@@ -17,6 +17,7 @@ import ddt
 import mock
 
 from manilaclient import api_versions
+from manilaclient import exceptions
 from manilaclient.tests.unit import utils
 from manilaclient.v2 import quotas
 
@@ -261,3 +262,80 @@ class QuotaSetsTest(utils.TestCase):
             )
 
             getattr(manager, '_%s' % operation).assert_not_called()
+
+    def test_get_many(self):
+        manager = self._get_manager("2.39")
+        error = exceptions.NotFound(404)
+
+        def get(tenant_id, share_type=None, detail=False):
+            if tenant_id == 'p2':
+                raise error
+            return (tenant_id, share_type, detail)
+
+        self.mock_object(manager, 'get', mock.Mock(side_effect=get))
+
+        results = manager.get_many(['p1', 'p2'], share_types=['st'],
+                                   max_workers=2)
+
+        self.assertEqual([
+            quotas.QuotaSetResult('p1', None, ('p1', None, True), None),
+            quotas.QuotaSetResult('p1', 'st', ('p1', 'st', True), None),
+            quotas.QuotaSetResult('p2', None, None, error),
+            quotas.QuotaSetResult('p2', 'st', None, error),
+        ], results)
+
+    def test_get_many_share_types_old_microversion(self):
+        manager = self._get_manager("2.38")
+
+        self.assertRaises(exceptions.UnsupportedVersion, manager.get_many,
+                          ['p1'], share_types=['st'])
+
+    @ddt.data('projects', 'tenants')
+    def test_list_project_ids_keystone(self, attr):
+        manager = self._get_manager("2.39")
+        manager.api.keystone_client = mock.Mock(spec=[attr])
+        getattr(manager.api.keystone_client, attr).list.return_value = [
+            mock.Mock(id='p1'), mock.Mock(id='p2')]
+
+        self.assertEqual(['p1', 'p2'], manager.list_project_ids())
+
+    def test_list_project_ids_shares(self):
+        manager = self._get_manager("2.39")
+        manager.api.keystone_client = None
+        manager.api.shares.iterate.return_value = [
+            mock.Mock(_info={'project_id': project_id})
+            for project_id in ('p2', 'p1', 'p2', None)]
+
+        self.assertEqual(['p2', 'p1'], manager.list_project_ids())
+        manager.api.shares.iterate.assert_called_once_with(
+            search_opts={'all_tenants': 1})
+
+    def test_aggregate_usage(self):
+        def quota_set(shares, gigabytes):
+            return quotas.QuotaSet(None, {'id': 'p', 'shares': shares,
+                                          'gigabytes': gigabytes})
+
+        results = [
+            quotas.QuotaSetResult('p1', None, quota_set(
+                {'in_use': 2, 'reserved': 1, 'limit': 10},
+                {'in_use': 10, 'reserved': 0, 'limit': -1}), None),
+            quotas.QuotaSetResult('p2', None, quota_set(
+                {'in_use': 4, 'reserved': 0, 'limit': 10},
+                {'in_use': 5, 'reserved': 0, 'limit': 100}), None),
+            quotas.QuotaSetResult('p2', 'st', quota_set(5, 50), None),
+            quotas.QuotaSetResult('p3', None, None,
+                                  exceptions.NotFound(404)),
+        ]
+
+        self.assertEqual([
+            quotas.QuotaUsage(None, None, 'gigabytes', 2, 15, 0, -1, None),
+            quotas.QuotaUsage(None, None, 'shares', 2, 6, 1, 20, 0.35),
+            quotas.QuotaUsage(None, 'st', 'gigabytes', 1, 0, 0, 50, 0.0),
+            quotas.QuotaUsage(None, 'st', 'shares', 1, 0, 0, 5, 0.0),
+        ], quotas.aggregate_usage(results))
+        self.assertEqual(
+            [('p1', None, 'shares', 0.3), ('p2', None, 'shares', 0.4),
+             ('p2', 'st', 'shares', 0.0)],
+            [(u.tenant_id, u.share_type, u.resource, u.utilization)
+             for u in quotas.aggregate_usage(results, by_project=True)
+             if u.resource == 'shares'])
@@ -79,3 +79,30 @@ class PoolManagerTest(utils.TestCase):
         self.manager._list.assert_called_once_with(
             scheduler_stats.RESOURCES_PATH + '/detail' + query_string,
             scheduler_stats.RESOURCES_NAME)
+
+    def test_snapshot(self):
+        pools = [scheduler_stats.Pool(self.manager, {
+            'name': 'host1@backend1#pool1', 'host': 'host1',
+            'backend': 'backend1', 'capabilities': {'total_capacity_gb': 10}},
+            loaded=True)]
+        self.mock_object(self.manager, 'list',
+                         mock.Mock(return_value=pools))
+        mock_monotonic = self.mock_object(scheduler_stats.time, 'monotonic',
+                                          mock.Mock(return_value=100.0))
+
+        snapshot = self.manager.snapshot(search_opts={'host': 'host1'})
+        mock_monotonic.return_value = 159.0
+
+        self.assertIs(snapshot,
+                      self.manager.snapshot(search_opts={'host': 'host1'}))
+        self.assertEqual([10.0], snapshot.total_capacity_gb)
+        self.assertEqual(100.0, snapshot.taken_at)
+        self.manager.list.assert_called_once_with(
+            detailed=True, search_opts={'host': 'host1'})
+
+        self.manager.snapshot()
+        mock_monotonic.return_value = 160.0
+        snapshot = self.manager.snapshot(search_opts={'host': 'host1'})
+
+        self.assertEqual(160.0, snapshot.taken_at)
+        self.assertEqual(3, self.manager.list.call_count)
@@ -77,14 +77,16 @@ class SecurityServiceTest(utils.TestCase):
         with mock.patch.object(self.manager, '_delete', mock.Mock()):
             self.manager.delete(security_service)
             self.manager._delete.assert_called_once_with(
-                security_services.RESOURCE_PATH % security_service)
+                security_services.RESOURCE_PATH % security_service,
+                resource_id=security_service)
 
     def test_delete_by_object(self):
         security_service = self._FakeSecurityService()
         with mock.patch.object(self.manager, '_delete', mock.Mock()):
             self.manager.delete(security_service)
             self.manager._delete.assert_called_once_with(
-                security_services.RESOURCE_PATH % security_service.id)
+                security_services.RESOURCE_PATH % security_service.id,
+                resource_id=security_service.id)
 
     def test_get(self):
         security_service = 'fake service'
@@ -0,0 +1,198 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+import six
+
+from manilaclient import exceptions
+from manilaclient.tests.unit import utils
+from manilaclient.tests.unit.v2 import fakes
+from manilaclient.v2 import share_access_rules
+
+
+def fake_rule(manager, access_id, access_to, access_level='rw',
+              state='active', metadata=None):
+    return share_access_rules.ShareAccessRule(manager, {
+        'id': access_id, 'access_type': 'ip', 'access_to': access_to,
+        'access_level': access_level, 'state': state,
+        'metadata': metadata or {}}, loaded=True)
+
+
+class ShareAccessRulesTest(utils.TestCase):
+
+    def setUp(self):
+        super(ShareAccessRulesTest, self).setUp()
+        self.cs = fakes.FakeClient()
+        self.manager = self.cs.share_access_rules
+        self.mock_list = self.mock_object(
+            self.manager, 'access_list', mock.Mock(return_value=[
+                fake_rule(self.manager, 'keep', '10.0.0.1',
+                          metadata={'a': '1', 'b': '2'}),
+                fake_rule(self.manager, 'level', '10.0.0.2'),
+                fake_rule(self.manager, 'error', '10.0.0.3', state='error'),
+                fake_rule(self.manager, 'drop', '10.0.0.4'),
+            ]))
+        self.desired = [
+            {'access_type': 'ip', 'access_to': '10.0.0.1',
+             'metadata': {'a': '1', 'c': '3'}},
+            {'access_type': 'ip', 'access_to': '10.0.0.2',
+             'access_level': 'ro'},
+            {'access_type': 'ip', 'access_to': '10.0.0.3'},
+            {'access_type': 'ip', 'access_to': '10.0.0.5',
+             'metadata': {'d': '4'}},
+        ]
+
+    def test_plan(self):
+        changes = self.manager.plan('1234', self.desired)
+
+        self.assertEqual([
+            ('update', '10.0.0.1', 'rw', {'b': None, 'c': '3'}, 'keep'),
+            ('deny', '10.0.0.2', 'rw', {}, 'level'),
+            ('deny', '10.0.0.3', 'rw', {}, 'error'),
+            ('deny', '10.0.0.4', 'rw', {}, 'drop'),
+            ('allow', '10.0.0.2', 'ro', None, None),
+            ('allow', '10.0.0.3', 'rw', None, None),
+            ('allow', '10.0.0.5', 'rw', {'d': '4'}, None),
+        ], [(c.action, c.access_to, c.access_level, c.metadata, c.access_id)
+            for c in changes])
+        self.mock_list.assert_called_once_with('1234')
+
+    def test_plan_nothing(self):
+        self.mock_list.return_value = self.mock_list.return_value[:2]
+        desired = [{'access_type': 'ip', 'access_to': '10.0.0.1'},
+                   {'access_type': 'ip', 'access_to': '10.0.0.2',
+                    'access_level': 'rw', 'metadata': {}}]
+
+        self.assertEqual([], self.manager.plan('1234', desired))
+
+    def test_plan_repeated_rule(self):
+        self.assertRaises(ValueError, self.manager.plan, '1234',
+                          [self.desired[0], self.desired[0]])
+
+    def test_reconcile_many(self):
+        calls = []
+        rules = list(self.mock_list.return_value)
+        denied = []
+        denying = []
+
+        def access_list(share):
+            calls.append(('list', share))
+            # NOTE: the denied rules are still listed once after they are
+            # denied, and gone from the next listing.
+            for rule in list(rules):
+                if rule.id in denying:
+                    rules.remove(rule)
+            denying.extend(denied)
+            return list(rules)
+
+        def allow(share, access_type, access, access_level, metadata):
+            calls.append(('allow', access))
+            if access == '10.0.0.3':
+                raise exceptions.BadRequest(400)
+            return {'id': 'new-' + access}
+
+        def deny(share, access_id):
+            calls.append(('deny', access_id))
+            denied.append(access_id)
+
+        self.mock_list.side_effect = access_list
+        self.mock_list.return_value = None
+        self.mock_object(self.cs.shares, 'allow', mock.Mock(side_effect=allow))
+        self.mock_object(self.cs.shares, 'deny', mock.Mock(side_effect=deny))
+        mock_set = self.mock_object(self.manager, 'set_metadata')
+        mock_unset = self.mock_object(self.manager, 'unset_metadata')
+        mock_sleep = self.mock_object(share_access_rules.time, 'sleep')
+
+        changes = self.manager.reconcile_many([('1234', self.desired)],
+                                              max_workers=1, interval=5)
+
+        self.assertEqual(
+            [('update', 'keep', None), ('deny', 'level', None),
+             ('deny', 'error', None), ('deny', 'drop', None),
+             ('allow', 'new-10.0.0.2', None),
+             ('allow', None, exceptions.BadRequest),
+             ('allow', 'new-10.0.0.5', None)],
+            [(c.action, c.access_id, c.error and type(c.error))
+             for c in changes])
+        # NOTE: the rules are allowed once the denied ones are gone.
+        self.assertEqual(['list', 'deny', 'deny', 'deny', 'list', 'list',
+                          'allow', 'allow', 'allow'],
+                         [call[0] for call in calls])
+        self.assertEqual([mock.call(5)], mock_sleep.call_args_list)
+        mock_set.assert_called_once_with('keep', {'c': '3'})
+        mock_unset.assert_called_once_with('keep', ['b'])
+
+    def test_reconcile_many_deny_error(self):
+        rules = self.mock_list.return_value
+        self.mock_list.side_effect = [
+            rules, [r for r in rules if r.id in ('keep', 'error')]]
+        mock_allow = self.mock_object(self.cs.shares, 'allow', mock.Mock(
+            return_value={'id': 'new'}))
+        mock_deny = self.mock_object(self.cs.shares, 'deny', mock.Mock(
+            side_effect=[None, exceptions.BadRequest(400), None]))
+        self.mock_object(self.manager, 'set_metadata')
+        self.mock_object(self.manager, 'unset_metadata')
+        self.mock_object(share_access_rules.time, 'sleep')
+
+        changes = self.manager.reconcile_many([('1234', self.desired)],
+                                              max_workers=1)
+
+        # NOTE: the rule whose deny failed is not allowed again.
+        self.assertEqual(
+            [('update', '10.0.0.1', None), ('deny', '10.0.0.2', None),
+             ('deny', '10.0.0.3', exceptions.BadRequest),
+             ('deny', '10.0.0.4', None), ('allow', '10.0.0.2', None),
+             ('allow', '10.0.0.5', None)],
+            [(c.action, c.access_to, c.error and type(c.error))
+             for c in changes])
+        self.assertEqual(['level', 'error', 'drop'],
+                         [c[0][1] for c in mock_deny.call_args_list])
+        self.assertEqual(['10.0.0.2', '10.0.0.5'],
+                         [c[0][2] for c in mock_allow.call_args_list])
+
+    def test_reconcile_many_deny_pending(self):
+        mock_allow = self.mock_object(self.cs.shares, 'allow')
+        mock_deny = self.mock_object(self.cs.shares, 'deny')
+        self.mock_object(self.manager, 'set_metadata')
+        self.mock_object(self.manager, 'unset_metadata')
+        mock_sleep = self.mock_object(share_access_rules.time, 'sleep')
+        self.mock_object(share_access_rules.time, 'monotonic',
+                         mock.Mock(side_effect=[0, 5, 10]))
+
+        changes = self.manager.reconcile_many([('1234', self.desired)],
+                                              interval=5, timeout=10)
+
+        self.assertEqual(3, mock_deny.call_count)
+        self.assertFalse(mock_allow.called)
+        self.assertEqual(3, self.mock_list.call_count)
+        self.assertEqual([mock.call(5)], mock_sleep.call_args_list)
+        errors = [c.error for c in changes if c.action == 'allow']
+        self.assertEqual(3, len(errors))
+        for error in errors:
+            self.assertIsInstance(error, exceptions.ClientException)
+            self.assertIn('error, level', six.text_type(error))
+
+    def test_reconcile_dry_run(self):
+        mock_allow = self.mock_object(self.cs.shares, 'allow')
+
+        changes = self.manager.reconcile('1234', self.desired, dry_run=True)
+
+        self.assertEqual(7, len(changes))
+        self.assertFalse(mock_allow.called)
+
+    def test_reconcile_listing_error(self):
+        self.mock_list.side_effect = exceptions.NotFound(404)
+        mock_deny = self.mock_object(self.cs.shares, 'deny')
+
+        self.assertRaises(exceptions.NotFound, self.manager.reconcile,
+                          '1234', [])
+        self.assertFalse(mock_deny.called)
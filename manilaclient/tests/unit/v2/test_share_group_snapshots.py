@@ -241,7 +241,8 @@ class ShareGroupSnapshotManagerTest(utils.TestCase):
         self.manager.delete(fake.ShareGroupSnapshot())
 
         mock_delete.assert_called_once_with(
-            snapshots.RESOURCE_PATH % fake.ShareGroupSnapshot.id)
+            snapshots.RESOURCE_PATH % fake.ShareGroupSnapshot.id,
+            resource_id=fake.ShareGroupSnapshot.id)
         self.assertFalse(mock_post.called)
 
     def test_delete_force(self):
@@ -212,4 +212,5 @@ class ShareGroupTypeManagerTest(utils.TestCase):
         self.manager.delete(fake.ShareGroupType())
 
         mock_delete.assert_called_once_with(
-            types.RESOURCE_PATH % fake.ShareGroupType.id)
+            types.RESOURCE_PATH % fake.ShareGroupType.id,
+            resource_id=fake.ShareGroupType.id)
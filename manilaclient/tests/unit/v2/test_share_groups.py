@@ -296,7 +296,8 @@ class ShareGroupManagerTest(utils.TestCase):
         self.manager.delete(fake.ShareGroup())
 
         mock_delete.assert_called_once_with(
-            share_groups.RESOURCE_PATH % fake.ShareGroup.id)
+            share_groups.RESOURCE_PATH % fake.ShareGroup.id,
+            resource_id=fake.ShareGroup.id)
         self.assertFalse(mock_post.called)
 
     def test_delete_force(self):
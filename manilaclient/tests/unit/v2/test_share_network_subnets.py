@@ -79,4 +79,4 @@ class ShareNetworkSubnetTest(utils.TestCase):
                 share_network_subnets.RESOURCE_PATH % {
                     'share_network_id': share_network,
                     'share_network_subnet_id': share_subnet
-                })
+                }, resource_id=share_subnet)
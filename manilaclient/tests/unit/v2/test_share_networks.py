@@ -68,14 +68,15 @@ class ShareNetworkTest(utils.TestCase):
         with mock.patch.object(self.manager, '_delete', mock.Mock()):
             self.manager.delete(share_nw)
             self.manager._delete.assert_called_once_with(
-                share_networks.RESOURCE_PATH % share_nw)
+                share_networks.RESOURCE_PATH % share_nw, resource_id=share_nw)
 
     def test_delete_obj(self):
         share_nw = self._FakeShareNetwork()
         with mock.patch.object(self.manager, '_delete', mock.Mock()):
             self.manager.delete(share_nw)
             self.manager._delete.assert_called_once_with(
-                share_networks.RESOURCE_PATH % share_nw.id)
+                share_networks.RESOURCE_PATH % share_nw.id,
+                resource_id=share_nw.id)
 
     def test_get(self):
         share_nw = 'fake share nw'
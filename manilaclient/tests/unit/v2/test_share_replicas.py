@@ -57,14 +57,16 @@ class ShareReplicasTest(utils.TestCase):
         with mock.patch.object(self.manager, '_delete', mock.Mock()):
             self.manager.delete(FAKE_REPLICA)
             self.manager._delete.assert_called_once_with(
-                share_replicas.RESOURCE_PATH % FAKE_REPLICA)
+                share_replicas.RESOURCE_PATH % FAKE_REPLICA,
+                resource_id=FAKE_REPLICA)
 
     def test_delete_obj(self):
         replica = self._FakeShareReplica
         with mock.patch.object(self.manager, '_delete', mock.Mock()):
             self.manager.delete(replica)
             self.manager._delete.assert_called_once_with(
-                share_replicas.RESOURCE_PATH % replica.id)
+                share_replicas.RESOURCE_PATH % replica.id,
+                resource_id=replica.id)
 
     def test_delete_with_force(self):
         with mock.patch.object(self.manager, '_action', mock.Mock()):
@@ -178,7 +178,8 @@ class ShareServerManagerTest(utils.TestCase):
         with mock.patch.object(self.manager, '_delete', mock.Mock()):
             self.manager.delete(share_server_id)
             self.manager._delete.assert_called_once_with(
-                share_servers.RESOURCE_PATH % share_server_id)
+                share_servers.RESOURCE_PATH % share_server_id,
+                resource_id=share_server_id)
 
     def test_get(self):
         server = FakeShareServer()
@@ -129,6 +129,15 @@ class ShareSnapshotsTest(utils.TestCase):
             detailed=False, sort_key='status', sort_dir='desc')
         cs.assert_called('GET', '/snapshots?sort_dir=desc&sort_key=status')
 
+    def test_watch(self):
+        watch = cs.share_snapshots.watch(page_size=5, since='2020-01-01',
+                                         max_polls=1)
+
+        self.assertEqual([], list(watch))
+        cs.assert_called(
+            'GET', '/snapshots/detail?limit=5&sort_dir=desc&'
+                   'sort_key=updated_at')
+
     def test_list_share_snapshots_by_improper_direction(self):
         self.assertRaises(ValueError, cs.share_snapshots.list, sort_dir='fake')
 
@@ -24,6 +24,9 @@ from manilaclient import exceptions
 from manilaclient import extension
 from manilaclient.tests.unit import utils
 from manilaclient.tests.unit.v2 import fakes
+from manilaclient.v2 import capacity
+from manilaclient.v2 import scheduler_stats
+from manilaclient.v2 import share_types
 from manilaclient.v2 import shares
 
 extensions = [
@@ -135,6 +138,32 @@ class SharesTest(utils.TestCase):
                          availability_zone=availability_zone)
         cs.assert_called('POST', '/shares', body)
 
+    def test_check_placement(self):
+        share_type = share_types.ShareType(cs.share_types, {
+            'id': 'fake_st', 'extra_specs': {'qos': '<is> True'}})
+        snapshot = capacity.PoolSnapshot([
+            scheduler_stats.Pool(cs.pools, {
+                'name': 'host1@backend1#pool%s' % i, 'capabilities': {
+                    'qos': qos, 'storage_protocol': 'NFS_CIFS',
+                    'free_capacity_gb': 10}}, loaded=True)
+            for i, qos in ((1, True), (2, False))])
+        mock_snapshot = self.mock_object(
+            cs.pools, 'snapshot', mock.Mock(return_value=snapshot))
+
+        checks = cs.shares.check_placement('nfs', 1, share_type=share_type,
+                                           ttl=0)
+
+        self.assertEqual([('host1@backend1#pool1', None),
+                          ('host1@backend1#pool2', 'capabilities')],
+                         [(c.pool, c.reason) for c in checks])
+        mock_snapshot.assert_called_once_with(ttl=0)
+
+    def test_check_placement_default_share_type(self):
+        checks = cs.shares.check_placement('nfs', 1, ttl=0)
+
+        self.assertEqual(['capabilities'] * 2, [c.reason for c in checks])
+        cs.assert_called_anytime('GET', '/types/default')
+
     @ddt.data(
         type('ShareUUID', (object, ), {'uuid': '1234'}),
         type('ShareID', (object, ), {'id': '1234'}),
@@ -378,6 +407,236 @@ class SharesTest(utils.TestCase):
     def test_list_shares_by_improper_direction(self):
         self.assertRaises(ValueError, cs.shares.list, sort_dir='fake')
 
+    def test_count(self):
+        manager = shares.ShareManager(
+            fakes.FakeClient(api_version=api_versions.APIVersion('2.42')))
+        mock_list = self.mock_object(
+            manager, '_list', mock.Mock(return_value=([], 42)))
+
+        result = manager.count(search_opts={'status': 'available',
+                                            'limit': 10, 'offset': 5})
+
+        self.assertEqual(42, result)
+        mock_list.assert_called_once_with(
+            '/shares?is_public=True&limit=1&status=available&'
+            'with_count=True', 'shares')
+
+    @ddt.data(('2.41', [['s1', 's2'], ['s3']]),
+              # The API does not count the shares.
+              ('2.42', [['s1'], ['s1', 's2'], ['s3']]))
+    @ddt.unpack
+    def test_count_tally(self, microversion, pages):
+        version = api_versions.APIVersion(microversion)
+        manager = shares.ShareManager(fakes.FakeClient(api_version=version))
+        self.mock_object(shares, 'PAGE_SIZE', 2)
+        mock_list = self.mock_object(manager, '_list',
+                                     mock.Mock(side_effect=pages))
+
+        result = manager.count(search_opts={'status': 'available'})
+
+        self.assertEqual(3, result)
+        mock_list.assert_called_with(
+            '/shares?is_public=True&limit=2&offset=2&status=available',
+            'shares')
+
+    def test_iterate(self):
+        mock_list = self.mock_object(
+            cs.shares, 'list',
+            mock.Mock(side_effect=[['s1', 's2'], ['s3', 's4'], []]))
+
+        shares_iter = cs.shares.iterate(
+            search_opts={'status': 'available', 'limit': 1, 'offset': 1},
+            sort_key='name', page_size=2)
+
+        self.assertEqual(['s1', 's2'], [next(shares_iter), next(shares_iter)])
+        self.assertEqual(1, mock_list.call_count)
+        self.assertEqual(['s3', 's4'], list(shares_iter))
+        mock_list.assert_has_calls([
+            mock.call(detailed=True, sort_key='name', sort_dir=None,
+                      search_opts={'status': 'available', 'limit': 2,
+                                   'offset': offset})
+            for offset in (1, 3, 5)])
+
+    def test_iterate_marker_limit(self):
+        pages = [[shares.Share(None, {'id': share_id}, loaded=True)
+                  for share_id in page] for page in (('1', '2', '3'), ('4',))]
+        mock_list = self.mock_object(cs.shares, 'list',
+                                     mock.Mock(side_effect=pages))
+
+        result = cs.shares.iterate(detailed=False, sort_key='created_at',
+                                   sort_dir='desc', page_size=3, marker='2',
+                                   limit=2)
+
+        self.assertEqual(['3', '4'], [share.id for share in result])
+        self.assertEqual([
+            mock.call(detailed=False, sort_key='created_at', sort_dir='desc',
+                      search_opts={'limit': limit, 'offset': offset})
+            for limit, offset in ((3, 0), (1, 3))], mock_list.call_args_list)
+
+    def test_allow_many(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+        error = client_exceptions.BadRequest(400)
+
+        def allow(share, *args):
+            if share == '2':
+                raise error
+            return {'id': 'a' + share}
+
+        mock_allow = self.mock_object(manager, 'allow',
+                                      mock.Mock(side_effect=allow))
+
+        results = manager.allow_many(['1', '2', '3'], 'ip', '10.0.0.1',
+                                     'ro', max_workers=2)
+
+        self.assertEqual([shares.AccessResult('1', {'id': 'a1'}, None),
+                          shares.AccessResult('2', None, error),
+                          shares.AccessResult('3', {'id': 'a3'}, None)],
+                         results)
+        mock_allow.assert_has_calls(
+            [mock.call(share, 'ip', '10.0.0.1', 'ro', None)
+             for share in ('1', '2', '3')], any_order=True)
+
+    def _mock_iterate_metadata(self, manager):
+        listed = [
+            shares.Share(manager, {'id': '1', 'metadata': {'a': '1'}}),
+            shares.Share(manager, {'id': '2', 'metadata': {'a': '2',
+                                                           'b': '1'}}),
+            shares.Share(manager, {'id': '3'}),
+        ]
+        return self.mock_object(manager, 'iterate',
+                                mock.Mock(return_value=iter(listed)))
+
+    def test_update_metadata_many(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+        mock_iterate = self._mock_iterate_metadata(manager)
+        error = client_exceptions.BadRequest(400)
+        mock_set = self.mock_object(manager, 'set_metadata',
+                                    mock.Mock(side_effect=[None, error]))
+        mock_delete = self.mock_object(manager, 'delete_metadata')
+        progress = mock.Mock()
+
+        results = manager.update_metadata_many(
+            {'a': '1'}, ['b'], search_opts={'name': 'foo'}, max_workers=1,
+            progress=progress)
+
+        self.assertEqual([('1', {}, [], None), ('2', {'a': '1'}, ['b'], None),
+                          ('3', {'a': '1'}, [], error)],
+                         [(r.share.id,) + r[1:] for r in results])
+        mock_iterate.assert_called_once_with(
+            search_opts={'name': 'foo', 'is_public': False})
+        self.assertEqual(['2', '3'], [c[0][0].id for c in
+                                      mock_set.call_args_list])
+        mock_delete.assert_called_once_with(results[1].share, ['b'])
+        self.assertEqual(results[1:], [c[0][0] for c in
+                                       progress.call_args_list])
+
+    def test_update_metadata_many_shares(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+        self._mock_iterate_metadata(manager)
+        mock_delete = self.mock_object(manager, 'delete_metadata')
+
+        results = manager.update_metadata_many(
+            keys=['a'], shares=['4', '2'], dry_run=True)
+
+        self.assertEqual([('2', ['a'], None), ('4', [], exceptions.NotFound)],
+                         [(getattr(r.share, 'id', r.share), r.unset,
+                           r.error and type(r.error)) for r in results])
+        self.assertFalse(mock_delete.called)
+
+    def test_update_metadata_many_conflict(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+
+        self.assertRaises(ValueError, manager.update_metadata_many,
+                          {'a': '1'}, ['a'])
+
+    def test_deny_many(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+        mock_deny = self.mock_object(manager, 'deny')
+
+        results = manager.deny_many([('1', 'a1'), ('2', 'a2')])
+
+        self.assertEqual([shares.AccessResult('1', 'a1', None),
+                          shares.AccessResult('2', 'a2', None)], results)
+        self.assertEqual(2, mock_deny.call_count)
+
+    def test_wait_for_access_rules(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+        statuses = {'1': ['syncing', 'active'], '2': ['syncing', 'error']}
+        mock_get = self.mock_object(manager, 'get', mock.Mock(
+            side_effect=lambda share_id: shares.Share(manager, {
+                'id': share_id,
+                'access_rules_status': statuses[share_id].pop(0)})))
+        mock_iterate = self.mock_object(manager, 'iterate')
+        mock_sleep = self.mock_object(shares.time, 'sleep')
+
+        result = manager.wait_for_access_rules(
+            ['1', shares.Share(manager, {'id': '2'})], interval=1)
+
+        self.assertEqual({'1': 'active', '2': 'error'}, result)
+        self.assertEqual(4, mock_get.call_count)
+        self.assertFalse(mock_iterate.called)
+        mock_sleep.assert_called_once_with(1)
+
+    def test_wait_for_access_rules_many(self):
+        self.mock_object(shares, 'ACCESS_WAIT_GETS', 1)
+        manager = shares.ShareManager(fakes.FakeClient())
+        statuses = {'1': ['active', 'active'], '2': ['syncing', 'error'],
+                    '3': ['active'], '4': ['syncing', 'active']}
+        listed = []
+
+        def fake_share(share_id):
+            return shares.Share(manager, {
+                'id': share_id,
+                'access_rules_status': statuses[share_id].pop(0)})
+
+        def iterate(search_opts=None):
+            for share_id in sorted(statuses):
+                listed.append(share_id)
+                yield fake_share(share_id)
+
+        mock_iterate = self.mock_object(manager, 'iterate',
+                                        mock.Mock(side_effect=iterate))
+        mock_get = self.mock_object(manager, 'get',
+                                    mock.Mock(side_effect=fake_share))
+        mock_sleep = self.mock_object(shares.time, 'sleep')
+
+        result = manager.wait_for_access_rules(
+            ['1', '2', '4'], search_opts={'name': 'x'}, interval=1)
+
+        self.assertEqual({'1': 'active', '2': 'error', '4': 'active'}, result)
+        self.assertEqual([mock.call(search_opts={'name': 'x'})] * 2,
+                         mock_iterate.call_args_list)
+        # NOTE: the listing stops once one pending share is left, which is
+        # fetched.
+        self.assertEqual(['1', '2', '1', '2'], listed)
+        self.assertEqual([mock.call('4')] * 2, mock_get.call_args_list)
+        mock_sleep.assert_called_once_with(1)
+
+    def test_wait_for_access_rules_timeout(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+        self.mock_object(manager, 'get', mock.Mock(
+            return_value=shares.Share(manager, {
+                'id': '1', 'access_rules_status': 'syncing'})))
+
+        result = manager.wait_for_access_rules(['1'], timeout=0)
+
+        self.assertEqual({'1': 'syncing'}, result)
+
+    def test_wait_for_access_rules_default_timeout(self):
+        manager = shares.ShareManager(fakes.FakeClient())
+        self.mock_object(manager, 'get', mock.Mock(
+            return_value=shares.Share(manager, {
+                'id': '1', 'access_rules_status': 'syncing'})))
+        self.mock_object(shares.time, 'monotonic', mock.Mock(
+            side_effect=[0, shares.ACCESS_WAIT_TIMEOUT - 1,
+                         shares.ACCESS_WAIT_TIMEOUT]))
+        mock_sleep = self.mock_object(shares.time, 'sleep')
+
+        result = manager.wait_for_access_rules(['1'], interval=1)
+
+        self.assertEqual({'1': 'syncing'}, result)
+        mock_sleep.assert_called_once_with(1)
+
     def test_list_shares_by_improper_key(self):
         self.assertRaises(ValueError, cs.shares.list, sort_key='fake')
 
@@ -32,14 +32,17 @@ from manilaclient import shell
 from manilaclient.tests.unit import utils as test_utils
 from manilaclient.tests.unit.v2 import fakes
 from manilaclient import utils
+from manilaclient.v2 import capacity
 from manilaclient.v2 import messages
 from manilaclient.v2 import security_services
+from manilaclient.v2 import share_access_rules
 from manilaclient.v2 import share_instances
 from manilaclient.v2 import share_network_subnets
 from manilaclient.v2 import share_networks
 from manilaclient.v2 import share_servers
 from manilaclient.v2 import share_snapshots
 from manilaclient.v2 import share_types
+from manilaclient.v2 import shares
 from manilaclient.v2 import shell as shell_v2
 
 
@@ -157,11 +160,21 @@ class ShellTest(test_utils.TestCase):
     @mock.patch.object(cliutils, 'print_list', mock.Mock())
     def test_list_select_column(self):
         self.run_command('list --column id,name')
-        self.assert_called('GET', '/shares/detail')
+        self.assert_called('GET', '/shares')
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
             ['Id', 'Name'], sortby_index=None)
 
+    @ddt.data(('list', '/shares'),
+              ('snapshot-list', '/snapshots'),
+              ('share-network-list', '/share-networks'))
+    @ddt.unpack
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_list_select_detail_column(self, command, path):
+        self.run_command(command + ' --columns id,status')
+
+        self.assert_called('GET', path + '/detail')
+
     def test_list_sort_by_name(self):
         self.run_command('list --sort_key name')
         self.assert_called('GET', '/shares/detail?sort_key=name')
@@ -189,7 +202,7 @@ class ShellTest(test_utils.TestCase):
     @mock.patch.object(cliutils, 'print_list', mock.Mock())
     def test_list_select_column_and_all_tenants(self):
         self.run_command('list --columns ID,Name --all-tenants')
-        self.assert_called('GET', '/shares/detail?all_tenants=1')
+        self.assert_called('GET', '/shares?all_tenants=1')
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
             ['Id', 'Name'], sortby_index=None)
@@ -197,7 +210,7 @@ class ShellTest(test_utils.TestCase):
     @mock.patch.object(cliutils, 'print_list', mock.Mock())
     def test_list_select_column_and_public(self):
         self.run_command('list --columns ID,Name --public')
-        self.assert_called('GET', '/shares/detail?is_public=True')
+        self.assert_called('GET', '/shares?is_public=True')
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
             ['Id', 'Name'], sortby_index=None)
@@ -212,6 +225,43 @@ class ShellTest(test_utils.TestCase):
             self.run_command('list --all-tenants' + separator + '0')
             self.assert_called('GET', '/shares/detail')
 
+    @mock.patch('sys.stdout', new_callable=six.StringIO)
+    def test_list_count_only(self, mock_stdout):
+        mock_count = self.mock_object(
+            shares.ShareManager, 'count', mock.Mock(return_value=7))
+
+        self.run_command('list --count-only --status available')
+
+        self.assertEqual('7\n', mock_stdout.getvalue())
+        search_opts = mock_count.call_args[1]['search_opts']
+        self.assertEqual('available', search_opts['status'])
+        self.assertEqual([], self.shell.cs.client.callstack)
+
+    @ddt.data('json', 'jsonl', 'csv', 'value')
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_list_format_streams_pages(self, output_format):
+        shares_iter = iter([])
+        mock_iterate = self.mock_object(
+            shares.ShareManager, 'iterate',
+            mock.Mock(return_value=shares_iter))
+
+        self.run_command('--format %s list --offset 3' % output_format)
+
+        self.assertEqual([], self.shell.cs.client.callstack)
+        self.assertEqual(3, mock_iterate.call_args[1]['search_opts']['offset'])
+        self.assertIs(shares_iter, cliutils.print_list.call_args[0][0])
+        self.assertEqual(output_format, cliutils.get_output_format())
+
+    @ddt.data('table', 'json')
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_list_format_limit(self, output_format):
+        mock_iterate = self.mock_object(shares.ShareManager, 'iterate')
+
+        self.run_command('--format %s list --limit 2' % output_format)
+
+        self.assert_called('GET', '/shares/detail?limit=2')
+        self.assertFalse(mock_iterate.called)
+
     def test_list_filter_by_share_server_and_its_aliases(self):
         aliases = [
             '--share-server-id', '--share-server_id',
@@ -414,6 +464,24 @@ class ShellTest(test_utils.TestCase):
             self.run_command('list --count' + separator + value)
             self.assert_called('GET', except_url)
 
+    @ddt.data('table', 'json')
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_list_with_count_format(self, output_format):
+        self.mock_object(shares.ShareManager, 'list',
+                         mock.Mock(return_value=([], 2)))
+        stdout = self.useFixture(fixtures.MonkeyPatch(
+            'sys.stdout', six.StringIO())).new_value
+        stderr = self.useFixture(fixtures.MonkeyPatch(
+            'sys.stderr', six.StringIO())).new_value
+
+        self.run_command('--format %s list --count True' % output_format)
+
+        total = 'Shares in total: 2\n'
+        self.assertEqual(output_format == 'table',
+                         total in stdout.getvalue())
+        self.assertEqual(output_format != 'table',
+                         total in stderr.getvalue())
+
     @ddt.data('True', 'False')
     def test_list_filter_with_count_invalid_version(self, value):
         self.assertRaises(
@@ -936,7 +1004,7 @@ class ShellTest(test_utils.TestCase):
     @mock.patch.object(cliutils, 'print_list', mock.Mock())
     def test_snapshot_list_select_column(self):
         self.run_command('snapshot-list --columns id,name')
-        self.assert_called('GET', '/snapshots/detail')
+        self.assert_called('GET', '/snapshots')
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
             ['Id', 'Name'], sortby_index=None)
@@ -1537,7 +1605,7 @@ class ShellTest(test_utils.TestCase):
         self.run_command('share-network-list')
         self.assert_called(
             'GET',
-            '/share-networks/detail',
+            '/share-networks',
         )
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
@@ -1548,7 +1616,7 @@ class ShellTest(test_utils.TestCase):
         self.run_command('share-network-list --columns id')
         self.assert_called(
             'GET',
-            '/share-networks/detail',
+            '/share-networks',
         )
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
@@ -1559,7 +1627,7 @@ class ShellTest(test_utils.TestCase):
         self.run_command('share-network-list --all-tenants')
         self.assert_called(
             'GET',
-            '/share-networks/detail?all_tenants=1',
+            '/share-networks?all_tenants=1',
         )
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
@@ -1576,7 +1644,7 @@ class ShellTest(test_utils.TestCase):
                               'ss_id': ss.id})
             self.assert_called(
                 'GET',
-                '/share-networks/detail?security_service_id=%s' % ss.id,
+                '/share-networks?security_service_id=%s' % ss.id,
             )
             shell_v2._find_security_service.assert_called_with(mock.ANY, ss.id)
             cliutils.print_list.assert_called_with(
@@ -1589,7 +1657,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s 1234' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?project_id=1234',
+                '/share-networks?project_id=1234',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1601,7 +1669,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s 2001-01-01' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?created_before=2001-01-01',
+                '/share-networks?created_before=2001-01-01',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1613,7 +1681,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s 2001-01-01' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?created_since=2001-01-01',
+                '/share-networks?created_since=2001-01-01',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1626,7 +1694,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s fake-id' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?neutron_net_id=fake-id',
+                '/share-networks?neutron_net_id=fake-id',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1639,7 +1707,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s fake-id' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?neutron_subnet_id=fake-id',
+                '/share-networks?neutron_subnet_id=fake-id',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1651,7 +1719,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s local' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?network_type=local',
+                '/share-networks?network_type=local',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1663,7 +1731,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s 1234' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?segmentation_id=1234',
+                '/share-networks?segmentation_id=1234',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1675,7 +1743,7 @@ class ShellTest(test_utils.TestCase):
             self.run_command('share-network-list %s 4' % command)
             self.assert_called(
                 'GET',
-                '/share-networks/detail?ip_version=4',
+                '/share-networks?ip_version=4',
             )
             cliutils.print_list.assert_called_with(
                 mock.ANY,
@@ -1706,7 +1774,7 @@ class ShellTest(test_utils.TestCase):
                                              (k, v) in filters.items()]))
         self.assert_called(
             'GET',
-            '/share-networks/detail?%s' % query,
+            '/share-networks?%s' % query,
         )
         cliutils.print_list.assert_called_once_with(
             mock.ANY,
@@ -1718,7 +1786,7 @@ class ShellTest(test_utils.TestCase):
                              'fake_name')
             self.assert_called(
                 'GET',
-                '/share-networks/detail?name~=fake_name')
+                '/share-networks?name~=fake_name')
 
     def test_share_network_list_filter_by_inexact_description(self):
         for separator in self.separators:
@@ -1726,7 +1794,7 @@ class ShellTest(test_utils.TestCase):
                              'fake_description')
             self.assert_called(
                 'GET',
-                '/share-networks/detail?description~=fake_description')
+                '/share-networks?description~=fake_description')
 
     def test_share_network_list_filter_by_inexact_unicode_name(self):
         for separator in self.separators:
@@ -1734,7 +1802,7 @@ class ShellTest(test_utils.TestCase):
                              u'ффф')
             self.assert_called(
                 'GET',
-                '/share-networks/detail?name~=%D1%84%D1%84%D1%84')
+                '/share-networks?name~=%D1%84%D1%84%D1%84')
 
     def test_share_network_list_filter_by_inexact_unicode_description(self):
         for separator in self.separators:
@@ -1742,7 +1810,7 @@ class ShellTest(test_utils.TestCase):
                              u'ффф')
             self.assert_called(
                 'GET',
-                '/share-networks/detail?description~=%D1%84%D1%84%D1%84')
+                '/share-networks?description~=%D1%84%D1%84%D1%84')
 
     def test_share_network_security_service_add(self):
         self.run_command('share-network-security-service-add fake_share_nw '
@@ -1974,6 +2042,39 @@ class ShellTest(test_utils.TestCase):
         expected['share']['metadata'] = {"key1": "value1", "key2": "value2"}
         self.assert_called("POST", "/shares", body=expected)
 
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_create_dry_run(self):
+        checks = [
+            capacity.PlacementCheck('host1@backend1#pool1', 30.0, 60.0, 0.5,
+                                    None),
+            capacity.PlacementCheck('host1@backend1#pool2', 1.0, 1.0, 0.9,
+                                    'capacity'),
+        ]
+        mock_check = self.mock_object(
+            shares.ShareManager, 'check_placement',
+            mock.Mock(return_value=checks))
+
+        self.run_command('create nfs 10 --share-type 1234 --az az1 --dry-run')
+
+        share_type = mock_check.call_args[1]['share_type']
+        self.assertEqual(1234, share_type.id)
+        mock_check.assert_called_once_with(
+            'nfs', 10, share_type=share_type, availability_zone='az1')
+        cliutils.print_list.assert_called_once_with(
+            checks[:1], ['Pool', 'Free Capacity GB',
+                         'Virtual Free Capacity GB', 'Provisioned Ratio'],
+            formatters=mock.ANY, sortby_index=None)
+        self.assertNotIn(
+            'POST', [call[0] for call in self.shell.cs.client.callstack])
+
+    def test_create_dry_run_no_pool(self):
+        error = self.assertRaises(exceptions.CommandError, self.run_command,
+                                  'create nfs 1 --dry-run')
+
+        self.assertIn('2 rejected by the capabilities filter',
+                      six.text_type(error))
+        self.assert_called('GET', '/scheduler-stats/pools/detail')
+
     def test_allow_access_cert(self):
         self.run_command("access-allow 1234 cert client.example.com")
 
@@ -2008,6 +2109,165 @@ class ShellTest(test_utils.TestCase):
 
         cmd.split.assert_called_once_with()
 
+    @mock.patch.object(cliutils, 'print_dict', mock.Mock())
+    def test_allow_access_wait(self):
+        mock_wait = self.mock_object(
+            shares.ShareManager, 'wait_for_access_rules',
+            mock.Mock(return_value={1234: 'syncing'}))
+
+        self.run_command('access-allow 1234 ip 10.0.0.6 --wait')
+
+        self.assertEqual(mock.call(mock.ANY, timeout=None),
+                         mock_wait.call_args)
+        self.assertEqual('syncing', cliutils.print_dict.call_args[0][0][
+            'access_rules_status'])
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    @ddt.data('--shares 1234,1111 ip 10.0.0.6',
+              '--shares 1234 --shares 1111 ip 10.0.0.6',
+              '1234 ip 10.0.0.6 --shares 1111')
+    def test_allow_access_many(self, args):
+        share = shares.Share(None, {'id': '1234'}, loaded=True)
+        mock_allow = self.mock_object(
+            shares.ShareManager, 'allow_many', mock.Mock(return_value=[
+                shares.AccessResult(share, {'id': 'a1', 'state': 'queuing'},
+                                    None)]))
+        mock_wait = self.mock_object(
+            shares.ShareManager, 'wait_for_access_rules',
+            mock.Mock(return_value={'1234': 'active'}))
+
+        self.run_command('access-allow %s --wait --wait-timeout 30' % args)
+
+        shares_arg = mock_allow.call_args[0][0]
+        self.assertEqual([1234, 1111], [s.id for s in shares_arg])
+        self.assertEqual(('ip', '10.0.0.6', None),
+                         mock_allow.call_args[0][1:4])
+        mock_wait.assert_called_once_with([share], timeout=30)
+        rows, fields = cliutils.print_list.call_args[0]
+        self.assertEqual(['Share', 'Access ID', 'State',
+                          'Access Rules Status', 'Error'], fields)
+        self.assertEqual('active', rows[0].access_rules_status)
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_allow_access_many_error(self):
+        self.mock_object(
+            shares.ShareManager, 'allow_many', mock.Mock(return_value=[
+                shares.AccessResult(shares.Share(None, {'id': '1234'}), None,
+                                    exceptions.CommandError('bad'))]))
+
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'access-allow --shares 1234 ip 10.0.0.6')
+        self.assertTrue(cliutils.print_list.called)
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    @ddt.data(('set key1=v1', {'metadata': {'key1': 'v1'}}),
+              ('unset key1 key2', {'keys': ['key2', 'key1']}))
+    @ddt.unpack
+    def test_metadata_bulk(self, action, expected):
+        share = shares.Share(None, {'id': '1234'})
+        mock_update = self.mock_object(
+            shares.ShareManager, 'update_metadata_many',
+            mock.Mock(return_value=[
+                shares.MetadataResult(share, {'key1': 'v1'}, [], None),
+                shares.MetadataResult(share, {}, [], None)]))
+
+        self.run_command('metadata-bulk %s --shares 1234 --dry-run '
+                         '--all-tenants --filter-metadata k=v' % action)
+
+        kwargs = mock_update.call_args[1]
+        self.assertEqual([1234], [s.id for s in kwargs.pop('shares')])
+        self.assertTrue(callable(kwargs.pop('progress')))
+        self.assertEqual(dict(expected, dry_run=True, max_workers=None,
+                              search_opts={'all_tenants': 1,
+                                           'project_id': None,
+                                           'name': None, 'status': None,
+                                           'metadata': {'k': 'v'},
+                                           'is_public': False}),
+                         kwargs)
+        rows, fields = cliutils.print_list.call_args[0]
+        self.assertEqual(['Share', 'Set', 'Unset'], fields)
+        self.assertEqual(1, len(rows))
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_metadata_bulk_own_shares(self):
+        mock_list = self.mock_object(shares.ShareManager, '_list',
+                                     mock.Mock(return_value=[]))
+
+        self.run_command('metadata-bulk set key1=v1 --name foo --dry-run')
+
+        url = mock_list.call_args[0][0]
+        self.assertTrue(url.startswith('/shares/detail?'))
+        self.assertIn('name=foo', url)
+        self.assertNotIn('is_public', url)
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_metadata_bulk_error(self):
+        self.mock_object(
+            shares.ShareManager, 'update_metadata_many',
+            mock.Mock(return_value=[shares.MetadataResult(
+                shares.Share(None, {'id': '1234'}), {'key1': 'v1'}, [],
+                exceptions.NotFound(404))]))
+
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'metadata-bulk set key1=v1')
+        rows, fields = cliutils.print_list.call_args[0]
+        self.assertEqual(['Share', 'Set', 'Unset', 'Error'], fields)
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    @ddt.data(True, False)
+    def test_access_sync(self, dry_run):
+        rules_file = self.useFixture(fixtures.TempDir()).join('rules.json')
+        with open(rules_file, 'w') as f:
+            f.write('{"1234": [{"access_type": "ip", '
+                    '"access_to": "10.0.0.6"}], "1111": []}')
+        mock_reconcile = self.mock_object(
+            share_access_rules.ShareAccessRuleManager, 'reconcile_many',
+            mock.Mock(return_value=[share_access_rules.AccessChange(
+                shares.Share(None, {'id': '1234'}), 'allow', 'ip',
+                '10.0.0.6', 'rw', None, 'a1', None)]))
+        cmd = 'access-sync %s' % rules_file
+        if dry_run:
+            cmd += ' --dry-run'
+
+        self.run_command(cmd + ' --max-workers 2')
+
+        desired = mock_reconcile.call_args[0][0]
+        rule = {'access_type': 'ip', 'access_to': '10.0.0.6'}
+        self.assertEqual([(1111, []), (1234, [rule])],
+                         [(s.id, rules) for s, rules in desired])
+        self.assertEqual({'dry_run': dry_run, 'max_workers': 2},
+                         mock_reconcile.call_args[1])
+        rows, fields = cliutils.print_list.call_args[0]
+        self.assertEqual(not dry_run, 'Error' in fields)
+        self.assertEqual('a1', rows[0].access_id)
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_access_sync_error(self):
+        self.mock_object(
+            share_access_rules.ShareAccessRuleManager, 'reconcile_many',
+            mock.Mock(return_value=[share_access_rules.AccessChange(
+                shares.Share(None, {'id': '1234'}), 'deny', 'ip',
+                '10.0.0.6', 'rw', {}, 'a1', exceptions.NotFound(404))]))
+        self.mock_object(shell_v2.sys, 'stdin', six.StringIO('{"1234": []}'))
+
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'access-sync -')
+        self.assertTrue(cliutils.print_list.called)
+
+    @ddt.data('[]', '{"1234": [{"access_type": "ip"}]}', '{')
+    def test_access_sync_invalid(self, rules):
+        self.mock_object(shell_v2.sys, 'stdin', six.StringIO(rules))
+
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'access-sync -')
+
+    @ddt.data(('access-allow ip 10.0.0.6', None),
+              ('access-allow 1234 ip 10.0.0.6 --wait', '2.9'))
+    @ddt.unpack
+    def test_allow_access_invalid(self, cmd, version):
+        self.assertRaises(exceptions.CommandError, self.run_command, cmd,
+                          version=version)
+
     def test_allow_access_with_access_level(self):
         aliases = ['--access_level', '--access-level']
         expected = {
@@ -2339,6 +2599,39 @@ class ShellTest(test_utils.TestCase):
         )
         cliutils.print_dict.assert_called_once_with(mock.ANY)
 
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    @ddt.data(('', 'Share Type'),
+              ('--per-project --sort-key limit --sort-dir desc', 'Tenant ID'))
+    @ddt.unpack
+    def test_quota_report(self, options, first_field):
+        self.run_command('quota-report --tenant-ids 1234 %s' % options)
+
+        self.assert_called('GET', '/quota-sets/1234/detail')
+        usages, fields = cliutils.print_list.call_args[0]
+        self.assertEqual(first_field, fields[0])
+        self.assertEqual('Utilization %', fields[-1])
+        limits = [u.limit for u in usages]
+        if options:
+            self.assertEqual(sorted(limits, reverse=True), limits)
+            self.assertEqual(['1234'] * 5, [u.tenant_id for u in usages])
+        else:
+            self.assertEqual('gigabytes', usages[0].resource)
+        formatter = cliutils.print_list.call_args[1]['formatters'][
+            'Utilization %']
+        self.assertEqual(0.0, formatter(usages[0]))
+
+    def test_quota_report_error(self):
+        self.mock_object(shell_v2.quotas.QuotaSetManager, 'get', mock.Mock(
+            side_effect=exceptions.NotFound(404)))
+
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'quota-report --tenant-ids 1234 5678')
+
+    def test_quota_report_share_type_old_microversion(self):
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'quota-report --tenant-ids 1234 --share-type st',
+                          version='2.38')
+
     @mock.patch.object(cliutils, 'print_dict', mock.Mock())
     def test_quota_show_with_detail(self):
         self.run_command('quota-show --tenant 1234 --detail')
@@ -2416,7 +2709,7 @@ class ShellTest(test_utils.TestCase):
         self.run_command('pool-list --columns name,host')
         self.assert_called(
             'GET',
-            '/scheduler-stats/pools/detail?backend=.%2A&host=.%2A&pool=.%2A',
+            '/scheduler-stats/pools?backend=.%2A&host=.%2A&pool=.%2A',
         )
         cliutils.print_list.assert_called_with(
             mock.ANY,
@@ -2455,6 +2748,26 @@ class ShellTest(test_utils.TestCase):
             mock.ANY,
             fields=["Name", "Host", "Backend", "Pool"])
 
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_pool_capacity(self):
+        self.run_command('pool-capacity --group-by pool --host host1')
+
+        self.assert_called('GET', '/scheduler-stats/pools/detail?host=host1')
+        summaries, fields = cliutils.print_list.call_args[0]
+        self.assertEqual(['host1@backend1#pool1', 'host1@backend1#pool2'],
+                         [s.group for s in summaries])
+        self.assertEqual(['Pool', 'Pools', 'Total Capacity GB'], fields[:3])
+        self.assertEqual('Provisioned Ratio', fields[-1])
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_pool_capacity_share_type(self):
+        self.run_command('pool-capacity --share-type 1234 --count-shares')
+
+        self.assert_called_anytime('GET', '/types/1234')
+        summaries, fields = cliutils.print_list.call_args[0]
+        self.assertEqual([], summaries)
+        self.assertEqual('Shares', fields[-1])
+
     @mock.patch.object(cliutils, 'print_list', mock.Mock())
     def test_api_version(self):
         self.run_command('api-version')
@@ -3368,6 +3681,36 @@ class ShellTest(test_utils.TestCase):
         self.assert_called(
             'GET', '/messages?limit=10&offset=0')
 
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_message_list_follow(self):
+        new_message = messages.Message(
+            None, {'id': 'new', 'created_at': '2020-01-02'}, loaded=True)
+        mock_follow = self.mock_object(
+            messages.MessageManager, 'follow',
+            mock.Mock(return_value=iter([[new_message]])))
+
+        self.run_command('message-list --follow --follow-interval 1 '
+                         '--limit 10 --resource-type share')
+
+        self.assert_called(
+            'GET', '/messages?limit=10&resource_type=share')
+        mock_follow.assert_called_once_with(
+            search_opts={'resource_type': 'share', 'resource_id': None,
+                         'request_id': None, 'action_id': None,
+                         'detail_id': None, 'message_level': None},
+            since=mock.ANY, seen=mock.ANY, interval=1.0)
+        self.assertEqual([new_message],
+                         cliutils.print_list.call_args_list[-1][0][0])
+
+    @mock.patch('sys.stdout', new_callable=six.StringIO)
+    def test_message_list_jsonl(self, mock_stdout):
+        self.run_command('--format jsonl message-list')
+
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            self.assertIn('"ID": ', line)
+
     def test_message_show(self):
         self.run_command('message-show 1234')
 
@@ -3445,3 +3788,98 @@ class ShellTest(test_utils.TestCase):
         expected = {'unmanage': {'force': False}}
         self.assert_called('POST', '/share-servers/1234/action',
                            body=expected)
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_export_inventory(self):
+        output = self.useFixture(fixtures.TempDir()).join('inventory.jsonl')
+
+        def export(cs, fp, **kwargs):
+            fp.write(b'{}\n')
+            return {'shares': {'count': 1},
+                    'share_types': {'count': None, 'error': 'denied'}}
+
+        mock_export = self.mock_object(shell_v2.inventory, 'export',
+                                       mock.Mock(side_effect=export))
+
+        self.run_command('export-inventory --output %s --resource-type '
+                         'shares --resource-type share_types --all-tenants '
+                         '--max-workers 2' % output)
+
+        self.assertEqual({'resource_types': ['shares', 'share_types'],
+                          'all_tenants': 1, 'max_workers': 2},
+                         mock_export.call_args[1])
+        with open(output, 'rb') as f:
+            self.assertEqual(b'{}\n', f.read())
+        rows, fields = cliutils.print_list.call_args[0]
+        self.assertEqual(['Resource Type', 'Count', 'Error'], fields)
+        self.assertEqual([('shares', 1, ''), ('share_types', '', 'denied')],
+                         [(r.resource_type, r.count, r.error) for r in rows])
+
+    def test_export_inventory_stdout(self):
+        stdout = mock.Mock()
+        stderr = six.StringIO()
+        self.mock_object(shell_v2, 'sys', mock.Mock(stdout=stdout,
+                                                    stderr=stderr))
+        self.mock_object(shell_v2.inventory, 'export', mock.Mock(
+            return_value={'shares': {'count': None, 'error': 'denied'}}))
+
+        self.run_command('export-inventory --output -')
+
+        self.assertIs(stdout.buffer, shell_v2.inventory.export.call_args[0][1])
+        stdout.buffer.flush.assert_called_once_with()
+        self.assertEqual('Unable to export shares: denied\n',
+                         stderr.getvalue())
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_inventory_sync(self):
+        inv = mock.Mock()
+        inv.sync.return_value = {'shares': {'mode': 'incremental',
+                                            'updated': 1, 'deleted': 0,
+                                            'total': 3}}
+        self.mock_object(shell_v2.inventory, 'Inventory',
+                         mock.Mock(return_value=inv))
+
+        self.run_command('inventory-sync --resource-type shares '
+                         '--resource-type snapshots --all-tenants')
+
+        shell_v2.inventory.Inventory.assert_called_once_with(
+            mock.ANY, path=None)
+        inv.sync.assert_called_once_with(
+            resource_types=['shares', 'snapshots'], full=False,
+            all_tenants=1)
+        inv.close.assert_called_once_with()
+        rows = cliutils.print_list.call_args[0][0]
+        self.assertEqual(['shares', 'incremental', 3], [
+            rows[0].resource_type, rows[0].mode, rows[0].total])
+
+    @mock.patch.object(cliutils, 'print_list', mock.Mock())
+    def test_inventory_list(self):
+        inv = mock.Mock()
+        inv.list.return_value = ['fake_share']
+        self.mock_object(shell_v2.inventory, 'Inventory',
+                         mock.Mock(return_value=inv))
+
+        self.run_command('inventory-list shares --host host1 --metadata k=v '
+                         '--older-than 30 --inventory-file /tmp/inv.sqlite')
+
+        shell_v2.inventory.Inventory.assert_called_once_with(
+            mock.ANY, path='/tmp/inv.sqlite')
+        inv.list.assert_called_once_with(
+            'shares', metadata={'k': 'v'}, created_before=mock.ANY,
+            name=None, status=None, host='host1', project_id=None,
+            share_id=None, share_network_id=None)
+        self.assertEqual([], self.shell.cs.client.callstack)
+        cliutils.print_list.assert_called_once_with(
+            ['fake_share'], ['ID', 'Name', 'Status', 'Host', 'Created At'],
+            sortby_index=None)
+
+    def test_inventory_list_not_synced(self):
+        inv = mock.Mock()
+        inv.get_synced_at.return_value = None
+        self.mock_object(shell_v2.inventory, 'Inventory',
+                         mock.Mock(return_value=inv))
+
+        self.assertRaises(exceptions.CommandError, self.run_command,
+                          'inventory-list snapshots')
+        self.assertFalse(inv.list.called)
+        inv.close.assert_called_once_with()
@@ -10,6 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import functools
+import importlib
+
 import six
 from six.moves.urllib import parse
 
@@ -91,3 +94,69 @@ def safe_urlencode(params_dict):
 
     parsed_params = parse.urlencode(params_dict)
     return parsed_params.replace("%7E", "~")
+
+
+class LazyModule(object):
+    """Proxy of a module that is imported when first used.
+
+    Heavy dependencies are bound to a LazyModule at module level, so that
+    they are only imported by the code paths that use them and not by
+    e.g. ``manila help``. Setting and deleting attributes of the proxy,
+    like ``mock.patch.object`` does, is applied to the real module.
+
+    :param name: absolute name of the module.
+    """
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self):
+        if self._module is None:
+            object.__setattr__(self, '_module',
+                               importlib.import_module(self._name))
+        return self._module
+
+    @property
+    def __dict__(self):
+        return self._load().__dict__
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._load(), name)
+
+    def __repr__(self):
+        return '<lazy module %r>' % self._name
+
+
+def lazy_decorator(module, name, *args, **kwargs):
+    """Apply ``module.name(*args, **kwargs)`` on the first call.
+
+    Decorating a function with a decorator of a heavy dependency, e.g.
+    :mod:`debtcollector.removals`, imports it when the function is
+    defined. This defers the import, and the decoration, to the first
+    call of the function.
+
+    :param module: module of the decorator, either a name or a
+        :class:`LazyModule`.
+    :param name: name of the decorator factory in the module.
+    """
+    def decorator(func):
+        decorated = []
+
+        @functools.wraps(func)
+        def wrapper(*f_args, **f_kwargs):
+            if not decorated:
+                mod = module
+                if isinstance(mod, six.string_types):
+                    mod = importlib.import_module(mod)
+                decorated.append(getattr(mod, name)(*args, **kwargs)(func))
+            return decorated[0](*f_args, **f_kwargs)
+        return wrapper
+    return decorator
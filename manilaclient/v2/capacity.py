@@ -0,0 +1,358 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Capacity analytics over a snapshot of the backend storage pools.
+
+A :class:`PoolSnapshot` holds the pools listed in detail by
+:meth:`manilaclient.v2.scheduler_stats.PoolManager.snapshot` as columns,
+one list per attribute, parsed once. Filtering the pools by the extra
+specs of a share type selects rows of the columns, and the capacity of
+the pools is summed by backend, host, availability zone or pool from the
+columns, without requesting or parsing the pools again. The pools a share
+could be scheduled to are found from the columns the same way, applying
+the availability zone, capabilities and capacity filters of the scheduler.
+"""
+
+import collections
+import itertools
+import math
+import operator
+
+import six
+
+from manilaclient import utils
+
+strutils = utils.LazyModule('oslo_utils.strutils')
+
+# Attributes the pools are summed by, with the function giving the group
+# of a pool from its name, host, backend and capabilities.
+GROUP_BY = collections.OrderedDict((
+    ('backend', lambda name, host, backend, caps: '%s@%s' % (host, backend)),
+    ('host', lambda name, host, backend, caps: host),
+    ('availability_zone',
+     lambda name, host, backend, caps: caps.get('availability_zone')),
+    ('pool', lambda name, host, backend, caps: name),
+))
+
+# Capacity of a group of pools summed by PoolSnapshot.aggregate(). The
+# largest free capacity is the size of the largest share a pool of the
+# group can take, the provisioned ratio is the provisioned capacity over
+# the total capacity, and the shares are None unless they are counted.
+CapacitySummary = collections.namedtuple(
+    'CapacitySummary', ('group', 'pools', 'total_capacity_gb',
+                        'free_capacity_gb', 'largest_free_capacity_gb',
+                        'allocated_capacity_gb', 'provisioned_capacity_gb',
+                        'provisioned_ratio', 'shares'))
+
+# Outcome of placing a share on a pool by PoolSnapshot.place(): the
+# filter rejecting the pool, one of PLACEMENT_FILTERS, or None when the
+# share could be scheduled to it. The virtual free capacity is the free
+# capacity less the reserved capacity, over-subscribed when the pool thin
+# provisions the share.
+PlacementCheck = collections.namedtuple(
+    'PlacementCheck', ('pool', 'free_capacity_gb', 'virtual_free_capacity_gb',
+                       'provisioned_ratio', 'reason'))
+
+# Filters of the scheduler PoolSnapshot.place() applies, in order.
+PLACEMENT_FILTERS = ('availability_zone', 'capabilities', 'capacity')
+
+# Operators of the extra specs, as the scheduler capabilities filter of
+# the Shared File Systems service evaluates them.
+_OPERATORS = {
+    '=': lambda x, y: float(x) >= float(y),
+    '<in>': lambda x, y: y in x,
+    '<is>': lambda x, y: _to_bool(x) == _to_bool(y),
+    '==': lambda x, y: float(x) == float(y),
+    '!=': lambda x, y: float(x) != float(y),
+    '>=': lambda x, y: float(x) >= float(y),
+    '<=': lambda x, y: float(x) <= float(y),
+    's==': operator.eq,
+    's!=': operator.ne,
+    's<': operator.lt,
+    's<=': operator.le,
+    's>': operator.gt,
+    's>=': operator.ge,
+}
+
+
+def _to_bool(value):
+    return strutils.bool_from_string(six.text_type(value), strict=True)
+
+
+def _match_value(value, requirement):
+    words = requirement.split()
+    op = words[0] if words else None
+    if op == '<or>':
+        # NOTE: '<or> a <or> b' matches a or b.
+        return any(_match_value(value, choice) for choice in words[1::2])
+    method = _OPERATORS.get(op)
+    if method is None:
+        if isinstance(value, bool) and strutils.is_valid_boolstr(
+                requirement):
+            return value == _to_bool(requirement)
+        return six.text_type(value) == requirement
+    if len(words) < 2:
+        return False
+    if op != '<in>' or isinstance(value, six.string_types):
+        value = six.text_type(value)
+    try:
+        return method(value, words[1])
+    except (TypeError, ValueError):
+        return False
+
+
+def match_extra_specs(capabilities, extra_specs):
+    """Whether capabilities satisfy extra specs.
+
+    The extra specs scoped other than by 'capabilities:' are ignored, the
+    others must match the capability with the same name, nested
+    capabilities being named 'capabilities:<name>:<nested name>', with the
+    operators of the scheduler, e.g. ``'<is> True'`` or ``'>= 10'``. A
+    list capability matches when any of its values does.
+
+    :param capabilities: dict of the capabilities of a pool.
+    :param extra_specs: dict of the extra specs of a share type.
+    """
+    for key, requirement in (extra_specs or {}).items():
+        scope = key.split(':')
+        if len(scope) > 1:
+            if scope[0] != 'capabilities':
+                continue
+            del scope[0]
+        value = capabilities
+        for name in scope:
+            value = value.get(name) if isinstance(value, dict) else None
+        if value is None:
+            return False
+        # NOTE: a list capability, like thin_provisioning [True, False],
+        # matches when any of its values does.
+        values = value if isinstance(value, list) else [value]
+        requirement = six.text_type(requirement)
+        if not any(_match_value(v, requirement) for v in values):
+            return False
+    return True
+
+
+def _is_thin(value):
+    """Whether a pool can thin provision, from its capability."""
+    if isinstance(value, list):
+        return any(_is_thin(v) for v in value)
+    if isinstance(value, six.string_types):
+        return strutils.bool_from_string(value)
+    return value is True
+
+
+def _to_float(value):
+    """Parse a capacity, 'infinite' is infinite and 'unknown' is None."""
+    if isinstance(value, six.string_types):
+        if value.lower() == 'infinite':
+            return float('inf')
+        if value.lower() == 'unknown':
+            return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PoolSnapshot(object):
+    """The backend storage pools at a point in time, as columns.
+
+    :param pools: list of :class:`manilaclient.v2.scheduler_stats.Pool`,
+        listed in detail.
+    :param taken_at: time.monotonic() value of when they were listed.
+    """
+
+    def __init__(self, pools, taken_at=None):
+        self.taken_at = taken_at
+        self.pools = list(pools)
+        infos = [pool._info for pool in self.pools]
+        self.names = [info.get('name') for info in infos]
+        self.hosts = [info.get('host') for info in infos]
+        self.backends = [info.get('backend') for info in infos]
+        self.capabilities = [info.get('capabilities') or {}
+                             for info in infos]
+        caps = self.capabilities
+        self.total_capacity_gb = [_to_float(c.get('total_capacity_gb'))
+                                  for c in caps]
+        self.free_capacity_gb = [_to_float(c.get('free_capacity_gb'))
+                                 for c in caps]
+        self.allocated_capacity_gb = [
+            _to_float(c.get('allocated_capacity_gb')) or 0.0 for c in caps]
+        # NOTE: the drivers not thin provisioning do not report the
+        # provisioned capacity, which is the allocated capacity then.
+        self.provisioned_capacity_gb = [
+            _to_float(c.get('provisioned_capacity_gb')) or allocated
+            for c, allocated in zip(caps, self.allocated_capacity_gb)]
+        self.reserved_percentage = [
+            _to_float(c.get('reserved_percentage')) or 0.0 for c in caps]
+        self.max_over_subscription_ratio = [
+            _to_float(c.get('max_over_subscription_ratio')) or 1.0
+            for c in caps]
+        self.thin_provisioning = [_is_thin(c.get('thin_provisioning'))
+                                  for c in caps]
+
+    def __len__(self):
+        return len(self.pools)
+
+    def _select(self, mask):
+        snapshot = PoolSnapshot.__new__(PoolSnapshot)
+        snapshot.taken_at = self.taken_at
+        for attr, column in self.__dict__.items():
+            if isinstance(column, list):
+                setattr(snapshot, attr, list(
+                    itertools.compress(column, mask)))
+        return snapshot
+
+    def filter(self, extra_specs):
+        """Return the snapshot of the pools matching extra specs.
+
+        See :func:`match_extra_specs`.
+        """
+        return self._select([match_extra_specs(caps, extra_specs)
+                             for caps in self.capabilities])
+
+    def groups(self, by):
+        """Return the column of the groups of the pools, see GROUP_BY."""
+        if by not in GROUP_BY:
+            raise ValueError("Unknown group '%s', must be one of: %s." % (
+                by, ', '.join(GROUP_BY)))
+        return [GROUP_BY[by](*row) for row in zip(
+            self.names, self.hosts, self.backends, self.capabilities)]
+
+    def aggregate(self, by='backend', shares=None):
+        """Sum the capacity of the pools by group.
+
+        The unknown capacities are not summed, an infinite capacity makes
+        the sum infinite.
+
+        :param by: attribute the pools are grouped by, one of GROUP_BY.
+        :param shares: shares, listed in detail, to count by the pool they
+            are on, e.g. listed with the all_tenants filter.
+        :returns: list of :class:`CapacitySummary`, sorted by group.
+        """
+        counts = None
+        if shares is not None:
+            counts = collections.Counter(
+                getattr(share, '_info', {}).get('host') for share in shares)
+
+        sums = collections.OrderedDict()
+        rows = zip(self.groups(by), self.names, self.total_capacity_gb,
+                   self.free_capacity_gb, self.allocated_capacity_gb,
+                   self.provisioned_capacity_gb)
+        for group, name, total, free, allocated, provisioned in rows:
+            row = sums.setdefault(group, [0, 0.0, 0.0, 0.0, 0.0, 0.0, 0])
+            row[0] += 1
+            row[1] += total or 0.0
+            row[2] += free or 0.0
+            row[3] = max(row[3], free or 0.0)
+            row[4] += allocated
+            row[5] += provisioned
+            if counts is not None:
+                row[6] += counts.get(name, 0)
+
+        summaries = []
+        for group in sorted(sums, key=lambda g: (g is None, g or '')):
+            pools, total, free, largest, allocated, provisioned, count = (
+                sums[group])
+            ratio = provisioned / total if total else None
+            summaries.append(CapacitySummary(
+                group, pools, total, free, largest, allocated, provisioned,
+                ratio, count if counts is not None else None))
+        return summaries
+
+    def _get_virtual_free(self, index, size, thin):
+        """Return the capacity a share of size could use on a pool.
+
+        As the capacity filter of the scheduler, the free capacity less
+        the reserved percentage of the total capacity is over-subscribed by
+        max_over_subscription_ratio when the share is thin provisioned,
+        which is refused beyond the ratio. The unknown and infinite
+        capacities always fit.
+        """
+        free = self.free_capacity_gb[index]
+        total = self.total_capacity_gb[index]
+        if free is None or free == float('inf'):
+            return float('inf')
+        if total is None or total == float('inf'):
+            return free
+        if total <= 0:
+            return 0.0
+        free = math.floor(
+            free - total * self.reserved_percentage[index] / 100.0)
+        ratio = self.max_over_subscription_ratio[index]
+        if thin and self.thin_provisioning[index] and ratio >= 1:
+            provisioned = self.provisioned_capacity_gb[index] + size
+            if provisioned / total > ratio:
+                return 0.0
+            return free * ratio
+        return free
+
+    def place(self, size, extra_specs=None, availability_zone=None,
+              share_proto=None):
+        """Check which pools a share could be scheduled to.
+
+        The pools are not requested, the checks are only as accurate as
+        the snapshot: the shares created since it was taken and the pools
+        not reporting their availability zone are not accounted for.
+
+        :param size: size of the share, in GiB.
+        :param extra_specs: dict of the extra specs of the share type, see
+            :func:`match_extra_specs`. The 'availability_zones' extra spec
+            restricts the availability zones of the pools.
+        :param availability_zone: name of the availability zone of the
+            share.
+        :param share_proto: protocol of the share, e.g. 'NFS', the pools
+            must support.
+        :returns: list of :class:`PlacementCheck`, one per pool. The pools
+            the share could be scheduled to come first, by decreasing
+            virtual free capacity as the scheduler weighs them, then the
+            others, in the order of the snapshot.
+        """
+        extra_specs = dict(extra_specs or {})
+        zones = extra_specs.pop('availability_zones', None)
+        zones = ([z.strip() for z in zones.split(',') if z.strip()]
+                 if zones else None)
+        if availability_zone:
+            if zones is not None and availability_zone not in zones:
+                zones = []
+            else:
+                zones = [availability_zone]
+        if share_proto:
+            extra_specs['storage_protocol'] = '<in> %s' % share_proto.upper()
+        thin = match_extra_specs({'thin_provisioning': True}, {
+            k: v for k, v in extra_specs.items()
+            if k in ('thin_provisioning', 'capabilities:thin_provisioning')})
+
+        candidates = []
+        rejected = []
+        for index, caps in enumerate(self.capabilities):
+            zone = caps.get('availability_zone')
+            virtual_free = None
+            if zones is not None and (
+                    not zones or zone is not None and zone not in zones):
+                reason = 'availability_zone'
+            elif not match_extra_specs(caps, extra_specs):
+                reason = 'capabilities'
+            else:
+                virtual_free = self._get_virtual_free(index, size, thin)
+                reason = None if virtual_free >= size else 'capacity'
+            total = self.total_capacity_gb[index]
+            ratio = ((self.provisioned_capacity_gb[index] + size) / total
+                     if total and total != float('inf') else None)
+            check = PlacementCheck(self.names[index],
+                                   self.free_capacity_gb[index],
+                                   virtual_free, ratio, reason)
+            (rejected if reason else candidates).append(check)
+        candidates.sort(key=lambda c: c.virtual_free_capacity_gb,
+                        reverse=True)
+        return candidates + rejected
@@ -10,16 +10,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from debtcollector import removals
-
-from keystoneauth1 import adapter
-from keystoneauth1 import session
-from keystoneclient import client as ks_client
+import time
 
 import manilaclient
 from manilaclient.common import constants
 from manilaclient.common import httpclient
+from manilaclient.common import metrics as client_metrics
 from manilaclient import exceptions
+from manilaclient import utils
 from manilaclient.v2 import availability_zones
 from manilaclient.v2 import limits
 from manilaclient.v2 import messages
@@ -49,6 +47,13 @@ from manilaclient.v2 import share_type_access
 from manilaclient.v2 import share_types
 from manilaclient.v2 import shares
 
+# NOTE: keystone libraries and debtcollector are only needed once a client
+# is created, the shell must not import them for e.g. 'manila help'.
+adapter = utils.LazyModule('keystoneauth1.adapter')
+ks_client = utils.LazyModule('keystoneclient.client')
+removals = utils.LazyModule('debtcollector.removals')
+session = utils.LazyModule('keystoneauth1.session')
+
 
 class Client(object):
     """Top-level object to access the OpenStack Manila API.
@@ -75,20 +80,25 @@ class Client(object):
         >>> client.shares.list()
         ...
     """
-    @removals.removed_kwarg(
-        'share_service_name', message="Please use 'service_name' instead",
+    @utils.lazy_decorator(
+        removals, 'removed_kwarg', 'share_service_name',
+        message="Please use 'service_name' instead",
         removal_version='2.0.0')
-    @removals.removed_kwarg(
-        'proxy_tenant_id', message="This is not used anywhere",
+    @utils.lazy_decorator(
+        removals, 'removed_kwarg', 'proxy_tenant_id',
+        message="This is not used anywhere",
         removal_version='2.0.0')
-    @removals.removed_kwarg(
-        'proxy_token', message="This is not used anywhere",
+    @utils.lazy_decorator(
+        removals, 'removed_kwarg', 'proxy_token',
+        message="This is not used anywhere",
         removal_version='2.0.0')
-    @removals.removed_kwarg(
-        'os_cache', message="Please use 'use_keyring' instead",
+    @utils.lazy_decorator(
+        removals, 'removed_kwarg', 'os_cache',
+        message="Please use 'use_keyring' instead",
         removal_version='2.0.0')
-    @removals.removed_kwarg(
-        'api_key', message="Please use 'password' instead",
+    @utils.lazy_decorator(
+        removals, 'removed_kwarg', 'api_key',
+        message="Please use 'password' instead",
         removal_version='2.0.0')
     def __init__(self, username=None, api_key=None,
                  project_id=None, auth_url=None, insecure=False, timeout=None,
@@ -108,6 +118,11 @@ class Client(object):
                  project_domain_name=None,
                  cert=None,
                  password=None,
+                 json_codec=None,
+                 metrics=None,
+                 http_transport=None,
+                 http_capture=None,
+                 lazy_load=constants.LAZY_LOAD_ALLOW,
                  **kwargs):
 
         self.username = username
@@ -146,6 +161,15 @@ class Client(object):
         self.keystone_client = None
         self.session = session
 
+        if lazy_load not in constants.LAZY_LOAD_POLICIES:
+            raise ValueError("lazy_load must be one of %s" % ', '.join(
+                constants.LAZY_LOAD_POLICIES))
+        # NOTE: what the resources not loaded yet do for missing attributes.
+        self.lazy_load = lazy_load
+
+        self.metrics = metrics
+        auth_start = time.monotonic()
+
         # NOTE(u_glide): token authorization has highest priority.
         # That's why session and/or password will be ignored
         # if token is provided.
@@ -190,6 +214,10 @@ class Client(object):
         if not service_catalog_url:
             raise RuntimeError("Could not find Manila endpoint in catalog")
 
+        if metrics is not None:
+            metrics.add_time(client_metrics.AUTH_TIMER,
+                             time.monotonic() - auth_start)
+
         self.api_version = api_version
         self.client = httpclient.HTTPClient(service_catalog_url,
                                             input_auth_token,
@@ -199,7 +227,12 @@ class Client(object):
                                             timeout=timeout,
                                             retries=retries,
                                             http_log_debug=http_log_debug,
-                                            api_version=self.api_version)
+                                            api_version=self.api_version,
+                                            json_codec=json_codec,
+                                            transport=http_transport,
+                                            capture=http_capture)
+        if metrics is not None:
+            metrics.attach(self.client)
 
         self.availability_zones = availability_zones.AvailabilityZoneManager(
             self)
@@ -258,7 +291,8 @@ class Client(object):
             if extension.manager_class:
                 setattr(self, extension.name, extension.manager_class(self))
 
-    @removals.remove(
+    @utils.lazy_decorator(
+        removals, 'remove',
         message="authenticate() method is deprecated. Client automatically "
         "makes authentication call in the constructor.",
         removal_version='2.0.0')
@@ -0,0 +1,569 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+"""Local SQLite mirror of the resources of an endpoint.
+
+:class:`Inventory` copies shares, snapshots, share instances, share
+replicas, share networks and share servers into an indexed SQLite
+database, so that questions like "which shares are on host X" or "which
+snapshots are older than 30 days" are answered offline instead of by
+listing the collection again.
+
+Shares are synced incrementally: they are listed by ``updated_at``,
+newest first, until the shares not updated since the previous sync, and
+a summary listing of their IDs finds the shares created or deleted
+meanwhile. The API cannot sort or filter the other resource types by
+their update time, they are listed again in full at every sync.
+
+:func:`export` writes the resources of an endpoint to a JSON Lines file
+instead, listing the resource types concurrently and writing the pages
+of the paginated collections as they are received.
+"""
+
+import collections
+from concurrent import futures
+import datetime
+import functools
+import hashlib
+import os
+import threading
+
+from manilaclient import api_versions
+from manilaclient.common.apiclient import exceptions
+from manilaclient.common import cliutils
+from manilaclient.common import jsoncodec
+from manilaclient import utils
+
+sqlite3 = utils.LazyModule('sqlite3')
+
+# Resources listed per request by a sync.
+PAGE_SIZE = 1000
+
+SCHEMA_VERSION = 1
+
+ResourceType = collections.namedtuple(
+    'ResourceType', ('manager', 'incremental', 'all_tenants', 'paginated'))
+
+# Resource types by the name they are queried with, with the attribute of
+# the client that lists them, whether they are synced incrementally,
+# whether their listing takes the all_tenants filter and whether it takes
+# the limit and offset filters. The API caps the listings not paginated to
+# osapi_max_limit resources.
+RESOURCE_TYPES = collections.OrderedDict((
+    ('shares', ResourceType('shares', True, True, True)),
+    ('snapshots', ResourceType('share_snapshots', False, True, True)),
+    ('share_instances', ResourceType('share_instances', False, False, False)),
+    ('share_replicas', ResourceType('share_replicas', False, False, False)),
+    ('share_networks', ResourceType('share_networks', False, True, True)),
+    ('share_servers', ResourceType('share_servers', False, False, False)),
+))
+
+ExportType = collections.namedtuple(
+    'ExportType', ('manager', 'all_tenants', 'paginated'))
+
+# Resource types written by export(), with the attribute of the client that
+# lists them, whether their listing takes the all_tenants filter and
+# whether it takes the limit and offset filters. The export locations and
+# access rules are listed share by share, the share network subnets are
+# read from the share networks.
+EXPORT_TYPES = collections.OrderedDict((
+    ('shares', ExportType('shares', True, True)),
+    ('snapshots', ExportType('share_snapshots', True, True)),
+    ('share_instances', ExportType('share_instances', False, False)),
+    ('share_replicas', ExportType('share_replicas', False, False)),
+    ('export_locations', ExportType('share_export_locations', True, False)),
+    ('access_rules', ExportType('share_access_rules', True, False)),
+    ('share_networks', ExportType('share_networks', True, True)),
+    ('share_network_subnets', ExportType('share_networks', True, True)),
+    ('security_services', ExportType('security_services', True, False)),
+    ('share_servers', ExportType('share_servers', False, False)),
+    ('share_groups', ExportType('share_groups', True, True)),
+    ('share_types', ExportType('share_types', False, False)),
+    ('share_group_types', ExportType('share_group_types', False, False)),
+))
+
+# Requests sent at the same time by export() to list the resources of the
+# shares, per resource type.
+EXPORT_WORKERS = 8
+
+# Attributes stored in their own, indexed, columns.
+COLUMNS = ('name', 'status', 'host', 'project_id', 'share_id',
+           'share_network_id', 'created_at', 'updated_at')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    status TEXT,
+    host TEXT,
+    project_id TEXT,
+    share_id TEXT,
+    share_network_id TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    data BLOB NOT NULL,
+    PRIMARY KEY (type, id)
+);
+CREATE INDEX IF NOT EXISTS resources_name ON resources (type, name);
+CREATE INDEX IF NOT EXISTS resources_status ON resources (type, status);
+CREATE INDEX IF NOT EXISTS resources_host ON resources (type, host);
+CREATE INDEX IF NOT EXISTS resources_project ON resources (type, project_id);
+CREATE INDEX IF NOT EXISTS resources_share ON resources (type, share_id);
+CREATE INDEX IF NOT EXISTS resources_share_network
+    ON resources (type, share_network_id);
+CREATE INDEX IF NOT EXISTS resources_created ON resources (type, created_at);
+CREATE TABLE IF NOT EXISTS metadata (
+    type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (type, id, key)
+);
+CREATE INDEX IF NOT EXISTS metadata_key ON metadata (type, key, value);
+CREATE TABLE IF NOT EXISTS sync_state (
+    type TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    watermark TEXT
+);
+"""
+
+
+def get_default_path(endpoint):
+    """Return the database file of an endpoint in the client cache dir."""
+    cache_dir = cliutils.env('manilaclient_UUID_CACHE_DIR',
+                             'MANILACLIENT_UUID_CACHE_DIR',
+                             default="~/.manilaclient")
+    endpoint_hash = hashlib.md5((endpoint or '').encode('utf-8')).hexdigest()
+    return os.path.expanduser(os.path.join(
+        cache_dir, 'inventory', endpoint_hash + '.sqlite'))
+
+
+def _timestamp(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%S.%f')
+    return value
+
+
+def _changed_at(info):
+    return info.get('updated_at') or info.get('created_at') or ''
+
+
+class Inventory(object):
+    """Local mirror of the resources of the endpoint of a client.
+
+    :param client: the :class:`manilaclient.v2.client.Client` to sync from.
+    :param path: database file, defaults to a file per endpoint in the
+        client cache directory, ``~/.manilaclient`` or
+        env[MANILACLIENT_UUID_CACHE_DIR].
+    """
+
+    def __init__(self, client, path=None):
+        self.client = client
+        self.path = path or get_default_path(
+            getattr(client.client, 'endpoint_url', None))
+        self.codec = jsoncodec.get_codec()
+        self._conn = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory, 0o755)
+            conn = sqlite3.connect(self.path)
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # NOTE: the database is only a copy, a different schema is
+                # dropped and synced again.
+                with conn:
+                    for table in ('resources', 'metadata', 'sync_state'):
+                        conn.execute('DROP TABLE IF EXISTS %s' % table)
+            conn.executescript(_SCHEMA)
+            conn.execute('PRAGMA user_version = %d' % SCHEMA_VERSION)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _get_manager(self, resource_type):
+        return getattr(self.client, RESOURCE_TYPES[resource_type].manager)
+
+    def _list_all(self, resource_type, all_tenants):
+        manager = self._get_manager(resource_type)
+        search_opts = {}
+        if all_tenants and RESOURCE_TYPES[resource_type].all_tenants:
+            search_opts['all_tenants'] = 1
+        if resource_type == 'shares':
+            # NOTE: like 'manila list', public shares of other projects are
+            # not mirrored.
+            search_opts['is_public'] = False
+        if RESOURCE_TYPES[resource_type].paginated:
+            return _iterate(manager.list, search_opts, PAGE_SIZE)
+        return manager.list(search_opts=search_opts)
+
+    def _list_changed_shares(self, watermark, all_tenants):
+        """Yield the shares updated since a time, newest first."""
+        search_opts = {'limit': PAGE_SIZE, 'is_public': False}
+        if all_tenants:
+            search_opts['all_tenants'] = 1
+        offset = 0
+        while True:
+            search_opts['offset'] = offset
+            page = self.client.shares.list(
+                search_opts=dict(search_opts), sort_key='updated_at',
+                sort_dir='desc')
+            for share in page:
+                if _changed_at(share._info) < watermark:
+                    return
+                yield share
+            if len(page) < PAGE_SIZE:
+                return
+            offset += len(page)
+
+    def _store(self, resource_type, resources):
+        rows = []
+        metadata = []
+        for resource in resources:
+            info = resource._info
+            row = [resource_type, info['id']]
+            row.extend(_timestamp(info.get(column)) for column in COLUMNS)
+            row.append(self.codec.dumps(info))
+            rows.append(row)
+            for key, value in (info.get('metadata') or {}).items():
+                metadata.append((resource_type, info['id'], key, value))
+        self.conn.executemany(
+            'DELETE FROM metadata WHERE type = ? AND id = ?',
+            [row[:2] for row in rows])
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO resources VALUES (%s)' % ', '.join(
+                '?' * (len(COLUMNS) + 3)), rows)
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)', metadata)
+
+    def _delete(self, resource_type, ids):
+        for table in ('resources', 'metadata'):
+            self.conn.executemany(
+                'DELETE FROM %s WHERE type = ? AND id = ?' % table,
+                [(resource_type, i) for i in ids])
+
+    def _get_ids(self, resource_type):
+        return set(row[0] for row in self.conn.execute(
+            'SELECT id FROM resources WHERE type = ?', (resource_type,)))
+
+    def _get_state(self, resource_type):
+        return self.conn.execute(
+            'SELECT scope, watermark FROM sync_state WHERE type = ?',
+            (resource_type,)).fetchone()
+
+    def _sync_changed_shares(self, watermark, all_tenants, known):
+        """Return the shares changed and the IDs of those deleted."""
+        changed = list(self._list_changed_shares(watermark, all_tenants))
+        # NOTE: the summary listing only returns IDs and names, it finds the
+        # shares deleted since the previous sync and those created without
+        # an updated_at, which sort last.
+        search_opts = {'is_public': False}
+        if all_tenants:
+            search_opts['all_tenants'] = 1
+        current = set(share.id for share in _iterate(
+            functools.partial(self.client.shares.list, detailed=False),
+            search_opts, PAGE_SIZE))
+        changed_ids = set(share.id for share in changed)
+        for share_id in current - known - changed_ids:
+            try:
+                changed.append(self.client.shares.get(share_id))
+            except exceptions.NotFound:
+                current.discard(share_id)
+        return changed, known - current
+
+    def _sync_type(self, resource_type, full, all_tenants):
+        scope = 'all' if all_tenants else 'project'
+        state = self._get_state(resource_type)
+        known = self._get_ids(resource_type)
+        watermark = ''
+        incremental = False
+        if RESOURCE_TYPES[resource_type].incremental and not full and state:
+            incremental = state[0] == scope and state[1] is not None
+
+        if incremental:
+            watermark = state[1]
+            resources, deleted = self._sync_changed_shares(
+                watermark, all_tenants, known)
+        else:
+            resources = list(self._list_all(resource_type, all_tenants))
+            deleted = known - set(r._info['id'] for r in resources)
+
+        for resource in resources:
+            watermark = max(watermark, _changed_at(resource._info))
+        with self.conn:
+            self._delete(resource_type, deleted)
+            self._store(resource_type, resources)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)',
+                (resource_type, scope,
+                 _timestamp(datetime.datetime.utcnow()), watermark or None))
+        return {'mode': 'incremental' if incremental else 'full',
+                'updated': len(resources), 'deleted': len(deleted),
+                'total': self.count(resource_type)}
+
+    def sync(self, resource_types=None, full=False, all_tenants=False):
+        """Update the mirror from the API.
+
+        :param resource_types: names of the resource types to sync, see
+            ``RESOURCE_TYPES``, defaults to all of them.
+        :param full: whether to list every resource type in full, even if
+            it can be synced incrementally.
+        :param all_tenants: whether to mirror the resources of all projects,
+            which requires an admin. Changing it syncs in full.
+        :returns: dict of the statistics of each resource type synced, with
+            its 'mode', the number of resources 'updated' and 'deleted' and
+            the 'total'. Resource types the API version or the user cannot
+            list are skipped, with the 'error'.
+        """
+        results = collections.OrderedDict()
+        for resource_type in resource_types or RESOURCE_TYPES:
+            if resource_type not in RESOURCE_TYPES:
+                raise ValueError(
+                    "Unknown resource type '%s', must be one of: %s." % (
+                        resource_type, ', '.join(RESOURCE_TYPES)))
+            try:
+                results[resource_type] = self._sync_type(
+                    resource_type, full, all_tenants)
+            except (exceptions.Forbidden, exceptions.NotFound,
+                    exceptions.UnsupportedVersion) as e:
+                results[resource_type] = {'error': e}
+        return results
+
+    def get_synced_at(self, resource_type):
+        """Return when a resource type was synced last, or None."""
+        row = self.conn.execute(
+            'SELECT synced_at FROM sync_state WHERE type = ?',
+            (resource_type,)).fetchone()
+        return row[0] if row else None
+
+    def count(self, resource_type):
+        return self.conn.execute(
+            'SELECT COUNT(*) FROM resources WHERE type = ?',
+            (resource_type,)).fetchone()[0]
+
+    def list(self, resource_type, metadata=None, created_before=None,
+             created_since=None, sort_key='created_at', **filters):
+        """Return mirrored resources, without API requests.
+
+        :param resource_type: name of the resource type, see
+            ``RESOURCE_TYPES``.
+        :param metadata: dict of the metadata the resources must have.
+        :param created_before: datetime or ISO 8601 text, only resources
+            created before it are returned.
+        :param created_since: datetime or ISO 8601 text, only resources
+            created since it are returned.
+        :param sort_key: column to sort by, one of ``COLUMNS`` or 'id'.
+        :param filters: values of ``COLUMNS`` the resources must have.
+        :rtype: list of the resource class of the resource type, e.g.
+            :class:`manilaclient.v2.shares.Share`.
+        """
+        if resource_type not in RESOURCE_TYPES:
+            raise ValueError(
+                "Unknown resource type '%s', must be one of: %s." % (
+                    resource_type, ', '.join(RESOURCE_TYPES)))
+        if sort_key not in COLUMNS + ('id',):
+            raise ValueError('sort_key must be one of the following: %s.'
+                             % ', '.join(COLUMNS + ('id',)))
+        query = ['SELECT data FROM resources r WHERE type = ?']
+        params = [resource_type]
+        for column, value in sorted(filters.items()):
+            if column not in COLUMNS + ('id',):
+                raise ValueError("Unknown filter '%s'." % column)
+            if value is not None:
+                query.append('AND %s = ?' % column)
+                params.append(value)
+        if created_before is not None:
+            query.append('AND created_at < ?')
+            params.append(_timestamp(created_before))
+        if created_since is not None:
+            query.append('AND created_at >= ?')
+            params.append(_timestamp(created_since))
+        for key, value in sorted((metadata or {}).items()):
+            query.append('AND EXISTS (SELECT 1 FROM metadata m WHERE '
+                         'm.type = r.type AND m.id = r.id AND m.key = ? '
+                         'AND m.value = ?)')
+            params.extend((key, value))
+        query.append('ORDER BY %s, id' % sort_key)
+
+        manager = self._get_manager(resource_type)
+        return [manager.resource_class(manager, self.codec.loads(row[0]),
+                                       loaded=True)
+                for row in self.conn.execute(' '.join(query), params)]
+
+
+def _iterate(list_func, search_opts, page_size):
+    """Yield the resources listed page by page, by limit and offset."""
+    offset = 0
+    while True:
+        page = list_func(search_opts=dict(search_opts, limit=page_size,
+                                          offset=offset))
+        if isinstance(page, tuple):
+            page = page[0]
+        for resource in page:
+            yield resource
+        if len(page) < page_size:
+            return
+        offset += len(page)
+
+
+class _JSONLinesWriter(object):
+    """Write records to a binary file, a line each, from many threads."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.codec = jsoncodec.get_codec()
+        self._lock = threading.Lock()
+
+    def write(self, resource_type, info):
+        data = self.codec.dumps({'type': resource_type, 'resource': info})
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        with self._lock:
+            self.fp.write(data + b'\n')
+
+
+def _list_share_resources(client, resource_type, share):
+    if resource_type == 'export_locations':
+        resources = client.share_export_locations.list(share)
+    elif client.api_version >= api_versions.APIVersion('2.45'):
+        resources = client.share_access_rules.access_list(share)
+    else:
+        resources = client.shares.access_list(share)
+    if isinstance(resources, tuple):
+        resources = resources[0]
+    return [dict(getattr(r, '_info', None) or r._asdict(),
+                 share_id=share.id) for r in resources]
+
+
+def _export_type(client, writer, resource_type, all_tenants, page_size,
+                 executor):
+    export_type = EXPORT_TYPES[resource_type]
+    manager = getattr(client, export_type.manager)
+    search_opts = {}
+    if all_tenants and export_type.all_tenants:
+        search_opts['all_tenants'] = 1
+    per_share = resource_type in ('export_locations', 'access_rules')
+    if resource_type == 'shares' or per_share:
+        # NOTE: like 'manila list', public shares of other projects are not
+        # exported.
+        search_opts['is_public'] = False
+
+    if per_share:
+        resources = _iterate(functools.partial(client.shares.list,
+                                               detailed=False),
+                             search_opts, page_size)
+    elif export_type.paginated:
+        resources = _iterate(manager.list, search_opts, page_size)
+    elif export_type.all_tenants:
+        resources = manager.list(search_opts=search_opts)
+    else:
+        resources = manager.list()
+
+    count = 0
+    if per_share:
+        # NOTE: the resources of a page of shares are listed concurrently,
+        # and written before the next page of shares is listed.
+        page = []
+        for share in resources:
+            page.append(share)
+            if len(page) == page_size:
+                count += _export_shares_resources(
+                    client, writer, resource_type, page, executor)
+                page = []
+        return count + _export_shares_resources(
+            client, writer, resource_type, page, executor)
+
+    for resource in resources:
+        if resource_type == 'share_network_subnets':
+            for subnet in resource._info.get('share_network_subnets') or []:
+                writer.write(resource_type,
+                             dict(subnet, share_network_id=resource.id))
+                count += 1
+        else:
+            writer.write(resource_type, resource._info)
+            count += 1
+    return count
+
+
+def _export_shares_resources(client, writer, resource_type, shares,
+                             executor):
+    count = 0
+    for infos in executor.map(functools.partial(
+            _list_share_resources, client, resource_type), shares):
+        for info in infos:
+            writer.write(resource_type, info)
+        count += len(infos)
+    return count
+
+
+def export(client, fp, resource_types=None, all_tenants=False,
+           max_workers=None, page_size=None):
+    """Write the resources of the endpoint of a client as JSON Lines.
+
+    Each line is a JSON object with the 'type' of a resource and the
+    'resource' itself. The resource types are listed concurrently, and
+    the pages of the paginated ones are written as they are received, so
+    that the memory used does not grow with the number of resources.
+
+    :param client: the :class:`manilaclient.v2.client.Client` to list from.
+    :param fp: binary file object to write to.
+    :param resource_types: names of the resource types to export, see
+        ``EXPORT_TYPES``, defaults to all of them.
+    :param all_tenants: whether to export the resources of all projects,
+        which requires an admin.
+    :param max_workers: number of requests sent at the same time to list
+        the export locations or access rules of the shares, per resource
+        type, defaults to EXPORT_WORKERS.
+    :param page_size: number of resources listed per request, defaults
+        to PAGE_SIZE.
+    :returns: dict of the statistics of each resource type exported, with
+        the 'count' of resources written. Resource types the API version
+        or the user cannot list have the 'error' too.
+    """
+    resource_types = list(resource_types or EXPORT_TYPES)
+    for resource_type in resource_types:
+        if resource_type not in EXPORT_TYPES:
+            raise ValueError(
+                "Unknown resource type '%s', must be one of: %s." % (
+                    resource_type, ', '.join(EXPORT_TYPES)))
+    writer = _JSONLinesWriter(fp)
+    share_executor = futures.ThreadPoolExecutor(
+        max_workers=max_workers or EXPORT_WORKERS)
+    results = collections.OrderedDict()
+    try:
+        with futures.ThreadPoolExecutor(
+                max_workers=len(resource_types)) as executor:
+            requests = [executor.submit(
+                _export_type, client, writer, resource_type, all_tenants,
+                page_size or PAGE_SIZE, share_executor)
+                for resource_type in resource_types]
+    finally:
+        share_executor.shutdown()
+    for resource_type, request in zip(resource_types, requests):
+        error = request.exception()
+        if error is None:
+            results[resource_type] = {'count': request.result()}
+        elif isinstance(error, (exceptions.Forbidden, exceptions.NotFound,
+                                exceptions.UnsupportedVersion)):
+            results[resource_type] = {'count': None, 'error': error}
+        else:
+            raise error
+    return results
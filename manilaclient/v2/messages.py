@@ -11,6 +11,8 @@
 #    under the License.
 
 """Asynchronous User Message interface."""
+import time
+
 from manilaclient import api_versions
 from manilaclient import base
 from manilaclient.common.apiclient import base as common_base
@@ -75,10 +77,69 @@ class MessageManager(base.ManagerWithFind):
         path = RESOURCES_PATH + query_string
         return self._list(path, RESOURCES_NAME)
 
+    @api_versions.wraps('2.37')
+    def follow(self, search_opts=None, since=None, seen=None, interval=5,
+               page_size=50, max_polls=None):
+        """Yield the messages created at every poll, like tail -f.
+
+        Every poll lists the messages newest first, in pages of
+        ``page_size``, until the messages seen or older than the newest one
+        seen so far. Only the IDs of the messages created at that time are
+        kept to tell them from the new ones, so memory does not grow with
+        the number of messages.
+
+        :param search_opts: Search options to filter out messages.
+        :param since: created_at of the newest message already seen, by
+            default the messages that exist when the generator starts are
+            not yielded.
+        :param seen: IDs of the messages already seen created at ``since``.
+        :param interval: seconds between the polls.
+        :param page_size: number of messages listed per request.
+        :param max_polls: number of polls to stop after, by default the
+            generator never stops.
+        :rtype: generator of lists of the :class:`Message` created since
+            the previous poll, oldest first. Polls without new messages do
+            not yield.
+        """
+        seen = set(seen or ())
+        polls = 0
+        if since is None:
+            opts = dict(search_opts or {}, limit=page_size)
+            messages = self.list(search_opts=opts, sort_key='created_at',
+                                 sort_dir='desc')
+            since = messages[0].created_at if messages else ''
+            seen.update(m.id for m in messages if m.created_at == since)
+        while max_polls is None or polls < max_polls:
+            if polls:
+                time.sleep(interval)
+            polls += 1
+            new = []
+            offset = 0
+            while True:
+                opts = dict(search_opts or {}, limit=page_size, offset=offset)
+                page = self.list(search_opts=opts, sort_key='created_at',
+                                 sort_dir='desc')
+                known = [m for m in page
+                         if m.created_at < since or m.id in seen]
+                new.extend(m for m in page
+                           if m.created_at >= since and m.id not in seen)
+                if known or len(page) < page_size:
+                    break
+                offset += page_size
+            if not new:
+                continue
+            newest = max(m.created_at for m in new)
+            if newest > since:
+                since = newest
+                seen = set()
+            seen.update(m.id for m in new if m.created_at == since)
+            yield list(reversed(new))
+
     @api_versions.wraps('2.37')
     def delete(self, message):
         """Delete a message."""
 
-        loc = RESOURCE_PATH % common_base.getid(message)
+        message_id = common_base.getid(message)
+        loc = RESOURCE_PATH % message_id
 
-        return self._delete(loc)
+        return self._delete(loc, resource_id=message_id)
@@ -13,13 +13,80 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+from concurrent import futures
+
+import six
+
 from manilaclient import api_versions
 from manilaclient import base
 from manilaclient.common.apiclient import base as common_base
+from manilaclient import exceptions
 
 RESOURCE_PATH_LEGACY = '/os-quota-sets'
 RESOURCE_PATH = '/quota-sets'
 
+# Quota sets requested at the same time by QuotaSetManager.get_many().
+QUOTA_WORKERS = 8
+
+# Outcome of getting the quota set of a project, or of a share type of a
+# project: the quota set or the exception raised getting it.
+QuotaSetResult = collections.namedtuple(
+    'QuotaSetResult', ('tenant_id', 'share_type', 'quota_set', 'error'))
+
+# Usage of a quota summed by aggregate_usage(). The limit is -1 when the
+# quota of a project is unlimited, and the utilization is the ratio of the
+# limit in use or reserved, None when it is unlimited.
+QuotaUsage = collections.namedtuple(
+    'QuotaUsage', ('tenant_id', 'share_type', 'resource', 'projects',
+                   'in_use', 'reserved', 'limit', 'utilization'))
+
+
+def aggregate_usage(results, by_project=False):
+    """Sum the usage of quota sets by share type and resource.
+
+    :param results: list of :class:`QuotaSetResult`, see
+        :meth:`QuotaSetManager.get_many`. The failed ones are skipped.
+    :param by_project: whether to sum the usage of each project apart.
+    :returns: list of :class:`QuotaUsage`, sorted by project, share type
+        and resource. The tenant ID is None unless summed by project.
+    """
+    totals = {}
+    for result in results:
+        if result.error is not None:
+            continue
+        for resource, value in result.quota_set._info.items():
+            if isinstance(value, dict):
+                value = (value.get('in_use', 0), value.get('reserved', 0),
+                         value.get('limit', 0))
+            elif isinstance(value, six.integer_types) and not isinstance(
+                    value, bool):
+                # NOTE: quota sets are detailed beyond API version 2.25,
+                # before that they only have the limits.
+                value = (0, 0, value)
+            else:
+                continue
+            key = (result.tenant_id if by_project else None,
+                   result.share_type, resource)
+            total = totals.setdefault(key, [0, 0, 0, 0])
+            total[0] += 1
+            total[1] += value[0]
+            total[2] += value[1]
+            if total[3] < 0 or value[2] < 0:
+                total[3] = -1
+            else:
+                total[3] += value[2]
+
+    usages = []
+    for key in sorted(totals, key=lambda k: tuple(v or '' for v in k)):
+        projects, in_use, reserved, limit = totals[key]
+        utilization = None
+        if limit > 0:
+            utilization = float(in_use + reserved) / limit
+        usages.append(QuotaUsage(key[0], key[1], key[2], projects, in_use,
+                                 reserved, limit, utilization))
+    return usages
+
 
 class QuotaSet(common_base.Resource):
 
@@ -88,6 +155,67 @@ class QuotaSetManager(base.ManagerWithFind):
             tenant_id, user_id, share_type=share_type, detail=detail,
             resource_path=RESOURCE_PATH)
 
+    def get_many(self, tenant_ids=None, share_types=None, detail=True,
+                 max_workers=None):
+        """Get the quota sets of many projects with concurrent requests.
+
+        :param tenant_ids: IDs of the projects, by default the projects
+            listed by :meth:`list_project_ids`.
+        :param share_types: names or IDs of share types, the quota sets of
+            each share type of the projects are got too. Available only
+            for microversion >= 2.39.
+        :param detail: whether to get the usage of the quotas too.
+        :param max_workers: number of requests sent at the same time,
+            defaults to QUOTA_WORKERS.
+        :returns: list of :class:`QuotaSetResult`, in the order of the
+            projects, each followed by its share types.
+        """
+        share_types = list(share_types or [])
+        if share_types and self.api_version < api_versions.APIVersion(
+                "2.39"):
+            raise exceptions.UnsupportedVersion(
+                "Share type quotas are available only starting with the "
+                "2.39 API microversion.")
+        if tenant_ids is None:
+            tenant_ids = self.list_project_ids()
+        items = [(tenant_id, share_type) for tenant_id in tenant_ids
+                 for share_type in [None] + share_types]
+
+        def get(item):
+            kwargs = {'detail': detail}
+            if item[1] is not None:
+                kwargs['share_type'] = item[1]
+            return self.get(item[0], **kwargs)
+
+        with futures.ThreadPoolExecutor(
+                max_workers=max_workers or QUOTA_WORKERS) as executor:
+            requests = [executor.submit(get, item) for item in items]
+        results = []
+        for item, request in zip(items, requests):
+            error = request.exception()
+            quota_set = None if error is not None else request.result()
+            results.append(QuotaSetResult(item[0], item[1], quota_set, error))
+        return results
+
+    def list_project_ids(self):
+        """List the IDs of the projects visible to the user.
+
+        The projects are listed by the identity service when the client
+        authenticated with a keystone client. Otherwise, they are the
+        projects that have shares, listed with the all_tenants filter.
+        """
+        keystone_client = getattr(self.api, 'keystone_client', None)
+        for attr in ('projects', 'tenants'):
+            projects = getattr(keystone_client, attr, None)
+            if projects is not None:
+                return [project.id for project in projects.list()]
+        project_ids = collections.OrderedDict()
+        for share in self.api.shares.iterate(search_opts={'all_tenants': 1}):
+            project_id = share._info.get('project_id')
+            if project_id:
+                project_ids[project_id] = None
+        return list(project_ids)
+
     def _do_update(self, tenant_id, shares=None, snapshots=None,
                    gigabytes=None, snapshot_gigabytes=None,
                    share_networks=None,
@@ -12,12 +12,18 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 from manilaclient import base
 from manilaclient.common.apiclient import base as common_base
+from manilaclient.v2 import capacity
 
 RESOURCES_PATH = '/scheduler-stats/pools'
 RESOURCES_NAME = 'pools'
 
+# Seconds the snapshots of PoolManager.snapshot() are reused for.
+SNAPSHOT_TTL = 60
+
 
 class Pool(common_base.Resource):
 
@@ -29,6 +35,11 @@ class PoolManager(base.Manager):
     """Manage :class:`Pool` resources."""
     resource_class = Pool
 
+    def __init__(self, api):
+        super(PoolManager, self).__init__(api)
+        # Snapshots of the pools by their search options.
+        self._snapshots = {}
+
     def list(self, detailed=True, search_opts=None):
         """Get a list of pools.
 
@@ -47,3 +58,25 @@ class PoolManager(base.Manager):
             }
 
         return self._list(path, RESOURCES_NAME)
+
+    def snapshot(self, search_opts=None, ttl=SNAPSHOT_TTL):
+        """Get a snapshot of the pools, listed in detail, for analytics.
+
+        The snapshot is reused by the next calls with the same search
+        options during its time to live, the pools are listed again after.
+
+        :param search_opts: search options of the listing, see
+            :meth:`list`.
+        :param ttl: seconds the snapshot is reused for, 0 lists the pools
+            again.
+        :rtype: :class:`manilaclient.v2.capacity.PoolSnapshot`
+        """
+        key = tuple(sorted((search_opts or {}).items()))
+        snapshot = self._snapshots.get(key)
+        now = time.monotonic()
+        if snapshot is None or now - snapshot.taken_at >= ttl:
+            snapshot = capacity.PoolSnapshot(
+                self.list(detailed=True, search_opts=dict(search_opts or {})),
+                taken_at=now)
+            self._snapshots[key] = snapshot
+        return snapshot
@@ -148,7 +148,9 @@ class SecurityServiceManager(base.ManagerWithFind):
 
         :param security_service: security service to be deleted.
         """
-        self._delete(RESOURCE_PATH % common_base.getid(security_service))
+        security_service_id = common_base.getid(security_service)
+        self._delete(RESOURCE_PATH % security_service_id,
+                     resource_id=security_service_id)
 
     def list(self, detailed=True, search_opts=None):
         """Get a list of all security services.
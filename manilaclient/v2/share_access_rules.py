@@ -17,9 +17,16 @@
 # limitations under the License.
 """Interface for share access rules extension."""
 
+import collections
+from concurrent import futures
+import time
+
 from manilaclient import api_versions
 from manilaclient import base
 from manilaclient.common.apiclient import base as common_base
+from manilaclient.common import constants
+from manilaclient import exceptions
+from manilaclient.v2 import shares
 
 RESOURCE_PATH = '/share-access-rules/%s'
 RESOURCE_NAME = 'access'
@@ -28,6 +35,20 @@ RESOURCES_METADATA_PATH = '/share-access-rules/%s/metadata'
 RESOURCE_METADATA_PATH = '/share-access-rules/%s/metadata/%s'
 RESOURCE_LIST_PATH = '/share-access-rules'
 
+DEFAULT_ACCESS_LEVEL = 'rw'
+
+# Seconds reconcile_many() waits at most for the access rules it denies to
+# be gone before allowing them again.
+DENY_TIMEOUT = 300
+
+# A change of the access rules of a share planned by
+# ShareAccessRuleManager.plan(), the action is 'allow', 'deny' or 'update'.
+# The metadata of an 'update' maps the keys to set to their values and the
+# keys to unset to None. The error is the exception raised applying it.
+AccessChange = collections.namedtuple(
+    'AccessChange', ('share', 'action', 'access_type', 'access_to',
+                     'access_level', 'metadata', 'access_id', 'error'))
+
 
 class ShareAccessRule(common_base.Resource):
     """A Share Access Rule."""
@@ -88,3 +109,215 @@ class ShareAccessRuleManager(base.ManagerWithFind):
         query_string = self._build_query_string(search_opts)
         url = RESOURCE_LIST_PATH + query_string
         return self._list(url, 'access_list')
+
+    @api_versions.wraps("2.45")
+    def plan(self, share, desired_rules):
+        """Plan the changes making the access rules of a share the desired.
+
+        The access rules of the share are listed once. A rule is matched to
+        the listed ones by its access type and access to. The listed rules
+        not desired are denied, the ones with another access level or in
+        error are denied and allowed again, and the desired rules not
+        listed are allowed. The metadata of a rule is updated only when the
+        desired rule has a 'metadata' key.
+
+        :param share: either share object or text with its ID.
+        :param desired_rules: dicts with the 'access_type', 'access_to' and,
+            optionally, 'access_level' and 'metadata' of the rules.
+        :returns: list of :class:`AccessChange`, empty if the access rules
+            of the share are the desired ones.
+        """
+        desired = collections.OrderedDict()
+        for rule in desired_rules:
+            key = (rule['access_type'], rule['access_to'])
+            if key in desired:
+                raise ValueError("Access rule %s:%s is repeated." % key)
+            desired[key] = rule
+
+        changes = []
+        regrant = []
+        for existing in self.access_list(share):
+            key = (existing.access_type, existing.access_to)
+            rule = desired.pop(key, None)
+            metadata = getattr(existing, 'metadata', None) or {}
+            regranted = rule is None or any((
+                existing.state == constants.STATUS_ERROR,
+                existing.access_level != rule.get('access_level',
+                                                  DEFAULT_ACCESS_LEVEL)))
+            if regranted:
+                changes.append(AccessChange(
+                    share, 'deny', existing.access_type, existing.access_to,
+                    existing.access_level, metadata, existing.id, None))
+                if rule is not None:
+                    regrant.append(rule)
+            elif 'metadata' in rule:
+                update = dict((k, None) for k in metadata
+                              if k not in rule['metadata'])
+                update.update((k, v) for k, v in rule['metadata'].items()
+                              if metadata.get(k) != v)
+                if update:
+                    changes.append(AccessChange(
+                        share, 'update', existing.access_type,
+                        existing.access_to, existing.access_level, update,
+                        existing.id, None))
+
+        for rule in regrant + list(desired.values()):
+            changes.append(AccessChange(
+                share, 'allow', rule['access_type'], rule['access_to'],
+                rule.get('access_level', DEFAULT_ACCESS_LEVEL),
+                rule.get('metadata'), None, None))
+        return changes
+
+    @staticmethod
+    def _run_concurrently(func, items, max_workers):
+        with futures.ThreadPoolExecutor(
+                max_workers=max_workers or shares.ACCESS_WORKERS) as executor:
+            requests = [executor.submit(func, item) for item in items]
+        return [(request.exception(),
+                 None if request.exception() else request.result())
+                for request in requests]
+
+    def _apply(self, change):
+        if change.action == 'allow':
+            access = self.api.shares.allow(
+                change.share, change.access_type, change.access_to,
+                change.access_level, change.metadata)
+            return access['id']
+        if change.action == 'deny':
+            self.api.shares.deny(change.share, change.access_id)
+        else:
+            metadata = dict((k, v) for k, v in change.metadata.items()
+                            if v is not None)
+            if metadata:
+                self.set_metadata(change.access_id, metadata)
+            keys = [k for k, v in change.metadata.items() if v is None]
+            if keys:
+                self.unset_metadata(change.access_id, keys)
+        return change.access_id
+
+    def _wait_for_denied(self, denied, interval, timeout, max_workers):
+        """Wait for denied access rules to be gone from their shares.
+
+        :param denied: dict of the share IDs and the sets of the IDs of
+            their access rules denied.
+        :returns: dict of the share IDs and the exception raised for the
+            shares whose rules are still there, or could not be listed.
+        """
+        pending = dict((k, set(v)) for k, v in denied.items())
+        failed = {}
+        deadline = time.monotonic() + timeout
+        while pending:
+            share_ids = list(pending)
+            results = self._run_concurrently(
+                self.access_list, share_ids, max_workers)
+            for share_id, (error, rules) in zip(share_ids, results):
+                if error is not None:
+                    failed[share_id] = error
+                    del pending[share_id]
+                    continue
+                pending[share_id] &= set(rule.id for rule in rules)
+                if not pending[share_id]:
+                    del pending[share_id]
+            if pending and time.monotonic() >= deadline:
+                for share_id, access_ids in pending.items():
+                    failed[share_id] = exceptions.ClientException(
+                        "Access rules %(rules)s of share %(share)s were "
+                        "not denied within %(timeout)s seconds." % {
+                            'rules': ', '.join(sorted(access_ids)),
+                            'share': share_id, 'timeout': timeout})
+                break
+            if pending:
+                time.sleep(interval)
+        return failed
+
+    @api_versions.wraps("2.45")
+    def reconcile_many(self, desired, dry_run=False, max_workers=None,
+                       interval=2, timeout=DENY_TIMEOUT):
+        """Make the access rules of many shares the desired ones.
+
+        The changes of the shares are planned with concurrent listings, see
+        :meth:`plan`, and applied with concurrent requests, the rules are
+        denied and their metadata updated before any rule is allowed. The
+        shares whose access rules are the desired ones are not changed.
+
+        Denying an access rule is asynchronous, and a rule cannot be
+        allowed again until the denied one is gone. The access rules of the
+        shares whose rules are denied and allowed again are polled before
+        any rule is allowed, the rules of the shares whose denied rules are
+        still there after the timeout are not allowed and get the exception.
+        A rule whose deny failed is not allowed again, and that allow is
+        left out of the changes returned, only the deny has the exception.
+
+        :param desired: dict or pairs of the shares, objects or texts with
+            their IDs, and their desired access rules.
+        :param dry_run: only plan the changes.
+        :param max_workers: number of requests sent at the same time,
+            defaults to ACCESS_WORKERS.
+        :param interval: seconds between the polls of the denied rules.
+        :param timeout: seconds to wait at most for the denied rules to be
+            gone, defaults to DENY_TIMEOUT.
+        :returns: list of the :class:`AccessChange` planned, but the allows
+            skipped, with the ID of the access rules allowed and the
+            exception raised applying them.
+        """
+        if hasattr(desired, 'items'):
+            desired = desired.items()
+        desired = list(desired)
+
+        changes = []
+        for error, planned in self._run_concurrently(
+                lambda item: self.plan(*item), desired, max_workers):
+            if error is not None:
+                raise error
+            changes.extend(planned)
+        if dry_run or not changes:
+            return changes
+
+        def key(change):
+            return (common_base.getid(change.share), change.access_type,
+                    change.access_to)
+
+        failed = {}
+        for phase in (('deny', 'update'), ('allow',)):
+            if phase == ('allow',):
+                # NOTE: allowing a rule whose deny failed would only fail as
+                # a duplicate, or add a conflicting rule.
+                not_denied = set(key(c) for c in changes
+                                 if c.action == 'deny' and c.error is not None)
+                changes = [c for c in changes
+                           if c.action != 'allow' or key(c) not in not_denied]
+                allowed = set(key(c) for c in changes if c.action == 'allow')
+                denied = collections.OrderedDict()
+                for change in changes:
+                    if all((change.action == 'deny', change.error is None,
+                            key(change) in allowed)):
+                        denied.setdefault(key(change)[0], set()).add(
+                            change.access_id)
+                if denied:
+                    failed = self._wait_for_denied(denied, interval, timeout,
+                                                   max_workers)
+            batch = []
+            for i, change in enumerate(changes):
+                if change.action not in phase:
+                    continue
+                if key(change)[0] in failed:
+                    changes[i] = change._replace(error=failed[key(change)[0]])
+                else:
+                    batch.append(i)
+            results = self._run_concurrently(
+                self._apply, [changes[i] for i in batch], max_workers)
+            for i, (error, access_id) in zip(batch, results):
+                changes[i] = changes[i]._replace(
+                    access_id=access_id or changes[i].access_id, error=error)
+        return changes
+
+    @api_versions.wraps("2.45")
+    def reconcile(self, share, desired_rules, dry_run=False,
+                  max_workers=None, interval=2, timeout=DENY_TIMEOUT):
+        """Make the access rules of a share the desired ones.
+
+        See :meth:`reconcile_many`.
+        """
+        return self.reconcile_many([(share, desired_rules)], dry_run=dry_run,
+                                   max_workers=max_workers, interval=interval,
+                                   timeout=timeout)
@@ -150,4 +150,4 @@ class ShareGroupTypeManager(base.ManagerWithFind):
         """
         share_group_type_id = common_base.getid(share_group_type)
         url = RESOURCE_PATH % share_group_type_id
-        self._delete(url)
+        self._delete(url, resource_id=share_group_type_id)
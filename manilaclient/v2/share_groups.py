@@ -201,7 +201,7 @@ class ShareGroupManager(base.ManagerWithFind):
             self.api.client.post(url, body=body)
         else:
             url = RESOURCE_PATH % share_group_id
-            self._delete(url)
+            self._delete(url, resource_id=share_group_id)
 
     @api_versions.wraps("2.31")
     @api_versions.experimental_api
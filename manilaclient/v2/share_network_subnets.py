@@ -89,4 +89,4 @@ class ShareNetworkSubnetManager(base.ManagerWithFind):
             'share_network_id': common_base.getid(share_network),
             'share_network_subnet': share_network_subnet
         }
-        self._delete(url)
+        self._delete(url, resource_id=share_network_subnet)
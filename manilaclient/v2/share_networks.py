@@ -231,7 +231,9 @@ class ShareNetworkManager(base.ManagerWithFind):
 
         :param share_network: share network to be deleted.
         """
-        self._delete(RESOURCE_PATH % common_base.getid(share_network))
+        share_network_id = common_base.getid(share_network)
+        self._delete(RESOURCE_PATH % share_network_id,
+                     resource_id=share_network_id)
 
     def list(self, detailed=True, search_opts=None):
         """Get a list of all share network.
@@ -171,7 +171,7 @@ class ShareReplicaManager(base.ManagerWithFind):
         if force:
             self._do_force_delete(replica_id)
         else:
-            self._delete(url)
+            self._delete(url, resource_id=replica_id)
 
     def _do_force_delete(self, replica, action_name="force_delete"):
         """Delete a share replica forcibly - share status will be avoided.
@@ -87,7 +87,7 @@ class ShareServerManager(base.ManagerWithFind):
         :param server: ID of the :class:`ShareServer` to delete.
         """
         server_id = common_base.getid(server)
-        self._delete(RESOURCE_PATH % server_id)
+        self._delete(RESOURCE_PATH % server_id, resource_id=server_id)
 
     def list(self, search_opts=None):
         """Get a list of share servers.
@@ -156,12 +156,36 @@ class ShareSnapshotManager(base.ManagerWithFind):
 
         return self._list(path, 'snapshots')
 
+    def watch(self, interval=60, page_size=20, search_opts=None,
+              since=None, resync_every=10, max_polls=None):
+        """Yield the snapshots created, updated or deleted, polling the API.
+
+        Only the snapshots updated since the previous poll are listed, see
+        :meth:`manilaclient.base.Manager._watch`.
+
+        :param interval: seconds between the polls.
+        :param page_size: number of snapshots listed per request.
+        :param search_opts: search options to filter out snapshots.
+        :param since: ISO 8601 time to yield the changes since, by default
+            the changes since the generator started.
+        :param resync_every: number of polls between the listings of the
+            IDs of the snapshots, which find the deleted ones and those created
+            without an update time, 0 disables them.
+        :param max_polls: number of polls to stop after, by default the
+            generator never stops.
+        :rtype: generator of :class:`manilaclient.base.Change`
+        """
+        return self._watch(interval, page_size, search_opts=search_opts,
+                           since=since, resync_every=resync_every,
+                           max_polls=max_polls)
+
     def delete(self, snapshot):
         """Delete a snapshot of a share.
 
         :param snapshot: The :class:`ShareSnapshot` to delete.
         """
-        self._delete("/snapshots/%s" % common_base.getid(snapshot))
+        snapshot_id = common_base.getid(snapshot)
+        self._delete("/snapshots/%s" % snapshot_id, resource_id=snapshot_id)
 
     def _do_force_delete(self, snapshot, action_name="force_delete"):
         """Delete the specified snapshot ignoring its current state."""
@@ -145,7 +145,8 @@ class ShareTypeManager(base.ManagerWithFind):
 
         :param share_type: The name or ID of the :class:`ShareType` to get.
         """
-        self._delete("/types/%s" % common_base.getid(share_type))
+        share_type_id = common_base.getid(share_type)
+        self._delete("/types/%s" % share_type_id, resource_id=share_type_id)
 
     def _do_create(self, name, extra_specs, is_public,
                    is_public_keyname="share_type_access:is_public",
@@ -15,18 +15,48 @@
 """Interface for shares extension."""
 
 import collections
+from concurrent import futures
 import ipaddress
 from oslo_utils import uuidutils
 import re
 import six
 import string
+import time
 
 from manilaclient import api_versions
 from manilaclient import base
 from manilaclient.common.apiclient import base as common_base
 from manilaclient.common import constants
 from manilaclient import exceptions
+from manilaclient.v2 import scheduler_stats
 from manilaclient.v2 import share_instances
+from manilaclient.v2 import share_types
+
+# Shares listed per request by ShareManager.iterate().
+PAGE_SIZE = 1000
+
+# Access rule requests sent at the same time by allow_many() and deny_many().
+ACCESS_WORKERS = 8
+
+# Shares pending wait_for_access_rules() fetches one by one, instead of
+# listing the shares.
+ACCESS_WAIT_GETS = 10
+
+# Seconds wait_for_access_rules() waits at most by default.
+ACCESS_WAIT_TIMEOUT = 300
+
+# Outcome of granting or revoking access to a share: the access rule granted
+# or revoked, or the exception raised doing it.
+AccessResult = collections.namedtuple('AccessResult',
+                                      ('share', 'access', 'error'))
+
+# Metadata requests sent at the same time by update_metadata_many().
+METADATA_WORKERS = 8
+
+# Change of the metadata of a share: the items set, the keys unset and the
+# exception raised changing them.
+MetadataResult = collections.namedtuple('MetadataResult',
+                                        ('share', 'set', 'unset', 'error'))
 
 
 class Share(common_base.Resource):
@@ -156,6 +186,33 @@ class ShareManager(base.ManagerWithFind):
 
         return self._create('/shares', {'share': body}, 'share')
 
+    def check_placement(self, share_proto, size, share_type=None,
+                        availability_zone=None,
+                        ttl=scheduler_stats.SNAPSHOT_TTL):
+        """Check which pools a share could be created on, without creating it.
+
+        The pools are evaluated with the availability zone, capabilities
+        and capacity filters of the scheduler, from a snapshot of the pools
+        reused for ``ttl`` seconds, see
+        :meth:`manilaclient.v2.capacity.PoolSnapshot.place`. Listing the
+        pools requires the admin role.
+
+        :param share_proto: text - share protocol of the share.
+        :param size: int - size in GiB
+        :param share_type: either instance of ShareType or text with ID,
+            defaults to the default share type. Pass the share type listed
+            before to check many shares without requesting it each time.
+        :param availability_zone: text - availability zone of the share.
+        :param ttl: seconds the snapshot of the pools is reused for.
+        :rtype: list of :class:`manilaclient.v2.capacity.PlacementCheck`
+        """
+        if not isinstance(share_type, share_types.ShareType):
+            share_type = self.api.share_types.get(share_type or 'default')
+        snapshot = self.api.pools.snapshot(ttl=ttl)
+        return snapshot.place(size, extra_specs=share_type.get_keys(),
+                              availability_zone=availability_zone,
+                              share_proto=share_proto)
+
     @api_versions.wraps("2.29")
     @api_versions.experimental_api
     def migration_start(self, share, host, force_host_assisted_migration,
@@ -347,6 +404,89 @@ class ShareManager(base.ManagerWithFind):
         return self.do_list(detailed=detailed, search_opts=search_opts,
                             sort_key=sort_key, sort_dir=sort_dir)
 
+    def iterate(self, detailed=True, search_opts=None, sort_key=None,
+                sort_dir=None, page_size=None, marker=None, limit=None):
+        """Yield the shares listed page by page.
+
+        The shares of a page are yielded before the next page is listed, a
+        limit in the search options is ignored.
+
+        :param detailed: Whether to yield detailed share info or not.
+        :param search_opts: dict with search options to filter out shares,
+            see :meth:`do_list`.
+        :param sort_key: Key to be sorted, see :meth:`do_list`.
+        :param sort_dir: Sort direction, should be 'desc' or 'asc'.
+        :param page_size: number of shares listed per request, defaults to
+            PAGE_SIZE.
+        :param marker: ID of a share, only the shares listed after it are
+            yielded. The API pages by offset, the pages are listed until the
+            marker is found.
+        :param limit: maximum number of shares to yield, the pages are no
+            larger than the shares left to yield.
+        """
+        page_size = page_size or PAGE_SIZE
+        search_opts = dict(search_opts or {})
+        search_opts.pop('limit', None)
+        offset = search_opts.pop('offset', None) or 0
+        found = marker is None
+        while limit is None or limit > 0:
+            size = page_size
+            if found and limit is not None:
+                size = min(page_size, limit)
+            search_opts.update(limit=size, offset=offset)
+            page = self.list(detailed=detailed,
+                             search_opts=dict(search_opts),
+                             sort_key=sort_key, sort_dir=sort_dir)
+            for share in page:
+                if not found:
+                    found = share.id == marker
+                    continue
+                if limit is not None:
+                    if not limit:
+                        return
+                    limit -= 1
+                yield share
+            if len(page) < size:
+                return
+            offset += len(page)
+
+    def _count(self, search_opts):
+        return sum(1 for share in self.iterate(detailed=False,
+                                               search_opts=search_opts))
+
+    @api_versions.wraps("1.0", "2.41")
+    def count(self, search_opts=None):
+        """Return the number of shares matching the search options.
+
+        The API cannot count shares before API version 2.42, the IDs of the
+        shares are listed page by page and counted.
+
+        :param search_opts: dict with search options to filter out shares,
+            see :meth:`do_list`.
+        :rtype: int
+        """
+        return self._count(search_opts)
+
+    @api_versions.wraps("2.42")  # noqa
+    def count(self, search_opts=None):
+        """Return the number of shares matching the search options.
+
+        The API counts the shares, and only a page of one share of the
+        summary listing is transferred.
+
+        :param search_opts: dict with search options to filter out shares,
+            see :meth:`do_list`.
+        :rtype: int
+        """
+        opts = dict(search_opts or {}, with_count=True, limit=1)
+        opts.pop('offset', None)
+        result = self.list(detailed=False, search_opts=opts)
+        if isinstance(result, tuple):
+            return result[1]
+        # NOTE: the API did not count the shares, e.g. it is older than the
+        # requested version.
+        return self._count(search_opts)
+
     def do_list(self, detailed=True, search_opts=None,
                 sort_key=None, sort_dir=None):
         """Get a list of all shares.
@@ -418,6 +558,29 @@ class ShareManager(base.ManagerWithFind):
 
         return self._list(path, 'shares')
 
+    def watch(self, interval=60, page_size=20, search_opts=None,
+              since=None, resync_every=10, max_polls=None):
+        """Yield the shares created, updated or deleted, polling the API.
+
+        Only the shares updated since the previous poll are listed, see
+        :meth:`manilaclient.base.Manager._watch`.
+
+        :param interval: seconds between the polls.
+        :param page_size: number of shares listed per request.
+        :param search_opts: search options to filter out shares.
+        :param since: ISO 8601 time to yield the changes since, by default
+            the changes since the generator started.
+        :param resync_every: number of polls between the listings of the
+            IDs of the shares, which find the deleted ones and those created
+            without an update time, 0 disables them.
+        :param max_polls: number of polls to stop after, by default the
+            generator never stops.
+        :rtype: generator of :class:`manilaclient.base.Change`
+        """
+        return self._watch(interval, page_size, search_opts=search_opts,
+                           since=since, resync_every=resync_every,
+                           max_polls=max_polls)
+
     def delete(self, share, share_group_id=None):
         """Delete a share.
 
@@ -425,10 +588,11 @@ class ShareManager(base.ManagerWithFind):
         :param share_group_id: text - ID of the share group to which the share
             belongs
         """
-        url = "/shares/%s" % common_base.getid(share)
+        share_id = common_base.getid(share)
+        url = "/shares/%s" % share_id
         if share_group_id:
             url += "?share_group_id=%s" % share_group_id
-        self._delete(url)
+        self._delete(url, resource_id=share_id)
 
     def _do_force_delete(self, share, action_name):
         """Delete a share forcibly - share status will be avoided.
@@ -599,6 +763,113 @@ class ShareManager(base.ManagerWithFind):
     def deny(self, share, access_id):
         return self._do_deny(share, access_id, "deny_access")
 
+    @staticmethod
+    def _run_access_requests(func, items, max_workers):
+        with futures.ThreadPoolExecutor(
+                max_workers=max_workers or ACCESS_WORKERS) as executor:
+            requests = [executor.submit(func, *item) for item in items]
+        results = []
+        for item, request in zip(items, requests):
+            error = request.exception()
+            access = item[1] if len(item) > 1 else None
+            if error is None:
+                access = request.result() or access
+            results.append(AccessResult(item[0], access, error))
+        return results
+
+    def allow_many(self, shares, access_type, access, access_level,
+                   metadata=None, max_workers=None):
+        """Allow access to many shares with concurrent requests.
+
+        :param shares: share objects or texts with their IDs.
+        :param access_type: string that represents access type ('ip','domain')
+        :param access: string that represents access ('127.0.0.1')
+        :param access_level: string that represents access level ('rw', 'ro')
+        :param metadata: A dict of key/value pairs to be set
+        :param max_workers: number of requests sent at the same time,
+            defaults to ACCESS_WORKERS.
+        :returns: list of :class:`AccessResult`, in the order of the shares,
+            with the access rule granted to each share or the exception
+            raised granting it.
+        """
+        def allow(share):
+            return self.allow(share, access_type, access, access_level,
+                              metadata)
+
+        return self._run_access_requests(
+            allow, [(share,) for share in shares], max_workers)
+
+    def deny_many(self, rules, max_workers=None):
+        """Deny access to shares with concurrent requests.
+
+        :param rules: pairs of a share, object or text with its ID, and the
+            ID of one of its access rules.
+        :param max_workers: number of requests sent at the same time,
+            defaults to ACCESS_WORKERS.
+        :returns: list of :class:`AccessResult`, in the order of the rules,
+            with the ID of the access rule revoked or the exception raised
+            revoking it.
+        """
+        def deny(share, access_id):
+            self.deny(share, access_id)
+
+        return self._run_access_requests(
+            deny, [tuple(rule) for rule in rules], max_workers)
+
+    @api_versions.wraps("2.10")
+    def wait_for_access_rules(self, shares, search_opts=None, interval=2,
+                              timeout=None):
+        """Wait for the access rules of shares to be applied.
+
+        The ``access_rules_status`` of the shares is polled. Up to
+        ACCESS_WAIT_GETS shares pending are fetched one by one. With more,
+        the shares are listed page by page, see :meth:`iterate`, until at
+        most ACCESS_WAIT_GETS pending shares are left unlisted, which are
+        fetched one by one. A poll can then list every share matching
+        ``search_opts``, which should narrow the listing down to the shares
+        waited for when they are a small part of the project.
+
+        :param shares: share objects or texts with their IDs, the share
+            objects are refreshed.
+        :param search_opts: search options narrowing the listings down to
+            the shares, see :meth:`do_list`.
+        :param interval: seconds between the polls.
+        :param timeout: seconds to wait at most, defaults to
+            ACCESS_WAIT_TIMEOUT. The shares still pending then have their
+            last ``access_rules_status``, e.g. syncing.
+        :returns: dict of the share IDs and their ``access_rules_status``.
+        """
+        pending = collections.OrderedDict()
+        for share in shares:
+            if not isinstance(share, Share):
+                share = self.resource_class(
+                    self, {'id': common_base.getid(share)})
+            pending[share.id] = share
+        deadline = time.monotonic() + (
+            ACCESS_WAIT_TIMEOUT if timeout is None else timeout)
+        statuses = {}
+        while True:
+            missing = dict(pending)
+            if len(pending) > ACCESS_WAIT_GETS:
+                for listed in self.iterate(search_opts=search_opts):
+                    share = missing.pop(listed.id, None)
+                    if share is not None:
+                        share._add_details(listed._info)
+                        share.set_loaded(True)
+                        if len(missing) <= ACCESS_WAIT_GETS:
+                            break
+            for share in missing.values():
+                share._add_details(self.get(share.id)._info)
+                share.set_loaded(True)
+            for share_id, share in list(pending.items()):
+                status = getattr(share, 'access_rules_status', None)
+                statuses[share_id] = status
+                if status in (constants.STATUS_ACTIVE, constants.STATUS_ERROR):
+                    del pending[share_id]
+            if not pending or time.monotonic() >= deadline:
+                return statuses
+            time.sleep(interval)
+
     def _do_access_list(self, share, action_name):
         """Get access list to a share.
 
@@ -658,6 +929,85 @@ class ShareManager(base.ManagerWithFind):
         return self._update("/shares/%s/metadata" % common_base.getid(share),
                             body)
 
+    def update_metadata_many(self, metadata=None, keys=None, shares=None,
+                             search_opts=None, dry_run=False,
+                             max_workers=None, progress=None):
+        """Set and unset metadata of many shares with concurrent requests.
+
+        The metadata of the shares is read from a detailed listing, see
+        :meth:`iterate`. Only the items with other values are set and only
+        the keys present are unset, the shares whose metadata would not
+        change are not updated. Calling it again after an interruption
+        updates only the shares left.
+
+        :param metadata: dict of the items to set.
+        :param keys: list of the keys to unset.
+        :param shares: share objects or texts with their IDs, by default all
+            the shares listed are updated.
+        :param search_opts: dict with search options to filter out shares,
+            see :meth:`do_list`. Unlike :meth:`do_list`, the public shares of
+            other projects are not listed unless 'is_public' is set.
+        :param dry_run: only compute the changes.
+        :param max_workers: number of requests sent at the same time,
+            defaults to METADATA_WORKERS.
+        :param progress: callable called with the :class:`MetadataResult`
+            of each share updated, as the updates complete.
+        :returns: list of :class:`MetadataResult`, in the order of the
+            listing, with empty changes for the shares not updated. The
+            shares not listed have a NotFound error.
+        """
+        metadata = metadata or {}
+        keys = keys or []
+        if set(metadata).intersection(keys):
+            raise ValueError("Metadata keys cannot be both set and unset.")
+        search_opts = dict(search_opts or {})
+        search_opts.setdefault('is_public', False)
+        wanted = None
+        if shares is not None:
+            wanted = collections.OrderedDict(
+                (common_base.getid(share), share) for share in shares)
+
+        results = []
+        for share in self.iterate(search_opts=search_opts):
+            if wanted is not None:
+                if wanted.pop(share.id, None) is None:
+                    continue
+            current = share._info.get('metadata') or {}
+            results.append(MetadataResult(
+                share,
+                dict((k, v) for k, v in metadata.items()
+                     if current.get(k) != v),
+                [k for k in keys if k in current],
+                None))
+            if wanted is not None and not wanted:
+                break
+        for share_id, share in (wanted or {}).items():
+            results.append(MetadataResult(
+                share, {}, [],
+                exceptions.NotFound(404, "Share %s not found." % share_id)))
+
+        changed = [i for i, result in enumerate(results)
+                   if result.error is None and (result.set or result.unset)]
+        if dry_run or not changed:
+            return results
+
+        def update(result):
+            if result.set:
+                self.set_metadata(result.share, result.set)
+            if result.unset:
+                self.delete_metadata(result.share, result.unset)
+
+        with futures.ThreadPoolExecutor(
+                max_workers=max_workers or METADATA_WORKERS) as executor:
+            requests = dict((executor.submit(update, results[i]), i)
+                            for i in changed)
+            for request in futures.as_completed(requests):
+                i = requests[request]
+                results[i] = results[i]._replace(error=request.exception())
+                if progress is not None:
+                    progress(results[i])
+        return results
+
     def _action(self, action, share, info=None, **kwargs):
         """Perform a share 'action'.
 
@@ -16,12 +16,14 @@
 from __future__ import print_function
 
 
+import collections
+import datetime
+import json
 from operator import xor
 import os
 import sys
 import time
 
-from oslo_utils import strutils
 import six
 
 from manilaclient import api_versions
@@ -29,8 +31,13 @@ from manilaclient.common.apiclient import utils as apiclient_utils
 from manilaclient.common import cliutils
 from manilaclient.common import constants
 from manilaclient import exceptions
+from manilaclient import utils
+from manilaclient.v2 import capacity
+from manilaclient.v2 import inventory
 from manilaclient.v2 import quotas
 
+strutils = utils.LazyModule('oslo_utils.strutils')
+
 
 def _poll_for_status(poll_fn, obj_id, action, final_ok_states,
                      poll_period=5, show_progress=True):
@@ -352,6 +359,22 @@ def _split_columns(columns, title=True):
     return list_of_keys
 
 
+# Attributes of the resources in the summary listings, which are requested
+# instead of the detailed ones when they have all the displayed columns.
+SUMMARY_FIELDS = {
+    'pools': ('name', 'host', 'backend', 'pool'),
+    'share_networks': ('id', 'name'),
+    'shares': ('id', 'name'),
+    'snapshots': ('id', 'name'),
+}
+
+
+def _is_summary_enough(resource_type, fields):
+    """Whether the summary listing has the attributes of the fields."""
+    return all(field.lower().replace(' ', '_') in SUMMARY_FIELDS[resource_type]
+               for field in fields)
+
+
 @api_versions.wraps("2.0")
 def do_api_version(cs, args):
     """Display the API version information."""
@@ -456,6 +479,114 @@ def do_quota_show(cs, args):
     _quota_set_pretty_show(cs.quotas.get(**kwargs))
 
 
+# Columns of quota-report, by the attribute of quotas.QuotaUsage they show.
+QUOTA_REPORT_COLUMNS = collections.OrderedDict((
+    ('tenant_id', 'Tenant ID'),
+    ('share_type', 'Share Type'),
+    ('resource', 'Resource'),
+    ('projects', 'Projects'),
+    ('in_use', 'In Use'),
+    ('reserved', 'Reserved'),
+    ('limit', 'Limit'),
+    ('utilization', 'Utilization %'),
+))
+
+
+@cliutils.arg(
+    '--tenant-ids',
+    '--tenant_ids',  # alias
+    metavar='<tenant-id>',
+    nargs='+',
+    default=None,
+    help='IDs of the tenants to report the quotas of. Default=the tenants '
+         'listed by the identity service, or the tenants with shares.')
+@cliutils.arg(
+    '--share-type',
+    '--share_type',  # alias
+    metavar='<share-type>',
+    dest='share_types',
+    action='append',
+    default=None,
+    help='UUID or name of a share type to report the quotas of too. May be '
+         'repeated. Available only for microversion >= 2.39.')
+@cliutils.arg(
+    '--per-project',
+    '--per_project',  # alias
+    dest='per_project',
+    action='store_true',
+    default=False,
+    help='Report the quotas of each tenant apart, instead of their sum.')
+@cliutils.arg(
+    '--sort-key',
+    '--sort_key',  # alias
+    metavar='<sort_key>',
+    type=str,
+    default=None,
+    action='single_alias',
+    choices=list(QUOTA_REPORT_COLUMNS),
+    help='Key to be sorted, available keys are %(keys)s. '
+         'Default=tenant, share type and resource.' % {
+             'keys': ', '.join(QUOTA_REPORT_COLUMNS)})
+@cliutils.arg(
+    '--sort-dir',
+    '--sort_dir',  # alias
+    metavar='<sort_dir>',
+    type=str,
+    default='asc',
+    action='single_alias',
+    choices=constants.SORT_DIR_VALUES,
+    help='Sort direction, available values are %(values)s. '
+         'Default=asc.' % {'values': constants.SORT_DIR_VALUES})
+@cliutils.arg(
+    '--max-workers',
+    '--max_workers',  # alias
+    dest='max_workers',
+    metavar='<max_workers>',
+    type=int,
+    default=None,
+    action='single_alias',
+    help='Number of requests sent at the same time. Default=8.')
+@api_versions.wraps("2.25")
+def do_quota_report(cs, args):
+    """Report the usage of the quotas of many tenants (Admin only)."""
+    try:
+        results = cs.quotas.get_many(
+            args.tenant_ids, share_types=args.share_types,
+            max_workers=args.max_workers)
+    except exceptions.UnsupportedVersion as e:
+        raise exceptions.CommandError(six.text_type(e))
+    failed = [r for r in results if r.error is not None]
+    for result in failed:
+        print("Unable to get the quotas of tenant %(tenant)s%(type)s: "
+              "%(error)s" % {
+                  'tenant': result.tenant_id, 'error': result.error,
+                  'type': (' and share type %s' % result.share_type
+                           if result.share_type else '')},
+              file=sys.stderr)
+    if failed and len(failed) == len(results):
+        raise exceptions.CommandError("Unable to get any quotas.")
+
+    usages = quotas.aggregate_usage(results, by_project=args.per_project)
+    if args.sort_key:
+        def sort_key(usage):
+            value = getattr(usage, args.sort_key)
+            # NOTE: missing values, like the utilization of unlimited
+            # quotas, sort before the others.
+            return value is not None, value
+
+        usages = sorted(usages, key=sort_key,
+                        reverse=args.sort_dir == 'desc')
+    fields = list(QUOTA_REPORT_COLUMNS.values())
+    if not args.per_project:
+        fields.remove('Tenant ID')
+    formatters = {
+        'Utilization %': lambda u: (None if u.utilization is None
+                                    else round(u.utilization * 100, 1)),
+    }
+    cliutils.print_list(usages, fields, formatters=formatters,
+                        sortby_index=None)
+
+
 @cliutils.arg(
     '--tenant-id',
     metavar='<tenant-id>',
@@ -763,10 +894,24 @@ def do_rate_limits(cs, args):
     help='Optional share group name or ID in which to create the share '
          '(Experimental, Default=None).',
     default=None)
+@cliutils.arg(
+    '--dry-run',
+    '--dry_run',  # alias
+    dest='dry_run',
+    action='store_true',
+    default=False,
+    help='Do not create the share, list the pools it could be scheduled to '
+         'by its share type, size and availability zone instead. The '
+         'capacity and capabilities of the pools are those listed up to a '
+         'minute before (Admin only).')
 @cliutils.service_type('sharev2')
 def do_create(cs, args):
     """Creates a new share (NFS, CIFS, CephFS, GlusterFS, HDFS or MAPRFS)."""
 
+    if args.dry_run:
+        _check_share_placement(cs, args)
+        return
+
     share_metadata = None
     if args.metadata is not None:
         share_metadata = _extract_metadata(args)
@@ -789,6 +934,32 @@ def do_create(cs, args):
     _print_share(cs, share)
 
 
+def _check_share_placement(cs, args):
+    share_type = None
+    if args.share_type:
+        share_type = _find_share_type(cs, args.share_type)
+    checks = cs.shares.check_placement(
+        args.share_protocol, args.size, share_type=share_type,
+        availability_zone=args.availability_zone)
+    candidates = [c for c in checks if c.reason is None]
+    if not candidates:
+        reasons = collections.Counter(c.reason for c in checks)
+        raise exceptions.CommandError(
+            "No pool can take a share of %(size)s GiB%(reasons)s." % {
+                'size': args.size,
+                'reasons': ''.join(
+                    ', %s rejected by the %s filter' % (reasons[f], f)
+                    for f in capacity.PLACEMENT_FILTERS if reasons[f])})
+    cliutils.print_list(candidates, ['Pool', 'Free Capacity GB',
+                                     'Virtual Free Capacity GB',
+                                     'Provisioned Ratio'],
+                        formatters={
+                            'Provisioned Ratio': lambda c: (
+                                None if c.provisioned_ratio is None
+                                else round(c.provisioned_ratio, 2))},
+                        sortby_index=None)
+
+
 @api_versions.wraps("2.29")
 @cliutils.arg(
     'share',
@@ -1010,6 +1181,136 @@ def do_metadata_update_all(cs, args):
     cliutils.print_dict(metadata, 'Property')
 
 
+# Shares updated between the progress messages of metadata-bulk.
+METADATA_PROGRESS_EVERY = 100
+
+
+@cliutils.arg(
+    'action',
+    metavar='<action>',
+    choices=['set', 'unset'],
+    help="Actions: 'set' or 'unset'.")
+@cliutils.arg(
+    'metadata',
+    metavar='<key=value>',
+    nargs='+',
+    default=[],
+    help='Metadata to set or unset (key is only necessary on unset).')
+@cliutils.arg(
+    '--shares',
+    metavar='<share>',
+    nargs='+',
+    default=None,
+    help='Names or IDs of the shares to update, by default all the shares '
+         'matching the filters are updated.')
+@cliutils.arg(
+    '--all-tenants',
+    dest='all_tenants',
+    metavar='<0|1>',
+    nargs='?',
+    type=int,
+    const=1,
+    default=0,
+    help='Update the shares of all tenants (Admin only).')
+@cliutils.arg(
+    '--project-id',
+    '--project_id',  # alias
+    metavar='<project_id>',
+    type=str,
+    default=None,
+    action='single_alias',
+    help="Filter shares by project id. Useful with set key '--all-tenants'.")
+@cliutils.arg(
+    '--name',
+    metavar='<name>',
+    type=six.text_type,
+    default=None,
+    help='Filter shares by name.')
+@cliutils.arg(
+    '--status',
+    metavar='<status>',
+    type=str,
+    default=None,
+    help='Filter shares by status.')
+@cliutils.arg(
+    '--filter-metadata',
+    '--filter_metadata',  # alias
+    dest='filter_metadata',
+    type=str,
+    nargs='*',
+    metavar='<key=value>',
+    default=None,
+    help='Filter shares by metadata key and value.')
+@cliutils.arg(
+    '--dry-run',
+    '--dry_run',  # alias
+    dest='dry_run',
+    action='store_true',
+    default=False,
+    help='Print the changes without applying them.')
+@cliutils.arg(
+    '--max-workers',
+    '--max_workers',  # alias
+    dest='max_workers',
+    metavar='<max_workers>',
+    type=int,
+    default=None,
+    action='single_alias',
+    help='Number of requests sent at the same time. Default=8.')
+def do_metadata_bulk(cs, args):
+    """Set or delete metadata on many shares.
+
+    The shares whose metadata would not change are not updated, run it
+    again to resume an interrupted update.
+    """
+    metadata = _extract_metadata(args)
+    shares = None
+    if args.shares:
+        shares = [_find_share(cs, share) for share in args.shares]
+    search_opts = {
+        'all_tenants': int(os.environ.get("ALL_TENANTS", args.all_tenants)),
+        'project_id': args.project_id,
+        'name': args.name,
+        'status': args.status,
+        'metadata': _extract_key_value_options(args, 'filter_metadata'),
+        'is_public': False,
+    }
+    if args.action == 'set':
+        kwargs = {'metadata': metadata}
+    else:
+        kwargs = {'keys': sorted(metadata, reverse=True)}
+
+    updated = []
+
+    def progress(result):
+        updated.append(result)
+        if len(updated) % METADATA_PROGRESS_EVERY == 0:
+            print("Updated %d shares." % len(updated), file=sys.stderr)
+
+    results = cs.shares.update_metadata_many(
+        shares=shares, search_opts=search_opts, dry_run=args.dry_run,
+        max_workers=args.max_workers, progress=progress, **kwargs)
+
+    changed = [r for r in results if r.set or r.unset or r.error]
+    metadata_row = collections.namedtuple(
+        'Metadata', ('share', 'set', 'unset', 'error'))
+    rows = [metadata_row(result.share.id, result.set or '',
+                         ', '.join(result.unset), result.error or '')
+            for result in changed]
+    fields = ['Share', 'Set', 'Unset']
+    if not args.dry_run:
+        fields.append('Error')
+    cliutils.print_list(rows, fields, sortby_index=None)
+    failed = len([r for r in changed if r.error is not None])
+    print("%(changed)d of %(total)d shares %(verb)s, %(failed)d failed." % {
+        'changed': len(changed) - failed, 'total': len(results),
+        'verb': 'to update' if args.dry_run else 'updated',
+        'failed': failed}, file=sys.stderr)
+    if failed:
+        raise exceptions.CommandError(
+            "Unable to update the metadata of %d shares." % failed)
+
+
 @api_versions.wraps("2.9")
 @cliutils.arg(
     'share',
@@ -1411,7 +1712,9 @@ def do_show(cs, args):
 @cliutils.arg(
     'share',
     metavar='<share>',
-    help='Name or ID of the NAS share to modify.')
+    nargs='?',
+    help='Name or ID of the NAS share to modify. Optional when --shares is '
+         'given.')
 @cliutils.arg(
     'access_type',
     metavar='<access_type>',
@@ -1439,6 +1742,32 @@ def do_show(cs, args):
     help='Space Separated list of key=value pairs of metadata items. '
          'OPTIONAL: Default=None. Available only for microversion >= 2.45.',
     default=None)
+@cliutils.arg(
+    '--shares',
+    metavar='<share>[,<share>...]',
+    action='append',
+    default=None,
+    help='Comma separated names or IDs of more shares to allow access to, '
+         'may be repeated. The access is allowed with concurrent requests, '
+         'and a table of the access rules granted is printed.')
+@cliutils.arg(
+    '--wait',
+    action='store_true',
+    default=False,
+    help='Wait for the access rules of the shares to be applied, and print '
+         'the access rules status of the shares. Available only for '
+         'microversion >= 2.10.')
+@cliutils.arg(
+    '--wait-timeout',
+    '--wait_timeout',  # alias
+    dest='wait_timeout',
+    metavar='<seconds>',
+    type=int,
+    default=None,
+    action='single_alias',
+    help='Seconds to wait at most with --wait, the shares still pending '
+         'are then printed with their current access rules status. '
+         'Default=300.')
 def do_access_allow(cs, args):
     """Allow access to a given share."""
     access_metadata = None
@@ -1449,11 +1778,54 @@ def do_access_allow(cs, args):
         raise exceptions.CommandError(
             "Adding metadata to access rules is supported only beyond "
             "API version 2.45")
-
-    share = _find_share(cs, args.share)
-    access = share.allow(args.access_type, args.access_to, args.access_level,
-                         access_metadata)
-    cliutils.print_dict(access)
+    if args.wait and not cs.api_version.matches(
+            api_versions.APIVersion("2.10"), api_versions.APIVersion()):
+        raise exceptions.CommandError(
+            "Waiting for access rules is supported only beyond "
+            "API version 2.10")
+
+    names = [args.share] if args.share else []
+    for value in args.shares or []:
+        names.extend(name for name in value.split(',') if name)
+    if not names:
+        raise exceptions.CommandError("A share or --shares is required.")
+    shares = [_find_share(cs, name) for name in names]
+
+    if not args.shares:
+        access = shares[0].allow(args.access_type, args.access_to,
+                                 args.access_level, access_metadata)
+        if args.wait:
+            status = cs.shares.wait_for_access_rules(
+                shares, timeout=args.wait_timeout)[shares[0].id]
+            access = dict(access, access_rules_status=status)
+        cliutils.print_dict(access)
+        return
+
+    results = cs.shares.allow_many(shares, args.access_type, args.access_to,
+                                   args.access_level, access_metadata)
+    statuses = {}
+    if args.wait:
+        statuses = cs.shares.wait_for_access_rules(
+            [r.share for r in results if r.error is None],
+            timeout=args.wait_timeout)
+    access_row = collections.namedtuple(
+        'Access', ('share', 'access_id', 'state', 'access_rules_status',
+                   'error'))
+    rows = []
+    for result in results:
+        access = result.access or {}
+        rows.append(access_row(
+            result.share.id, access.get('id', ''), access.get('state', ''),
+            statuses.get(result.share.id, ''), result.error or ''))
+    fields = ['Share', 'Access ID', 'State', 'Error']
+    if args.wait:
+        fields.insert(3, 'Access Rules Status')
+    cliutils.print_list(rows, fields, sortby_index=None)
+    failed = [r for r in results if r.error is not None]
+    if failed:
+        raise exceptions.CommandError(
+            "Unable to allow access to %d of the %d shares." % (
+                len(failed), len(results)))
 
 
 @api_versions.wraps("2.45")
@@ -1655,6 +2027,76 @@ def do_access_list(cs, args):
     cliutils.print_list(access_list, list_of_keys)
 
 
+@api_versions.wraps("2.45")
+@cliutils.arg(
+    'rules_file',
+    metavar='<rules_file>',
+    help='JSON file mapping the names or IDs of shares to lists of their '
+         'access rules, objects with "access_type", "access_to" and, '
+         'optionally, "access_level" and "metadata". "-" reads the '
+         'standard input.')
+@cliutils.arg(
+    '--dry-run',
+    '--dry_run',  # alias
+    dest='dry_run',
+    action='store_true',
+    default=False,
+    help='Print the changes without applying them.')
+@cliutils.arg(
+    '--max-workers',
+    '--max_workers',  # alias
+    dest='max_workers',
+    metavar='<max_workers>',
+    type=int,
+    default=None,
+    action='single_alias',
+    help='Number of requests sent at the same time. Default=8.')
+def do_access_sync(cs, args):
+    """Make the access rules of shares exactly the ones of a file.
+
+    The rules of the shares not in the file are left untouched.
+    """
+    try:
+        if args.rules_file == '-':
+            desired = json.load(sys.stdin)
+        else:
+            with open(args.rules_file) as f:
+                desired = json.load(f)
+    except (IOError, ValueError) as e:
+        raise exceptions.CommandError(
+            "Unable to read access rules from %s: %s" % (args.rules_file, e))
+    if not isinstance(desired, dict):
+        raise exceptions.CommandError(
+            "The access rules file must map shares to lists of rules.")
+
+    desired = [(_find_share(cs, name), rules)
+               for name, rules in sorted(desired.items())]
+    try:
+        changes = cs.share_access_rules.reconcile_many(
+            desired, dry_run=args.dry_run, max_workers=args.max_workers)
+    except (KeyError, ValueError) as e:
+        raise exceptions.CommandError("Invalid access rule: %s" % e)
+
+    change_row = collections.namedtuple(
+        'Change', ('share', 'action', 'access_type', 'access_to',
+                   'access_level', 'metadata', 'access_id', 'error'))
+    rows = [change_row(change.share.id, change.action, change.access_type,
+                       change.access_to, change.access_level,
+                       change.metadata or '', change.access_id or '',
+                       change.error or '')
+            for change in changes]
+    fields = ['Share', 'Action', 'Access Type', 'Access To', 'Access Level',
+              'Metadata', 'Access ID']
+    if not args.dry_run:
+        fields.append('Error')
+    cliutils.print_list(rows, fields, sortby_index=None)
+    failed = [c for c in changes if c.error is not None]
+    if failed:
+        raise exceptions.CommandError(
+            "Unable to apply %d of the %d access rule changes." % (
+                len(failed), len(changes)))
+
+
 @api_versions.wraps("2.32")
 @cliutils.arg(
     'snapshot',
@@ -1853,6 +2295,14 @@ def do_snapshot_access_list(cs, args):
     default=False,
     help='Display total number of shares to return. '
          'Available only for microversion >= 2.42.')
+@cliutils.arg(
+    '--count-only',
+    '--count_only',  # alias
+    dest='count_only',
+    action='store_true',
+    default=False,
+    help='Only print the number of shares matching the filters, without '
+         'listing them.')
 @cliutils.service_type('sharev2')
 def do_list(cs, args):
     """List NAS shares with filters."""
@@ -1928,32 +2378,50 @@ def do_list(cs, args):
     if share_group:
         search_opts['share_group_id'] = share_group.id
 
+    if args.count_only:
+        print(cs.shares.count(search_opts=search_opts))
+        return
+
+    detailed = not _is_summary_enough('shares', list_of_keys)
     total_count = 0
     if strutils.bool_from_string(args.count, strict=True):
         search_opts['with_count'] = args.count
         shares, total_count = cs.shares.list(
-            search_opts=search_opts, sort_key=args.sort_key,
-            sort_dir=args.sort_dir,
+            detailed=detailed, search_opts=search_opts,
+            sort_key=args.sort_key, sort_dir=args.sort_dir,
         )
-    else:
+    elif args.limit or cliutils.get_output_format() == cliutils.TABLE_FORMAT:
         shares = cs.shares.list(
-            search_opts=search_opts, sort_key=args.sort_key,
-            sort_dir=args.sort_dir,
+            detailed=detailed, search_opts=search_opts,
+            sort_key=args.sort_key, sort_dir=args.sort_dir,
+        )
+    else:
+        # NOTE: the shares of every page are written as soon as it is
+        # listed, instead of after all of them.
+        shares = cs.shares.iterate(
+            detailed=detailed, search_opts=search_opts,
+            sort_key=args.sort_key, sort_dir=args.sort_dir,
         )
+    if columns is not None and 'export_location' in columns:
+        shares = _with_export_locations(cs, shares)
+    cliutils.print_list(shares, list_of_keys, sortby_index=None)
+    if args.count:
+        with cliutils.diagnostic_output():
+            print("Shares in total: %s" % total_count)
+
+
+def _with_export_locations(cs, shares):
     # NOTE(vponomaryov): usage of 'export_location' and
     # 'export_locations' columns may cause scaling issue using API 2.9+ and
     # when lots of shares are returned.
-    if (shares and columns is not None and 'export_location' in columns and
-            not hasattr(shares[0], 'export_location')):
-        # NOTE(vponomaryov): we will get here only using API 2.9+
-        for share in shares:
+    for share in shares:
+        if not hasattr(share, 'export_location'):
+            # NOTE(vponomaryov): we will get here only using API 2.9+
             els_objs = cs.share_export_locations.list(share)
             els = [el.to_dict()['path'] for el in els_objs]
             setattr(share, 'export_locations', els)
             setattr(share, 'export_location', els[0] if els else None)
-    cliutils.print_list(shares, list_of_keys, sortby_index=None)
-    if args.count:
-        print("Shares in total: %s" % total_count)
+        yield share
 
 
 @cliutils.arg(
@@ -2248,6 +2716,7 @@ def do_snapshot_list(cs, args):
             " is only available with manila API version >= 2.36")
 
     snapshots = cs.share_snapshots.list(
+        detailed=not _is_summary_enough('snapshots', list_of_keys),
         search_opts=search_opts,
         sort_key=args.sort_key,
         sort_dir=args.sort_dir,
@@ -2971,12 +3440,14 @@ def do_share_network_list(cs, args):
     if args.security_service:
         search_opts['security_service_id'] = _find_security_service(
             cs, args.security_service).id
-    share_networks = cs.share_networks.list(search_opts=search_opts)
     fields = ['id', 'name']
 
     if args.columns is not None:
         fields = _split_columns(columns=args.columns)
 
+    share_networks = cs.share_networks.list(
+        detailed=not _is_summary_enough('share_networks', fields),
+        search_opts=search_opts)
     cliutils.print_list(share_networks, fields=fields)
 
 
@@ -3141,12 +3612,14 @@ def do_share_network_list(cs, args):
     if args.security_service:
         search_opts['security_service_id'] = _find_security_service(
             cs, args.security_service).id
-    share_networks = cs.share_networks.list(search_opts=search_opts)
     fields = ['id', 'name']
 
     if args.columns is not None:
         fields = _split_columns(columns=args.columns)
 
+    share_networks = cs.share_networks.list(
+        detailed=not _is_summary_enough('share_networks', fields),
+        search_opts=search_opts)
     cliutils.print_list(share_networks, fields=fields)
 
 
@@ -3906,10 +4379,10 @@ def do_pool_list(cs, args):
     else:
         fields = ["Name", "Host", "Backend", "Pool"]
 
-    pools = cs.pools.list(detailed=args.detail, search_opts=search_opts)
-    if args.columns is not None:
+    if args.columns is not None and not args.detail:
         fields = _split_columns(columns=args.columns)
-        pools = cs.pools.list(detailed=True, search_opts=search_opts)
+    detailed = args.detail or not _is_summary_enough('pools', fields)
+    pools = cs.pools.list(detailed=detailed, search_opts=search_opts)
 
     if args.detail:
         for info in pools:
@@ -3921,6 +4394,85 @@ def do_pool_list(cs, args):
         cliutils.print_list(pools, fields=fields)
 
 
+@cliutils.arg(
+    '--group-by',
+    '--group_by',  # alias
+    metavar='<group_by>',
+    type=str,
+    default='backend',
+    action='single_alias',
+    choices=list(capacity.GROUP_BY),
+    help='Attribute the capacity of the pools is summed by, available '
+         'values are %(values)s. Default=backend.' % {
+             'values': ', '.join(capacity.GROUP_BY)})
+@cliutils.arg(
+    '--host',
+    metavar='<host>',
+    type=str,
+    default=None,
+    help='Filter pools by host name. Regular expressions are supported.')
+@cliutils.arg(
+    '--backend',
+    metavar='<backend>',
+    type=str,
+    default=None,
+    help='Filter pools by backend name. Regular expressions are supported.')
+@cliutils.arg(
+    '--pool',
+    metavar='<pool>',
+    type=str,
+    default=None,
+    help='Filter pools by pool name. Regular expressions are supported.')
+@cliutils.arg(
+    '--share-type',
+    '--share_type',  # alias
+    metavar='<share-type>',
+    type=str,
+    default=None,
+    action='single_alias',
+    help='Name or ID of a share type, only the pools with the capabilities '
+         'its extra specs require are summed.')
+@cliutils.arg(
+    '--count-shares',
+    '--count_shares',  # alias
+    dest='count_shares',
+    action='store_true',
+    default=False,
+    help='Count the shares of all tenants on the pools too.')
+def do_pool_capacity(cs, args):
+    """Sum the capacity of the backend storage pools (Admin only)."""
+    search_opts = {
+        'host': args.host,
+        'backend': args.backend,
+        'pool': args.pool,
+    }
+    snapshot = cs.pools.snapshot(
+        search_opts=dict((k, v) for k, v in search_opts.items() if v))
+    if args.share_type:
+        share_type = _find_share_type(cs, args.share_type)
+        snapshot = snapshot.filter(share_type.get_keys())
+
+    shares = None
+    if args.count_shares:
+        shares = cs.shares.iterate(search_opts={'all_tenants': 1})
+    summaries = snapshot.aggregate(by=args.group_by, shares=shares)
+
+    fields = [args.group_by.replace('_', ' ').title(), 'Pools',
+              'Total Capacity GB',
+              'Free Capacity GB', 'Largest Free Capacity GB',
+              'Allocated Capacity GB', 'Provisioned Capacity GB',
+              'Provisioned Ratio']
+    if args.count_shares:
+        fields.append('Shares')
+    formatters = {
+        fields[0]: lambda s: s.group,
+        'Provisioned Ratio': lambda s: (None if s.provisioned_ratio is None
+                                        else round(s.provisioned_ratio, 2)),
+    }
+    cliutils.print_list(summaries, fields, formatters=formatters,
+                        sortby_index=None)
+
+
 @cliutils.arg('share', metavar='<share>',
               help='Name or ID of share to extend.')
 @cliutils.arg('new_size',
@@ -5601,6 +6153,20 @@ def do_share_replica_resync(cs, args):
     default=None,
     help='Comma separated list of columns to be displayed '
          'example --columns "resource_id,user_message".')
+@cliutils.arg(
+    '--follow',
+    action='store_true',
+    default=False,
+    help='Keep polling and print the new messages as they are created, '
+         'until interrupted.')
+@cliutils.arg(
+    '--follow-interval',
+    '--follow_interval',  # alias
+    metavar='<seconds>',
+    type=float,
+    action='single_alias',
+    default=5,
+    help='Seconds between the polls of --follow. Default=5.')
 def do_message_list(cs, args):
     """Lists all messages."""
     if args.columns is not None:
@@ -5623,6 +6189,20 @@ def do_message_list(cs, args):
         search_opts=search_opts, sort_key=args.sort_key,
         sort_dir=args.sort_dir)
     cliutils.print_list(messages, fields=list_of_keys, sortby_index=None)
+    if not args.follow:
+        return
+
+    sys.stdout.flush()
+    since = max([m.created_at for m in messages] or [''])
+    seen = [m.id for m in messages if m.created_at == since]
+    for key in ('offset', 'limit'):
+        search_opts.pop(key)
+    for new_messages in cs.messages.follow(
+            search_opts=search_opts, since=since, seen=seen,
+            interval=args.follow_interval):
+        cliutils.print_list(new_messages, fields=list_of_keys,
+                            sortby_index=None)
+        sys.stdout.flush()
 
 
 @cliutils.arg(
@@ -5675,3 +6255,222 @@ def _print_message(message):
         'request_id': message.request_id,
     }
     cliutils.print_dict(message_dict)
+
+
+@cliutils.arg(
+    '--output',
+    metavar='<output>',
+    required=True,
+    help='JSON Lines file to write, "-" writes to the standard output.')
+@cliutils.arg(
+    '--resource-type',
+    '--resource_type',  # alias
+    metavar='<resource_type>',
+    dest='resource_types',
+    action='append',
+    choices=list(inventory.EXPORT_TYPES),
+    default=None,
+    help='Resource type to export, one of %s. May be repeated. '
+         'Default=all of them.' % ', '.join(inventory.EXPORT_TYPES))
+@cliutils.arg(
+    '--all-tenants',
+    dest='all_tenants',
+    metavar='<0|1>',
+    nargs='?',
+    type=int,
+    const=1,
+    default=0,
+    help='Export the resources of all tenants (Admin only).')
+@cliutils.arg(
+    '--max-workers',
+    '--max_workers',  # alias
+    dest='max_workers',
+    metavar='<max_workers>',
+    type=int,
+    default=None,
+    action='single_alias',
+    help='Number of requests sent at the same time to list the export '
+         'locations or the access rules of the shares. Default=8.')
+def do_export_inventory(cs, args):
+    """Export resources to a JSON Lines file, a resource per line."""
+    def export(fp):
+        return inventory.export(
+            cs, fp, resource_types=args.resource_types,
+            all_tenants=args.all_tenants, max_workers=args.max_workers)
+
+    if args.output == '-':
+        fp = getattr(sys.stdout, 'buffer', sys.stdout)
+        results = export(fp)
+        fp.flush()
+        # NOTE: the standard output has the resources, only the errors are
+        # reported.
+        for resource_type, result in results.items():
+            if 'error' in result:
+                print("Unable to export %s: %s" % (
+                    resource_type, result['error']), file=sys.stderr)
+        return
+    with open(args.output, 'wb') as fp:
+        results = export(fp)
+
+    export_row = collections.namedtuple(
+        'Export', ('resource_type', 'count', 'error'))
+    rows = [export_row(resource_type,
+                       '' if result['count'] is None else result['count'],
+                       result.get('error', ''))
+            for resource_type, result in results.items()]
+    cliutils.print_list(rows, ['Resource Type', 'Count', 'Error'],
+                        sortby_index=None)
+
+
+@cliutils.arg(
+    '--resource-type',
+    '--resource_type',  # alias
+    metavar='<resource_type>',
+    dest='resource_types',
+    action='append',
+    choices=list(inventory.RESOURCE_TYPES),
+    default=None,
+    help='Resource type to sync, one of %s. May be repeated. '
+         'Default=all of them.' % ', '.join(inventory.RESOURCE_TYPES))
+@cliutils.arg(
+    '--full',
+    action='store_true',
+    default=False,
+    help='List every resource type in full, instead of only the shares '
+         'changed since the previous sync.')
+@cliutils.arg(
+    '--all-tenants',
+    dest='all_tenants',
+    metavar='<0|1>',
+    nargs='?',
+    type=int,
+    const=1,
+    default=0,
+    help='Mirror the resources of all tenants (Admin only).')
+@cliutils.arg(
+    '--inventory-file',
+    '--inventory_file',  # alias
+    metavar='<inventory_file>',
+    action='single_alias',
+    default=None,
+    help='SQLite database of the inventory. '
+         'Default=a file per endpoint in ~/.manilaclient/inventory.')
+def do_inventory_sync(cs, args):
+    """Mirror resources into a local inventory, for inventory-list."""
+    inv = inventory.Inventory(cs, path=args.inventory_file)
+    try:
+        results = inv.sync(resource_types=args.resource_types,
+                           full=args.full, all_tenants=args.all_tenants)
+    finally:
+        inv.close()
+
+    sync_row = collections.namedtuple(
+        'Sync', ('resource_type', 'mode', 'updated', 'deleted', 'total',
+                 'error'))
+    rows = [sync_row(resource_type, result.get('mode', ''),
+                     result.get('updated', ''), result.get('deleted', ''),
+                     result.get('total', ''), result.get('error', ''))
+            for resource_type, result in results.items()]
+    cliutils.print_list(rows, ['Resource Type', 'Mode', 'Updated', 'Deleted',
+                               'Total', 'Error'], sortby_index=None)
+
+
+@cliutils.arg(
+    'resource_type',
+    metavar='<resource_type>',
+    choices=list(inventory.RESOURCE_TYPES),
+    help='Resource type to list, one of %s.' % ', '.join(
+        inventory.RESOURCE_TYPES))
+@cliutils.arg(
+    '--name',
+    metavar='<name>',
+    default=None,
+    help='Filter results by name.')
+@cliutils.arg(
+    '--status',
+    metavar='<status>',
+    default=None,
+    help='Filter results by status.')
+@cliutils.arg(
+    '--host',
+    metavar='<host>',
+    default=None,
+    help='Filter results by host.')
+@cliutils.arg(
+    '--project-id',
+    '--project_id',  # alias
+    metavar='<project_id>',
+    action='single_alias',
+    default=None,
+    help='Filter results by project ID.')
+@cliutils.arg(
+    '--share-id',
+    '--share_id',  # alias
+    metavar='<share_id>',
+    action='single_alias',
+    default=None,
+    help='Filter results by share ID, e.g. the snapshots of a share.')
+@cliutils.arg(
+    '--share-network-id',
+    '--share_network_id',  # alias
+    metavar='<share_network_id>',
+    action='single_alias',
+    default=None,
+    help='Filter results by share network ID.')
+@cliutils.arg(
+    '--metadata',
+    type=str,
+    nargs='*',
+    metavar='<key=value>',
+    default=None,
+    help='Filter results by metadata key and value.')
+@cliutils.arg(
+    '--older-than',
+    '--older_than',  # alias
+    metavar='<days>',
+    type=float,
+    action='single_alias',
+    default=None,
+    help='Only list resources created more than this many days ago.')
+@cliutils.arg(
+    '--inventory-file',
+    '--inventory_file',  # alias
+    metavar='<inventory_file>',
+    action='single_alias',
+    default=None,
+    help='SQLite database of the inventory. '
+         'Default=a file per endpoint in ~/.manilaclient/inventory.')
+@cliutils.arg(
+    '--columns',
+    metavar='<columns>',
+    type=str,
+    default=None,
+    help='Comma separated list of columns to be displayed '
+         'example --columns "id,name,host".')
+def do_inventory_list(cs, args):
+    """List resources from the local inventory, without API requests."""
+    if args.columns is not None:
+        list_of_keys = _split_columns(columns=args.columns)
+    else:
+        list_of_keys = ['ID', 'Name', 'Status', 'Host', 'Created At']
+
+    created_before = None
+    if args.older_than is not None:
+        age = datetime.timedelta(days=args.older_than)
+        created_before = datetime.datetime.utcnow() - age
+
+    inv = inventory.Inventory(cs, path=args.inventory_file)
+    try:
+        if inv.get_synced_at(args.resource_type) is None:
+            raise exceptions.CommandError(
+                "The inventory has no %s, run 'manila inventory-sync' "
+                "first." % args.resource_type)
+        resources = inv.list(
+            args.resource_type, metadata=_extract_metadata(args),
+            created_before=created_before, name=args.name,
+            status=args.status, host=args.host, project_id=args.project_id,
+            share_id=args.share_id,
+            share_network_id=args.share_network_id)
+    finally:
+        inv.close()
+    cliutils.print_list(resources, list_of_keys, sortby_index=None)